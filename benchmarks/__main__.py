@@ -0,0 +1,74 @@
+# benchmarks/__main__.py
+"""
+Runs the benchmark suite and checks it against the stored baseline.
+
+  python -m benchmarks [--preset quick|full] [--out results.json]
+                       [--baseline benchmarks/baseline.json] [--threshold 0.25]
+                       [--threshold-for 'dijkstra/*=0.5' ...] [--only 'visible_intervals/*' ...]
+                       [--update-baseline]
+
+Exits with status 1 if any case regressed beyond its threshold. Runs offline: every
+scene is generated from its seed.
+
+The committed baseline was recorded on one developer machine and is only a reference
+for it. Elsewhere, timings are scaled by a calibration run (see benchmarks.compare),
+which absorbs most but not all of the difference; for a strict check, record a
+baseline on the machine that runs it (--update-baseline --baseline my-baseline.json).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from .compare import calibration_scale, compare, load_report, parse_thresholds, save_report
+from .suite import PRESETS, run_suite
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+def _ms(s):
+    return "-" if s is None else f"{s * 1e3:.3f}"
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks")
+    ap.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", action="append", default=[], metavar="PATTERN", help="glob over case names")
+    ap.add_argument("--out", type=Path, help="write the JSON report here")
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown fraction")
+    ap.add_argument("--threshold-for", action="append", default=[], metavar="PATTERN=FRACTION")
+    ap.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    args = ap.parse_args(argv)
+
+    overrides = parse_thresholds(args.threshold_for)
+    report = run_suite(args.preset, seed=args.seed, repeat=args.repeat, only=args.only,
+                       progress=lambda r: print(f"  {r.name:<40} {_ms(r.seconds):>10} ms", file=sys.stderr))
+    if args.out is not None:
+        save_report(report, args.out)
+    if args.update_baseline:
+        save_report(report, args.baseline)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    baseline = load_report(args.baseline)
+    if baseline.get("preset") != report["preset"] or baseline.get("seed") != report["seed"]:
+        print(f"warning: baseline is preset={baseline.get('preset')} seed={baseline.get('seed')}", file=sys.stderr)
+    if baseline.get("environment") != report["environment"]:
+        print("warning: baseline was recorded in a different environment; timings are scaled by the "
+              f"calibration run (x{calibration_scale(report, baseline):.2f}) and only approximately comparable",
+              file=sys.stderr)
+    rows = [c for c in compare(report, baseline, default=args.threshold, overrides=overrides)
+            if c.current is not None]
+    print(f"{'case':<40} {'base ms':>10} {'now ms':>10} {'ratio':>7} {'noise':>6}  status")
+    for c in rows:
+        ratio = "-" if c.ratio is None else f"{c.ratio:.2f}"
+        print(f"{c.name:<40} {_ms(c.baseline):>10} {_ms(c.current):>10} {ratio:>7} {c.noise:>6.2f}  {c.status}")
+    regressed = [c for c in rows if c.status == "regressed"]
+    print(f"{len(rows)} cases, {len(regressed)} regressed")
+    return 1 if regressed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
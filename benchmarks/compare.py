@@ -0,0 +1,106 @@
+# benchmarks/compare.py
+"""
+Regression check of a benchmark report against a stored baseline.
+
+A case regresses when its best time exceeds the baseline's by more than its
+threshold (a fraction: 0.25 allows 25% slower) plus its noise. Thresholds are a
+default plus optional per-case overrides given as glob patterns; the last matching
+pattern wins. The noise of a case is the larger relative spread (mean / best - 1)
+of its two runs, so jittery cases need a bigger change to be flagged.
+
+When both reports carry a calibration time, baseline timings are first scaled by
+current / baseline calibration, which cancels most of the difference between
+machines. The scaling is approximate: a baseline is only a precise reference on the
+machine that recorded it.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import json
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: Optional[float]  # seconds; None if the case is new
+    current: Optional[float]   # seconds; None if the case was not run
+    threshold: float
+    scale: float = 1.0         # current / baseline calibration time
+    noise: float = 0.0         # relative run-to-run spread
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """current / baseline, with the baseline scaled to this machine."""
+        if self.baseline is None or self.current is None or self.baseline <= 0:
+            return None
+        return self.current / (self.baseline * self.scale)
+
+    @property
+    def status(self) -> str:
+        r = self.ratio
+        if r is None:
+            return "new" if self.baseline is None else "missing"
+        allowed = 1.0 + self.threshold + self.noise
+        if r > allowed:
+            return "regressed"
+        if r < 1.0 / allowed:
+            return "improved"
+        return "ok"
+
+def parse_thresholds(specs: Sequence[str]) -> List[Tuple[str, float]]:
+    """'PATTERN=FRACTION' strings, e.g. 'dijkstra/*=0.5', as (pattern, fraction) pairs."""
+    out = []
+    for spec in specs:
+        pat, sep, frac = spec.rpartition("=")
+        if not sep or not pat:
+            raise ValueError(f"bad threshold {spec!r}; expected PATTERN=FRACTION")
+        out.append((pat, float(frac)))
+    return out
+
+def threshold_for(name: str, default: float, overrides: Sequence[Tuple[str, float]] = ()) -> float:
+    t = default
+    for pat, frac in overrides:
+        if fnmatch(name, pat):
+            t = frac
+    return t
+
+def calibration_scale(report: Dict, baseline: Dict) -> float:
+    """current / baseline calibration time, or 1.0 if either report lacks one."""
+    cur, base = report.get("calibration"), baseline.get("calibration")
+    if not cur or not base:
+        return 1.0
+    return cur / base
+
+def _spread(result: Optional[Dict]) -> float:
+    if not result or not result.get("mean") or not result.get("seconds"):
+        return 0.0
+    return max(0.0, result["mean"] / result["seconds"] - 1.0)
+
+def compare(report: Dict, baseline: Dict, *, default: float = 0.25,
+            overrides: Sequence[Tuple[str, float]] = ()) -> List[Comparison]:
+    """One Comparison per case in either report, in baseline order then new cases."""
+    cur = report["results"]
+    base = baseline["results"]
+    scale = calibration_scale(report, baseline)
+    names = list(base) + [n for n in cur if n not in base]
+    return [
+        Comparison(
+            name=n,
+            baseline=base[n]["seconds"] if n in base else None,
+            current=cur[n]["seconds"] if n in cur else None,
+            threshold=threshold_for(n, default, overrides),
+            scale=scale,
+            noise=max(_spread(base.get(n)), _spread(cur.get(n))),
+        )
+        for n in names
+    ]
+
+def load_report(path: Union[str, Path]) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+def save_report(report: Dict, path: Union[str, Path]) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+        f.write("\n")
@@ -0,0 +1,147 @@
+# benchmarks/scenes.py
+"""
+Seeded scene and target generators for the benchmark suite.
+
+All obstacles are convex, counter-clockwise and pairwise disjoint (separated by at
+least `gap`), inside the unit square. Every generator is a pure function of its
+arguments, so a (kind, size, seed) triple always yields the same instance.
+"""
+from __future__ import annotations
+from typing import List, Sequence, Tuple
+import math
+import random
+
+from shapely.geometry import Polygon
+from shapely.strtree import STRtree
+
+from mtvg.geometry import Coord, Obstacle, points_inside
+from mtvg.models import Depot, PiecewiseLinearTrajectory, Scene, Target, make_linear_xy
+
+def _convex(rng: random.Random, c: Coord, r: float, k: int) -> List[Coord]:
+    """k vertices on a circle of radius r around c at random (sorted) angles: convex and CCW."""
+    angles = sorted(rng.uniform(0.0, 2.0 * math.pi) for _ in range(k))
+    return [(c[0] + r * math.cos(a), c[1] + r * math.sin(a)) for a in angles]
+
+def _place(rng: random.Random, n: int, radius: Tuple[float, float], gap: float, max_tries: int,
+           out: Sequence[Obstacle] = ()) -> List[Obstacle]:
+    """Rejection-sample convex polygons until `out` holds n of them (or max_tries is spent)."""
+    out = list(out)
+    placed = [Polygon(o.vertices) for o in out]
+    tries = 0
+    while len(out) < n and tries < max_tries:
+        tries += 1
+        r = rng.uniform(*radius)
+        c = (rng.uniform(r, 1.0 - r), rng.uniform(r, 1.0 - r))
+        verts = _convex(rng, c, r, rng.randint(3, 7))
+        poly = Polygon(verts)
+        if poly.area < 0.2 * r * r:
+            continue  # sliver
+        if placed and STRtree(placed).query(poly.buffer(gap), predicate="intersects").size:
+            continue
+        placed.append(poly)
+        out.append(Obstacle(vertices=tuple(verts)))
+    return out
+
+def random_polygons(n: int, seed: int = 0, *, gap: float = 0.01) -> List[Obstacle]:
+    """n random convex polygons (3-7 vertices) of similar size, spread over the unit square."""
+    rng = random.Random(seed)
+    r = 0.35 / math.sqrt(max(n, 1))
+    return _place(rng, n, (0.5 * r, r), gap, 200 * n)
+
+def cluttered(n: int, seed: int = 0, *, gap: float = 0.004) -> List[Obstacle]:
+    """Dense clutter: a few large polygons, then many small ones packed into the gaps."""
+    rng = random.Random(seed)
+    r = 0.25 / math.sqrt(max(n, 1))
+    n_big = max(1, n // 20)
+    big = _place(rng, n_big, (2.5 * r, 4.0 * r), gap, 100 * n_big)
+    return _place(rng, n, (0.3 * r, r), gap, 400 * n, out=big)
+
+def grid_maze(cells: int, seed: int = 0, *, wall: float = 0.2) -> List[Obstacle]:
+    """
+    Perfect maze on a cells x cells grid (randomized depth-first search), one thin
+    rectangle per remaining interior wall. `wall` is the wall thickness as a fraction
+    of the cell size; walls stop short of the lattice points so they stay disjoint.
+    """
+    rng = random.Random(seed)
+    h = 1.0 / cells
+    # walls between (i, j) and (i + 1, j) ("v") or (i, j + 1) ("h")
+    walls = {("v", i, j) for i in range(cells - 1) for j in range(cells)}
+    walls |= {("h", i, j) for i in range(cells) for j in range(cells - 1)}
+    seen = {(0, 0)}
+    stack = [(0, 0)]
+    while stack:
+        i, j = stack[-1]
+        nbrs = [(a, b) for a, b in ((i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1))
+                if 0 <= a < cells and 0 <= b < cells and (a, b) not in seen]
+        if not nbrs:
+            stack.pop()
+            continue
+        a, b = rng.choice(nbrs)
+        if a != i:
+            walls.discard(("v", min(a, i), j))
+        else:
+            walls.discard(("h", i, min(b, j)))
+        seen.add((a, b))
+        stack.append((a, b))
+    t = 0.5 * wall * h
+    e = 1.5 * t  # wall ends keep a 0.5 t gap to the walls crossing at lattice points
+    out = []
+    for kind, i, j in sorted(walls):
+        if kind == "v":
+            x = (i + 1) * h
+            x0, x1, y0, y1 = x - t, x + t, j * h + e, (j + 1) * h - e
+        else:
+            y = (j + 1) * h
+            x0, x1, y0, y1 = i * h + e, (i + 1) * h - e, y - t, y + t
+        out.append(Obstacle(vertices=((x0, y0), (x1, y0), (x1, y1), (x0, y1))))
+    return out
+
+SCENES = {"polygons": random_polygons, "maze": grid_maze, "clutter": cluttered}
+
+def make_scene(kind: str, size: int, seed: int = 0, *, v_max: float = 1.0) -> Scene:
+    """Scene of the given generator kind; the depot sits in the free corner near the origin."""
+    try:
+        gen = SCENES[kind]
+    except KeyError:
+        raise ValueError(f"unknown scene kind {kind!r}; expected one of {sorted(SCENES)}") from None
+    return Scene(obstacles=gen(size, seed), v_max=v_max, depot=Depot((0.002, 0.002)))
+
+def linear_targets(n: int, seed: int = 0, *, horizon: float = 20.0, speed: float = 0.05) -> List[Target]:
+    """n targets moving in straight lines at `speed`, one window over [0, horizon]."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        p0 = (rng.random(), rng.random())
+        a = rng.uniform(0.0, 2.0 * math.pi)
+        p1 = (p0[0] + speed * horizon * math.cos(a), p0[1] + speed * horizon * math.sin(a))
+        out.append(Target(id=i, xy=make_linear_xy(p0, p1, 0.0, horizon), windows=[(0.0, horizon)]))
+    return out
+
+def multi_window_targets(n: int, seed: int = 0, *, horizon: float = 20.0, speed: float = 0.05,
+                         legs: int = 4, windows: int = 3) -> List[Target]:
+    """n targets on random piecewise-linear paths of `legs` legs, with `windows` disjoint windows each."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        times = [horizon * k / legs for k in range(legs + 1)]
+        pts = [(rng.random(), rng.random())]
+        for _ in range(legs):
+            a = rng.uniform(0.0, 2.0 * math.pi)
+            step = speed * horizon / legs
+            x = min(1.0, max(0.0, pts[-1][0] + step * math.cos(a)))
+            y = min(1.0, max(0.0, pts[-1][1] + step * math.sin(a)))
+            pts.append((x, y))
+        cuts = sorted(rng.uniform(0.0, horizon) for _ in range(2 * windows))
+        wins = [(cuts[2 * k], cuts[2 * k + 1]) for k in range(windows) if cuts[2 * k] < cuts[2 * k + 1]]
+        out.append(Target(id=i, xy=PiecewiseLinearTrajectory(times, pts), windows=wins))
+    return out
+
+def query_points(scene: Scene, n: int, seed: int = 0) -> List[Coord]:
+    """n seeded random points in the free space of `scene`."""
+    rng = random.Random(seed)
+    out: List[Coord] = []
+    while len(out) < n:
+        cand = [(rng.random(), rng.random()) for _ in range(2 * (n - len(out)) + 4)]
+        inside = points_inside(cand, scene.index) if scene.obstacles else [False] * len(cand)
+        out.extend(c for c, f in zip(cand, list(inside)) if not f)
+    return out[:n]
@@ -0,0 +1,159 @@
+# benchmarks/suite.py
+"""
+Benchmark cases and the runner.
+
+Each case times one library call on a generated instance and reports the best of
+`repeat` runs (the minimum is the least noisy estimate of the cost itself), plus the
+mean; fast calls are looped so that every run lasts at least 50 ms. Names are "<operation>/<scene kind>/<size>", e.g. "dijkstra/maze/6".
+
+Every report also times a fixed calibration workload that does not touch mtvg (a
+Python float loop plus a numpy sort). `compare` divides by it, so a baseline
+recorded on a faster or slower machine still gives meaningful ratios.
+
+The graph cache (MTVG_CACHE_DIR) is switched off while the suite runs, so build
+cases time builds rather than cache loads.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from fnmatch import fnmatch
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import math
+import os
+import platform
+import random
+import time
+
+import numpy as np
+import shapely
+
+from mtvg import cache
+from mtvg.intervals import kinematic_filter, visible_intervals
+from mtvg.visibility_graph import build_visibility_graph, dijkstra
+from .scenes import linear_targets, make_scene, multi_window_targets, query_points
+
+SCHEMA = 2
+
+# scene kind -> sizes (polygon count, or cells per side for mazes)
+PRESETS: Dict[str, Dict[str, Tuple[int, ...]]] = {
+    "quick": {"polygons": (10, 20, 40), "maze": (3, 4, 6), "clutter": (10, 20, 40)},
+    "full": {"polygons": (10, 20, 40, 80, 160), "maze": (4, 6, 8, 12), "clutter": (20, 40, 80, 160, 320)},
+}
+
+@dataclass
+class Result:
+    name: str
+    seconds: float       # best of `repeat` runs, per call
+    mean: float          # mean over the runs, per call
+    repeat: int
+    params: Dict[str, object] = field(default_factory=dict)
+
+def _time(fn: Callable[[], object], repeat: int, calls: int = 1, min_run: float = 0.05) -> Tuple[float, float]:
+    """(best, mean) seconds per call; fn is looped so that each timed run lasts >= min_run."""
+    t = time.perf_counter()
+    fn()  # also warms caches (lazy SceneIndex members, allocator)
+    loops = max(1, math.ceil(min_run / max(time.perf_counter() - t, 1e-9)))
+    runs = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        runs.append((time.perf_counter() - t) / (loops * calls))
+    return min(runs), sum(runs) / len(runs)
+
+def _cases(kind: str, size: int, seed: int, repeat: int, want: Callable[[str], bool]) -> Iterator[Result]:
+    scene = make_scene(kind, size, seed)
+    index = scene.index
+    pts = query_points(scene, 20, seed)
+    G = build_visibility_graph(index, pts)
+    params = {"kind": kind, "size": size, "seed": seed, "obstacles": len(scene.obstacles), "nodes": len(G.nodes)}
+
+    name = f"build_visibility_graph/{kind}/{size}"
+    if want(name):
+        best, mean = _time(lambda: build_visibility_graph(index, pts), repeat)
+        yield Result(name, best, mean, repeat, params)
+
+    name = f"dijkstra/{kind}/{size}"
+    if want(name):
+        rng = random.Random(seed)
+        pairs = [(rng.randrange(len(pts)), rng.randrange(len(pts))) for _ in range(100)]
+        best, mean = _time(lambda: [dijkstra(G, a, b) for a, b in pairs], repeat, len(pairs))
+        yield Result(name, best, mean, repeat, {**params, "queries": len(pairs)})
+
+    targets = linear_targets(2, seed) + multi_window_targets(2, seed)
+    queries = [(q, tgt, win) for q in pts[:5] for tgt in targets for win in tgt.windows]
+    name = f"visible_intervals/{kind}/{size}"
+    if want(name):
+        best, mean = _time(lambda: [visible_intervals(q, tgt, win, scene) for q, tgt, win in queries],
+                           repeat, len(queries))
+        yield Result(name, best, mean, repeat, {**params, "queries": len(queries)})
+
+    name = f"kinematic_filter/{kind}/{size}"
+    if want(name):
+        filt = [(q, tgt.xy, visible_intervals(q, tgt, win, scene), win[0]) for q, tgt, win in queries]
+        filt = [f for f in filt if f[2]]
+        best, mean = _time(lambda: [kinematic_filter(q, tau, ivs, t0, scene.v_max) for q, tau, ivs, t0 in filt],
+                           repeat, len(filt))
+        yield Result(name, best, mean, repeat, {**params, "queries": len(filt)})
+
+def calibrate(repeat: int = 5) -> float:
+    """Best seconds for the calibration workload: interpreter and numpy speed, no mtvg code."""
+    rng = random.Random(0)
+    xs = [rng.random() for _ in range(20000)]
+    arr = np.random.default_rng(0).random(100000)
+
+    def work() -> None:
+        s = 0.0
+        for a, b in zip(xs, xs[1:]):
+            s += math.hypot(a, b)
+        np.sort(arr)
+    return _time(work, repeat)[0]
+
+def environment() -> Dict[str, object]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "shapely": shapely.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "system": platform.system(),
+    }
+
+@contextmanager
+def _without_graph_cache() -> Iterator[None]:
+    saved = os.environ.pop(cache.ENV_VAR, None)
+    try:
+        yield
+    finally:
+        if saved is not None:
+            os.environ[cache.ENV_VAR] = saved
+
+def run_suite(preset: str = "quick", *, seed: int = 0, repeat: int = 5, only: Sequence[str] = (),
+              progress: Optional[Callable[[Result], None]] = None) -> Dict[str, object]:
+    """
+    Runs every case of `preset` (restricted to names matching one of the `only` glob
+    patterns, if given) and returns the JSON-ready report.
+    """
+    if preset not in PRESETS:
+        raise ValueError(f"unknown preset {preset!r}; expected one of {sorted(PRESETS)}")
+    def want(name: str) -> bool:
+        return not only or any(fnmatch(name, pat) for pat in only)
+
+    cal = calibrate(repeat)
+    results: List[Result] = []
+    with _without_graph_cache():
+        for kind, sizes in PRESETS[preset].items():
+            for size in sizes:
+                for r in _cases(kind, size, seed, repeat, want):
+                    results.append(r)
+                    if progress is not None:
+                        progress(r)
+    return {
+        "schema": SCHEMA,
+        "preset": preset,
+        "seed": seed,
+        "environment": environment(),
+        "calibration": min(cal, calibrate(repeat)),  # before and after, in case the clock drifts
+        "results": {r.name: asdict(r) for r in results},
+    }
@@ -0,0 +1,141 @@
+# mtvg/apsp.py
+"""
+All-pairs shortest paths over a visibility graph, with an on-disk cache.
+
+One single-source Dijkstra per node fills an (n, n) distance matrix and an (n, n)
+predecessor matrix (pred[s, v] is the node before v on the shortest s -> v path).
+Rows can be computed on a process pool. Cached results are plain `.npy` files
+named by `cache.scene_key(obstacles, points)` and are opened memory-mapped, so a
+repeat run on the same scene reads only the rows it touches.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+import math
+import os
+import numpy as np
+
+from .cache import scene_key
+from .geometry import Coord, Obstacle, SceneIndex
+from .visibility_graph import AnyGraph, CSRGraph, NodeId, build_visibility_graph, shortest_path_tree
+
+@dataclass(frozen=True, eq=False)
+class ShortestPaths:
+    nodes: np.ndarray  # (n, 2) node coordinates, graph node order
+    dist: np.ndarray   # (n, n) float64, inf where unreachable
+    pred: np.ndarray   # (n, n) int32, -1 at the source and where unreachable
+
+    def distance(self, s: NodeId, t: NodeId) -> float:
+        return float(self.dist[s, t])
+
+    def path(self, s: NodeId, t: NodeId) -> List[NodeId]:
+        """Node sequence s -> t, or [] if t is unreachable from s."""
+        if not math.isfinite(self.dist[s, t]):
+            return []
+        row = self.pred[s]
+        path = [t]
+        while path[-1] != s:
+            path.append(int(row[path[-1]]))
+        path.reverse()
+        return path
+
+_worker_graph: Optional[CSRGraph] = None
+
+def _init_worker(G: CSRGraph) -> None:
+    global _worker_graph
+    _worker_graph = G
+
+def _solve_rows(block: Tuple[int, int]) -> Tuple[int, np.ndarray, np.ndarray]:
+    return _rows(_worker_graph, *block)
+
+def _rows(G: CSRGraph, start: int, stop: int) -> Tuple[int, np.ndarray, np.ndarray]:
+    n = G.num_nodes
+    dist = np.empty((stop - start, n), dtype=np.float64)
+    pred = np.empty((stop - start, n), dtype=np.int32)
+    for r, s in enumerate(range(start, stop)):
+        dist[r], pred[r] = shortest_path_tree(G, s)
+    return start, dist, pred
+
+def all_pairs_shortest_paths(
+    G: AnyGraph,
+    *,
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+    out: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> ShortestPaths:
+    """
+    One Dijkstra per source node. With workers > 1, blocks of `chunk_size` source rows
+    are solved on a process pool. `out` may supply preallocated (dist, pred) arrays,
+    e.g. writable memmaps.
+    """
+    C = G if isinstance(G, CSRGraph) else G.freeze()
+    n = C.num_nodes
+    if out is None:
+        dist = np.empty((n, n), dtype=np.float64)
+        pred = np.empty((n, n), dtype=np.int32)
+    else:
+        dist, pred = out
+    if workers <= 1 or n < 2:
+        for s in range(n):
+            dist[s], pred[s] = shortest_path_tree(C, s)
+    else:
+        if chunk_size is None:
+            chunk_size = max(1, n // (8 * workers))
+        blocks = [(s, min(n, s + chunk_size)) for s in range(0, n, chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(C,)) as ex:
+            for start, d, p in ex.map(_solve_rows, blocks):
+                dist[start:start + len(d)] = d
+                pred[start:start + len(p)] = p
+    return ShortestPaths(nodes=C.coords, dist=dist, pred=pred)
+
+def _cache_paths(cache_dir: Path, key: str) -> Tuple[Path, Path, Path]:
+    return cache_dir / f"{key}.nodes.npy", cache_dir / f"{key}.pred.npy", cache_dir / f"{key}.dist.npy"
+
+def load_all_pairs(cache_dir: Union[str, Path], key: str) -> Optional[ShortestPaths]:
+    """Memory-mapped (read-only) cached result for `key`, or None if not cached."""
+    paths = _cache_paths(Path(cache_dir), key)
+    if not all(p.exists() for p in paths):
+        return None
+    nodes, pred, dist = (np.load(p, mmap_mode="r") for p in paths)
+    return ShortestPaths(nodes=nodes, dist=dist, pred=pred)
+
+def cached_all_pairs(
+    obstacles: Union[Sequence[Obstacle], SceneIndex],
+    points: Sequence[Coord],
+    cache_dir: Union[str, Path],
+    *,
+    method: str = "pairwise",
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+) -> ShortestPaths:
+    """
+    Shortest paths between all nodes of `build_visibility_graph(obstacles, points)`,
+    loaded from `cache_dir` when this scene was solved before. Matrices are written
+    straight into memmapped files and renamed into place once complete, so an
+    interrupted run never leaves a partial cache entry behind.
+    """
+    cache_dir = Path(cache_dir)
+    key = scene_key(obstacles, points)
+    hit = load_all_pairs(cache_dir, key)
+    if hit is not None:
+        return hit
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    G = build_visibility_graph(obstacles, points, method=method, workers=workers, chunk_size=chunk_size,
+                               cache_dir=cache_dir).freeze()
+    n = G.num_nodes
+    final = _cache_paths(cache_dir, key)
+    tmp = [p.with_name(f"{p.name}.{os.getpid()}.tmp") for p in final]
+    nodes_t, pred_t, dist_t = tmp
+    with open(nodes_t, "wb") as f:
+        np.save(f, G.coords)
+    pred = np.lib.format.open_memmap(pred_t, mode="w+", dtype=np.int32, shape=(n, n))
+    dist = np.lib.format.open_memmap(dist_t, mode="w+", dtype=np.float64, shape=(n, n))
+    all_pairs_shortest_paths(G, workers=workers, chunk_size=chunk_size, out=(dist, pred))
+    pred.flush(); dist.flush()
+    del pred, dist
+    for t, p in zip(tmp, final):  # dist last: its presence marks a complete entry
+        os.replace(t, p)
+    return load_all_pairs(cache_dir, key)
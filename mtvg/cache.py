@@ -0,0 +1,159 @@
+# mtvg/cache.py
+"""
+Binary cache of scenes and built visibility graphs, for fast process startup.
+
+An entry is one `.npz` file holding
+  - the obstacles as WKB (`obstacle_wkb`, split at `obstacle_offsets`),
+  - the convex vertices,
+  - optionally the scene's depot and v_max,
+  - optionally a graph in CSR form (`coords`, `indptr`, `indices`, `weights`, and
+    `vertex_nodes`, the nodes present only as obstacle vertices).
+Loading restores the obstacles with their SceneIndex already holding the polygons
+and convex vertices, so neither is recomputed.
+
+Entries are content-addressed by `scene_key(obstacles, points)`.
+`build_visibility_graph(..., cache_dir=...)` (or the MTVG_CACHE_DIR environment
+variable) looks up `<cache_dir>/<graph_key(...)>.npz` before building, and stores the
+graph there after a miss. The graph key adds the build method, the reduced flag and
+GRAPH_VERSION to the scene key, so builds of different kinds never share an entry and
+entries written by an older build are not served.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import hashlib
+import os
+import numpy as np
+import shapely
+
+from .geometry import Coord, Obstacle, SceneIndex
+from .models import Depot, Scene
+
+ENV_VAR = "MTVG_CACHE_DIR"
+FORMAT_VERSION = 1
+GRAPH_VERSION = 2  # bump whenever build_visibility_graph's output changes
+_KEY_VERSION = b"mtvg-scene-1"
+
+PathLike = Union[str, Path]
+
+def scene_key(obstacles: Union[Sequence[Obstacle], SceneIndex], points: Sequence[Coord]) -> str:
+    """Hex digest identifying an obstacle set and point list (order-sensitive)."""
+    if isinstance(obstacles, SceneIndex):
+        obstacles = obstacles.obstacles
+    h = hashlib.sha256(_KEY_VERSION)
+    h.update(np.int64(len(obstacles)).tobytes())
+    for obs in obstacles:
+        v = np.asarray(obs.vertices, dtype=np.float64).reshape(-1, 2)
+        h.update(np.int64(len(v)).tobytes())
+        h.update(v.tobytes())
+    p = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    h.update(np.int64(len(p)).tobytes())
+    h.update(p.tobytes())
+    return h.hexdigest()
+
+def graph_key(obstacles: Union[Sequence[Obstacle], SceneIndex], points: Sequence[Coord],
+              method: str, reduced: bool = False) -> str:
+    """File name stem of the graph built by `method` (reduced or not) over obstacles and points."""
+    return f"{scene_key(obstacles, points)}.{method}{'.reduced' if reduced else ''}.v{GRAPH_VERSION}"
+
+def cache_dir(explicit: Optional[PathLike] = None) -> Optional[Path]:
+    """`explicit` if given, else $MTVG_CACHE_DIR if set, else None (no caching)."""
+    if explicit is not None:
+        return Path(explicit)
+    env = os.environ.get(ENV_VAR)
+    return Path(env) if env else None
+
+# encoding
+
+def _index_arrays(index: SceneIndex) -> Dict[str, np.ndarray]:
+    blobs = [shapely.to_wkb(p) for p in index.polygons]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blobs], out=offsets[1:])
+    return {
+        "format": np.int64(FORMAT_VERSION),
+        "obstacle_wkb": np.frombuffer(b"".join(blobs), dtype=np.uint8),
+        "obstacle_offsets": offsets,
+        "convex": np.asarray(index.convex_vertices, dtype=np.float64).reshape(-1, 2),
+    }
+
+def _graph_arrays(G) -> Dict[str, np.ndarray]:
+    from .visibility_graph import CSRGraph  # visibility_graph imports this module
+    C = G if isinstance(G, CSRGraph) else G.freeze()
+    arrays = {"coords": C.coords, "indptr": C.indptr, "indices": C.indices, "weights": C.weights}
+    if not isinstance(G, CSRGraph):
+        arrays["vertex_nodes"] = np.asarray(sorted(G.vertex_nodes), dtype=np.int64)
+    return arrays
+
+def _write(path: PathLike, arrays: Dict[str, np.ndarray]) -> None:
+    # written under a temporary name and renamed, so readers never see a partial file
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+def _read(path: PathLike) -> Dict[str, np.ndarray]:
+    with np.load(path) as z:
+        data = {k: z[k] for k in z.files}
+    if int(data.get("format", -1)) != FORMAT_VERSION:
+        raise ValueError(f"{path}: not an mtvg cache file of format {FORMAT_VERSION}")
+    return data
+
+def _index_from(data: Dict[str, np.ndarray]) -> SceneIndex:
+    blob = data["obstacle_wkb"].tobytes()
+    off = data["obstacle_offsets"].tolist()
+    polys = list(shapely.from_wkb([blob[off[k]:off[k + 1]] for k in range(len(off) - 1)]))
+    obstacles = [Obstacle(vertices=tuple(map(tuple, p.exterior.coords[:-1]))) for p in polys]
+    index = SceneIndex(obstacles)
+    # seed the lazily built members we already have
+    index.__dict__.update(polygons=polys, convex_vertices=tuple(map(tuple, data["convex"].tolist())))
+    return index
+
+# public API
+
+def save_scene(path: PathLike, scene: Scene, *, graph=None) -> None:
+    """Write `scene` (and optionally a graph built over it) as one cache entry."""
+    arrays = _index_arrays(scene.index)
+    arrays["depot"] = np.asarray(scene.depot.xy, dtype=np.float64)
+    arrays["v_max"] = np.float64(scene.v_max)
+    if graph is not None:
+        arrays.update(_graph_arrays(graph))
+    _write(path, arrays)
+
+def load_scene(path: PathLike) -> Scene:
+    data = _read(path)
+    if "depot" not in data:
+        raise ValueError(f"{path}: entry holds no scene")
+    index = _index_from(data)
+    scene = Scene(obstacles=list(index.obstacles), v_max=float(data["v_max"]),
+                  depot=Depot(tuple(data["depot"].tolist())))
+    scene._index = index
+    return scene
+
+def save_graph(path: PathLike, obstacles: Union[Sequence[Obstacle], SceneIndex], graph) -> None:
+    """Write a visibility graph with the obstacles it was built against."""
+    index = obstacles if isinstance(obstacles, SceneIndex) else SceneIndex(obstacles)
+    _write(path, {**_index_arrays(index), **_graph_arrays(graph)})
+
+def load_graph(path: PathLike):
+    """
+    The `Graph` stored at path, ready for `insert_point` and `add_obstacle` (its obstacle
+    data is restored).
+    """
+    from .visibility_graph import CSRGraph
+    data = _read(path)
+    if "indptr" not in data:
+        raise ValueError(f"{path}: entry holds no graph")
+    index = _index_from(data)
+    G = CSRGraph(coords=data["coords"], indptr=data["indptr"], indices=data["indices"],
+                 weights=data["weights"]).thaw()
+    G.obstacle_edges = index.edges
+    G.obstacles = list(index.obstacles)
+    if "vertex_nodes" in data:
+        G.vertex_nodes = set(data["vertex_nodes"].tolist())
+    return G
+
+def load_scene_index(path: PathLike) -> SceneIndex:
+    """Just the obstacle geometry of an entry."""
+    return _index_from(_read(path))
@@ -1,10 +1,18 @@
 # mtvg/geometry.py
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Iterable, Tuple
+from fractions import Fraction
+from functools import cached_property
+from typing import Iterable, Tuple, Union
+import numpy as np
 from shapely.geometry import Polygon, LineString, Point
 from shapely.ops import unary_union
+from shapely.prepared import prep
+from shapely.strtree import STRtree
 from typing import List
+import time
+
+from . import instrument
 
 Coord = Tuple[float, float]
 
@@ -15,23 +23,21 @@ class Obstacle:
     def polygon(self) -> Polygon:
         return Polygon(self.vertices)
 
-def make_obstacles_union(obstacles: Iterable[Obstacle]) -> Polygon:
+def make_obstacles_union(obstacles: Union[Iterable[Obstacle], "SceneIndex"]) -> Polygon:
     """Union of all obstacles (used for fast intersection tests)."""
+    if isinstance(obstacles, SceneIndex):
+        return obstacles.union
     polys = [o.polygon() for o in obstacles]
     return unary_union(polys) if polys else Polygon()
 
-def segment_intersects_obstacles(p0: Coord, p1: Coord, obstacles_union: Polygon, *, eps: float = 1e-9) -> bool:
-    """Conservative: treat boundary touches as blocked using a tiny buffer."""
-    if obstacles_union.is_empty:
-        return False
-    seg = LineString([p0, p1])
-    return seg.intersects(obstacles_union.buffer(eps))
-
-def visible(p0: Coord, p1: Coord, obstacles_union: Polygon) -> bool:
+def visible(p0: Coord, p1: Coord, obstacles_union: Union[Polygon, "SceneIndex"]) -> bool:
     """True iff the straight segment p0->p1 stays in free space (no intersection)."""
+    instrument.count("visible.calls")
     return not segment_intersects_obstacles(p0, p1, obstacles_union)
 
-def extract_convex_vertices(obstacles: list[Obstacle]) -> list[Coord]:
+def extract_convex_vertices(obstacles: Union[list[Obstacle], "SceneIndex"]) -> list[Coord]:
+    if isinstance(obstacles, SceneIndex):
+        return list(obstacles.convex_vertices)
     convex_vertices = []
     for obs in obstacles:
         poly = obs.polygon()
@@ -54,33 +60,354 @@ def extract_convex_vertices(obstacles: list[Obstacle]) -> list[Coord]:
 def _near(a, b, tol: float = 1e-9) -> bool:
     return abs(a[0] - b[0]) <= tol and abs(a[1] - b[1]) <= tol
 
-def segment_intersects_obstacles(p0: Coord, p1: Coord, obstacles_union: Polygon, *, eps: float = 1e-9) -> bool:
+def segment_intersects_obstacles(p0: Coord, p1: Coord, obstacles_union: Union[Polygon, "SceneIndex"], *, eps: float = 1e-9) -> bool:
     """
-    Conservative intersection test, but allow a segment to *touch* an obstacle exactly
-    at an endpoint (so we can connect to convex vertices). Still block any true crossing
-    or overlap along edges.
+    Conservative intersection test, but allow a segment to *touch* an obstacle at an
+    endpoint, up to eps (so we can connect to convex vertices and points on edges).
+    Still block any true crossing or overlap along edges.
+    With a SceneIndex, only the obstacles the STRtree reports within eps of the segment
+    are intersected.
     """
-    if obstacles_union.is_empty:
-        return False
-
+    rep = instrument.report()
+    t = time.perf_counter() if rep is not None else 0.0
     seg = LineString([p0, p1])
+    # obstacles within eps, not just those it meets: a segment along an edge may miss
+    # the edge by rounding
+    if isinstance(obstacles_union, SceneIndex):
+        index = obstacles_union
+        hits = [] if index.union.is_empty else index.tree.query(seg, predicate="dwithin", distance=eps).tolist()
+        touched = [index.polygons[k] for k in hits]
+    elif obstacles_union.is_empty or not seg.dwithin(obstacles_union, eps):
+        touched = []
+    else:
+        touched = [obstacles_union]
+    inter = unary_union([seg.intersection(poly) for poly in touched]) if touched else None
+    if rep is not None:
+        rep.add_time("shapely.intersection", time.perf_counter() - t)
+    if inter is None:
+        return False
 
-    if not seg.intersects(obstacles_union):
+    # touching at an endpoint is OK, including a sliver within eps of it (an endpoint
+    # that is on an edge only up to rounding)
+    for part in getattr(inter, "geoms", (inter,)):
+        cs = list(part.coords)
+        if not (all(_near(c, p0, eps) for c in cs) or all(_near(c, p1, eps) for c in cs)):
+            return True
+    # ...unless, for the same reason, a segment along an edge only meets it at its ends
+    # (or not at all)
+    if abs(p1[0] - p0[0]) <= eps and abs(p1[1] - p0[1]) <= eps:
         return False
+    probes = [Point(p0[0] + f * (p1[0] - p0[0]), p0[1] + f * (p1[1] - p0[1])) for f in (0.25, 0.5, 0.75)]
+    return any(all(poly.boundary.distance(pt) <= eps for pt in probes) for poly in touched)
 
-    inter = seg.intersection(obstacles_union)
+_ERRBOUND = 3.3306690738754716e-16  # Shewchuk's ccwerrboundA
 
-    if inter.is_empty:
-        return False
+def orient(o: Coord, a: Coord, b: Coord) -> float:
+    """Orientation of (o, a, b): > 0 left turn, < 0 right turn, 0 collinear (exact sign)."""
+    left = (a[0] - o[0]) * (b[1] - o[1])
+    right = (a[1] - o[1]) * (b[0] - o[0])
+    det = left - right
+    if abs(det) > _ERRBOUND * (abs(left) + abs(right)):
+        return det
+    ox, oy = Fraction(o[0]), Fraction(o[1])
+    return float((Fraction(a[0]) - ox) * (Fraction(b[1]) - oy) - (Fraction(a[1]) - oy) * (Fraction(b[0]) - ox))
+
+def _orient_sign(ox, oy, ax, ay, bx, by) -> np.ndarray:
+    """Vectorized exact sign of orient((ox, oy), (ax, ay), (bx, by)) over 1-D arrays."""
+    left = (ax - ox) * (by - oy)
+    right = (ay - oy) * (bx - ox)
+    det = left - right
+    sign = np.sign(det)
+    # only near-degenerate triples fall back to exact rational arithmetic; a repeated
+    # point already gives an exact zero
+    unsure = np.abs(det) <= _ERRBOUND * (np.abs(left) + np.abs(right))
+    if unsure.any():
+        unsure &= ~(((ax == ox) & (ay == oy)) | ((bx == ox) & (by == oy)) | ((ax == bx) & (ay == by)))
+        for k in np.flatnonzero(unsure).tolist():
+            sign[k] = np.sign(orient((ox[k], oy[k]), (ax[k], ay[k]), (bx[k], by[k])))
+    return sign
+
+@dataclass(frozen=True, eq=False)
+class ObstacleEdges:
+    """
+    Flat array view of the obstacle boundaries, for the vectorized visibility kernel.
+    - a, b: (E, 2) float arrays with the endpoints of every edge, rings oriented CCW.
+    - owner: (E,) obstacle index of each edge.
+    - prev: (E,) index of the edge ending at a[k].
+    - reflex: (E,) True where the interior angle at a[k] exceeds pi.
+    - lo, hi: (E, 2) edge bounding boxes.
+    """
+    a: np.ndarray
+    b: np.ndarray
+    owner: np.ndarray
+    prev: np.ndarray
+    reflex: np.ndarray
+    lo: np.ndarray
+    hi: np.ndarray
+
+    @classmethod
+    def from_obstacles(cls, obstacles: Iterable[Obstacle]) -> "ObstacleEdges":
+        rings = []
+        for obs in obstacles:
+            ring = np.asarray(obs.vertices, dtype=float).reshape(-1, 2)
+            if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+                ring = ring[:-1]
+            if len(ring) < 3:
+                continue
+            nxt = np.roll(ring, -1, axis=0)
+            if np.sum(ring[:, 0] * nxt[:, 1] - ring[:, 1] * nxt[:, 0]) < 0:
+                ring = ring[::-1]
+            rings.append(ring)
+        if not rings:
+            rings = [np.zeros((0, 2))]
+        sizes = [len(r) for r in rings]
+        starts = np.cumsum([0] + sizes[:-1])
+        a = np.vstack(rings)
+        b = np.vstack([np.roll(r, -1, axis=0) for r in rings])
+        owner = np.repeat(np.arange(len(rings)), sizes)
+        prev = np.concatenate([s + np.roll(np.arange(m), 1) for s, m in zip(starts, sizes)]).astype(np.intp)
+        pa = a[prev]
+        turn = _orient_sign(pa[:, 0], pa[:, 1], a[:, 0], a[:, 1], b[:, 0], b[:, 1])
+        return cls(a=a, b=b, owner=owner, prev=prev, reflex=turn < 0,
+                   lo=np.minimum(a, b), hi=np.maximum(a, b))
+
+    @property
+    def is_empty(self) -> bool:
+        return len(self.a) == 0
+
+    @property
+    def n_obstacles(self) -> int:
+        return int(self.owner[-1]) + 1 if len(self.owner) else 0
+
+def _blocked_chunk(p0: np.ndarray, p1: np.ndarray, edges: ObstacleEdges, eps: float) -> np.ndarray:
+    """Blocked flags for a chunk of segments (S, 2) against every obstacle edge."""
+    n = len(p0)
+    seg_lo, seg_hi = np.minimum(p0, p1), np.maximum(p0, p1)
+    # only (segment, edge) pairs whose bounding boxes overlap (up to eps) can touch
+    box_lo, box_hi = edges.lo - eps, edges.hi + eps
+    near = (box_lo[None, :, 0] <= seg_hi[:, None, 0]) & (box_hi[None, :, 0] >= seg_lo[:, None, 0]) \
+        & (box_lo[None, :, 1] <= seg_hi[:, None, 1]) & (box_hi[None, :, 1] >= seg_lo[:, None, 1])
+    si, ei = np.nonzero(near)
+    px, py = p0[si, 0], p0[si, 1]
+    qx, qy = p1[si, 0], p1[si, 1]
+    ax, ay = edges.a[ei, 0], edges.a[ei, 1]
+    bx, by = edges.b[ei, 0], edges.b[ei, 1]
+    dx, dy = qx - px, qy - py
+    seg_len = np.hypot(dx, dy)
+
+    s1 = _orient_sign(px, py, qx, qy, ax, ay)
+    s2 = _orient_sign(px, py, qx, qy, bx, by)
+    s3 = _orient_sign(ax, ay, bx, by, px, py)
+    s4 = _orient_sign(ax, ay, bx, by, qx, qy)
+    collinear = (s1 == 0) & (s2 == 0)
+    touching = ~collinear & (s1 * s2 <= 0) & (s3 * s4 <= 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Proper case: a single contact point, allowed only within eps of p0 / p1
+        # (exactly so when p0 or p1 lies on the edge's line).
+        ex, ey = bx - ax, by - ay
+        t = ((ax - px) * ey - (ay - py) * ex) / (dx * ey - dy * ex)
+        t_tol = eps / seg_len
+        crossing = touching & (s3 != 0) & (s4 != 0) & (t > t_tol) & (t < 1.0 - t_tol)
+
+    # Collinear case: block on an overlap longer than eps (shorter ones are endpoint
+    # touches), measured on the segment's dominant axis (the bounding boxes already
+    # overlap on the other one). A segment whose ends are only within eps of the edge's
+    # line runs along it too.
+    use_x = np.abs(dx) >= np.abs(dy)
+    k_lo = np.where(use_x, seg_lo[si, 0], seg_lo[si, 1])
+    k_hi = np.where(use_x, seg_hi[si, 0], seg_hi[si, 1])
+    e_lo = np.where(use_x, edges.lo[ei, 0], edges.lo[ei, 1])
+    e_hi = np.where(use_x, edges.hi[ei, 0], edges.hi[ei, 1])
+    shared = np.minimum(k_hi, e_hi) - np.maximum(k_lo, e_lo)
+    ex_len = np.hypot(ex, ey)
+    p_off, q_off = ex * (py - ay) - ey * (px - ax), ex * (qy - ay) - ey * (qx - ax)
+    near_collinear = (np.abs(p_off) <= eps * ex_len) & (np.abs(q_off) <= eps * ex_len)
+    overlap = (collinear | near_collinear) & (shared > eps)
+
+    # Endpoint on the boundary: the segment must leave into free space there. Interior
+    # lies left of every (CCW) edge; at a reflex vertex, left of either incident edge.
+    # Inside an edge, "on" allows the same eps as the crossing test (an edge midpoint
+    # is rarely exactly on its edge).
+    inward = np.zeros_like(collinear)
+    ends_on_edge = []
+    for (ux, uy), (fx, fy), off, s_far in (((px, py), (qx, qy), p_off, s4), ((qx, qy), (px, py), q_off, s3)):
+        at_a = (ux == ax) & (uy == ay)
+        on_inner = (np.abs(off) <= eps * ex_len) \
+            & ~_near_many(ux, uy, ax, ay, eps) & ~_near_many(ux, uy, bx, by, eps) \
+            & (box_lo[ei, 0] <= ux) & (ux <= box_hi[ei, 0]) & (box_lo[ei, 1] <= uy) & (uy <= box_hi[ei, 1])
+        inward |= on_inner & (s_far > 0)
+        on_edge = np.zeros(n, dtype=bool)
+        on_edge[si[on_inner]] = True
+        ends_on_edge.append(on_edge)
+        k = np.flatnonzero(at_a)
+        if len(k):
+            pe = edges.prev[ei[k]]
+            left_prev = _orient_sign(edges.a[pe, 0], edges.a[pe, 1], ax[k], ay[k], fx[k], fy[k]) > 0
+            left_here = s_far[k] > 0
+            inward[k] |= np.where(edges.reflex[ei[k]], left_here | left_prev, left_here & left_prev)
+
+    blocked = np.zeros(n, dtype=bool)
+    blocked[si[(crossing | overlap | inward) & (seg_len > 0.0)]] = True
+
+    # A segment that only meets the boundary at its endpoints is either entirely inside
+    # or entirely outside an obstacle, so an even-odd test of one interior point settles
+    # it. The midpoint is used unless it lands on a boundary (near-degenerate grazes).
+    inside, on_boundary = _inside_chunk(0.5 * (p0 + p1), edges)
+    for frac in (0.25, 0.75):
+        if not on_boundary.any():
+            break
+        redo = np.flatnonzero(on_boundary)
+        inside[redo], on_boundary[redo] = _inside_chunk(p0[redo] + frac * (p1[redo] - p0[redo]), edges)
+    # on the boundary at all three, it runs along an edge: blocked above unless within eps
+    inside &= ~on_boundary
+
+    # An endpoint strictly inside an obstacle always leaves a (possibly tiny) overlap,
+    # even when the crossing itself is within eps of that endpoint.
+    for end, on_edge in zip((p0, p1), ends_on_edge):
+        end_inside, end_on_boundary = _inside_chunk(end, edges)
+        blocked |= end_inside & ~end_on_boundary & ~on_edge
+    return blocked | inside
+
+def _near_many(ux, uy, vx, vy, tol: float) -> np.ndarray:
+    """Vectorized `_near`."""
+    return (np.abs(ux - vx) <= tol) & (np.abs(uy - vy) <= tol)
+
+def segments_hit_box(p0s, p1s, lo: Coord, hi: Coord) -> np.ndarray:
+    """(S,) bool array, True where segment p0s[k] -> p1s[k] meets the closed box [lo, hi] (slab clipping)."""
+    p0s = np.asarray(p0s, dtype=float).reshape(-1, 2)
+    p1s = np.asarray(p1s, dtype=float).reshape(-1, 2)
+    p0s, p1s = np.broadcast_arrays(p0s, p1s)
+    d = p1s - p0s
+    t_in = np.zeros(len(p0s))
+    t_out = np.ones(len(p0s))
+    for k in (0, 1):
+        flat = d[:, k] == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ta = (lo[k] - p0s[:, k]) / d[:, k]
+            tb = (hi[k] - p0s[:, k]) / d[:, k]
+        in_slab = (lo[k] <= p0s[:, k]) & (p0s[:, k] <= hi[k])
+        t_in = np.maximum(t_in, np.where(flat, np.where(in_slab, -np.inf, np.inf), np.minimum(ta, tb)))
+        t_out = np.minimum(t_out, np.where(flat, np.where(in_slab, np.inf, -np.inf), np.maximum(ta, tb)))
+    return t_in <= t_out
+
+def _inside_chunk(pts: np.ndarray, edges: ObstacleEdges) -> Tuple[np.ndarray, np.ndarray]:
+    """Even-odd point-in-obstacle flags and on-boundary flags for a chunk of points (S, 2)."""
+    n = len(pts)
+    mx, my = pts[:, 0:1], pts[:, 1:2]
+    ay, by = edges.a[None, :, 1], edges.b[None, :, 1]
+    straddles = (ay > my) != (by > my)
+    in_box = (edges.lo[None, :, 0] <= mx) & (mx <= edges.hi[None, :, 0]) \
+        & (edges.lo[None, :, 1] <= my) & (my <= edges.hi[None, :, 1])
+    pi, ei = np.nonzero((straddles & (edges.hi[None, :, 0] >= mx)) | in_box)
+    side = _orient_sign(edges.a[ei, 0], edges.a[ei, 1], edges.b[ei, 0], edges.b[ei, 1], pts[pi, 0], pts[pi, 1])
+    # the horizontal ray from m hits an upward edge iff m is left of it (and vice versa)
+    hits = straddles[pi, ei] & (side == np.sign(edges.b[ei, 1] - edges.a[ei, 1]))
+    keys, counts = np.unique(pi[hits] * edges.n_obstacles + edges.owner[ei[hits]], return_counts=True)
+    inside = np.zeros(n, dtype=bool)
+    inside[keys[counts % 2 == 1] // edges.n_obstacles] = True
+    on_boundary = np.zeros(n, dtype=bool)
+    on_boundary[pi[in_box[pi, ei] & (side == 0)]] = True
+    return inside, on_boundary
+
+def _as_edges(obstacles) -> ObstacleEdges:
+    if isinstance(obstacles, ObstacleEdges):
+        return obstacles
+    if isinstance(obstacles, SceneIndex):
+        return obstacles.edges
+    return ObstacleEdges.from_obstacles(obstacles)
+
+def points_inside(pts, obstacles: Union[ObstacleEdges, "SceneIndex", Iterable[Obstacle]], *, chunk_elems: int = 1 << 20) -> np.ndarray:
+    """(S,) bool array, True where a point lies inside an obstacle (boundary points are unspecified)."""
+    edges = _as_edges(obstacles)
+    pts = np.asarray(pts, dtype=float).reshape(-1, 2)
+    out = np.zeros(len(pts), dtype=bool)
+    if edges.is_empty or len(pts) == 0:
+        return out
+    step = max(1, chunk_elems // len(edges.a))
+    for s in range(0, len(pts), step):
+        out[s:s + step] = _inside_chunk(pts[s:s + step], edges)[0]
+    return out
+
+def visible_many(
+    p0s,
+    p1s,
+    obstacles: Union[ObstacleEdges, "SceneIndex", Iterable[Obstacle]],
+    *,
+    eps: float = 1e-9,
+    chunk_elems: int = 1 << 20,
+) -> np.ndarray:
+    """
+    Vectorized `visible` for a batch of segments p0s[k] -> p1s[k].
+
+    Same semantics as `segment_intersects_obstacles`: a segment may touch an obstacle
+    at its endpoints, but any other contact (crossing, grazing a vertex, running along
+    an edge, passing through an interior) blocks it.
+
+    Args:
+      p0s, p1s: (S, 2) arrays (or a single (2,) point, broadcast against the other side)
+      obstacles: precomputed ObstacleEdges or SceneIndex, or the obstacles themselves
+      chunk_elems: bound on segments x edges per vectorized block (memory cap)
+
+    Returns:
+      (S,) bool array, True where the segment is collision-free.
+    """
+    edges = _as_edges(obstacles)
+    p0s = np.asarray(p0s, dtype=float).reshape(-1, 2)
+    p1s = np.asarray(p1s, dtype=float).reshape(-1, 2)
+    p0s, p1s = np.broadcast_arrays(p0s, p1s)
+    n = len(p0s)
+    rep = instrument.report()
+    if rep is not None:
+        rep.add("visible_many.calls")
+        rep.add("visible_many.segments", n)
+    out = np.ones(n, dtype=bool)
+    if edges.is_empty or n == 0:
+        return out
+    step = max(1, chunk_elems // len(edges.a))
+    for s in range(0, n, step):
+        out[s:s + step] = ~_blocked_chunk(p0s[s:s + step], p1s[s:s + step], edges, eps)
+    return out
+
+class SceneIndex:
+    """
+    Preprocessed geometry of one obstacle set, shared by every query against it:
+    the union (plain and prepared), an STRtree over the individual obstacles, the
+    flat edge arrays for `visible_many` and the convex vertices. Each part is built
+    on first use. `Scene.index` keeps one per scene and rebuilds it when the
+    obstacles change.
+    """
+    def __init__(self, obstacles: Iterable[Obstacle]):
+        self.obstacles: Tuple[Obstacle, ...] = tuple(obstacles)
+
+    @cached_property
+    def polygons(self) -> List[Polygon]:
+        return [o.polygon() for o in self.obstacles]
+
+    @cached_property
+    def union(self) -> Polygon:
+        return unary_union(self.polygons) if self.polygons else Polygon()
+
+    @cached_property
+    def prepared(self):
+        return prep(self.union)
+
+    @cached_property
+    def tree(self) -> STRtree:
+        return STRtree(self.polygons)
+
+    @cached_property
+    def edges(self) -> ObstacleEdges:
+        return ObstacleEdges.from_obstacles(self.obstacles)
 
-    if inter.geom_type == "Point":
-        pt = (inter.x, inter.y)
-        if _near(pt, p0, eps) or _near(pt, p1, eps):
-            return False  # touching at endpoint is OK
+    @cached_property
+    def convex_vertices(self) -> Tuple[Coord, ...]:
+        return tuple(extract_convex_vertices(list(self.obstacles)))
 
-    if inter.geom_type == "MultiPoint":
-        pts = [(g.x, g.y) for g in inter.geoms]
-        if all(_near(pt, p0, eps) or _near(pt, p1, eps) for pt in pts):
-            return False
+    def __getstate__(self):
+        # ship the array parts already built; shapely objects (prepared geometries do
+        # not pickle) are rebuilt lazily on the other side
+        return {k: v for k, v in self.__dict__.items() if k in ("obstacles", "edges", "convex_vertices")}
 
-    return True
\ No newline at end of file
+    def __setstate__(self, state):
+        self.__dict__.update(state)
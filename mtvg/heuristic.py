@@ -0,0 +1,476 @@
+# mtvg/heuristic.py
+"""
+Fast feasible tours for the moving-target TSP, as warm starts and upper bounds.
+
+A moving target is only cheap to reach near the time the tour actually gets to
+it, so the tour is planned on a static surrogate pinned to estimated
+interception times, and checked exactly at the end:
+  1. A nearest-neighbour sweep guesses when each target is caught: from the last
+     catch, the target with the earliest estimated catch comes next.
+  2. Target k is stood in for by its position r_k at that time. Legs cost
+     c[i, j] = (obstacle-avoiding distance r_i -> r_j) / v, from the visibility
+     graph's all-pairs distances. Node-to-target visibility comes from the interval
+     table, so no segment tests are needed for those legs.
+  3. Cheapest feasible insertion builds a tour. Each target's time window is the
+     stretch of time it is visible around its estimated time, narrowed to
+     +-`band` times the sweep's duration. Then 2-opt (segment reversal) and or-opt
+     (moving a chain of up to `or_opt` targets, in either orientation) improve the
+     tour, with the windows widened back to the whole visible stretch.
+  4. The order is simulated with `MTTSPSolver`'s own successor steps: earliest
+     interception, leg by leg, then back to the depot.
+     `polish` more rounds re-pin the targets to the simulated times, repeat the local
+     search and simulate again; the best simulated tour wins. The simulation is most
+     of the running time, so each round costs about as much as the first.
+
+Moves are checked against the time windows by segment concatenation (Kindervater &
+Savelsbergh; Vidal et al. 2013). A stretch of the tour is summed up by four
+numbers:
+  - its duration D;
+  - its time warp TW, the lateness the windows force (0 iff feasible);
+  - the earliest and latest start times E and L that avoid waiting or warp.
+Joining two stretches is O(1). The tables F[x, y] (forward) and R[x, y] (reversed)
+hold every stretch of up to `span` positions, plus every prefix and suffix, so each
+2-opt or or-opt move is priced from three or four table entries. Prices are
+computed for all moves at once, in one NumPy pass per move type, and no move
+re-simulates the tour.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+import math
+import numpy as np
+
+from .geometry import Coord, visible_many
+from .interception import InterceptionEngine
+from .interval_set import IntervalSet
+from .solver import DEPOT, MTTSPSolver
+
+Segment = Tuple  # (D, TW, E, L): floats, or NumPy arrays of one shape
+
+_WARP = 1e6  # weight of time warp against duration when ranking infeasible tours
+_EPS = 1e-9
+
+@dataclass
+class HeuristicTour:
+    order: List[int]               # target indices, in visiting order
+    tour: List[Tuple[int, float]]  # (target id, interception time), as in solver.Solution
+    cost: float                    # time of return to the depot (exact)
+    surrogate_cost: float          # the same order's cost on the surrogate
+    moves: int                     # improving 2-opt / or-opt moves applied
+
+def _join(a: Segment, c: float, b: Segment) -> Segment:
+    """Stretch a, a leg of travel time c, then stretch b (floats)."""
+    D1, TW1, E1, L1 = a
+    D2, TW2, E2, L2 = b
+    delta = D1 - TW1 + c
+    wait = max(E2 - delta - L1, 0.0)
+    warp = max(E1 + delta - L2, 0.0)
+    return (D1 + D2 + c + wait, TW1 + TW2 + warp, max(E2 - delta, E1) - wait, min(L2 - delta, L1) + warp)
+
+def _join_many(a: Segment, c, b: Segment) -> Segment:
+    """`_join` elementwise over arrays (broadcast)."""
+    D1, TW1, E1, L1 = a
+    D2, TW2, E2, L2 = b
+    delta = D1 - TW1 + c
+    wait = np.maximum(E2 - delta - L1, 0.0)
+    warp = np.maximum(E1 + delta - L2, 0.0)
+    return (D1 + D2 + c + wait, TW1 + TW2 + warp,
+            np.maximum(E2 - delta, E1) - wait, np.minimum(L2 - delta, L1) + warp)
+
+def _score(s: Segment):
+    return s[0] + _WARP * s[1]
+
+class _Sightings:
+    """The interval table flattened to one row per interval: node, target, start, end."""
+    def __init__(self, engine: InterceptionEngine):
+        table = engine.table
+        ns = table.n_slots
+        cell = np.repeat(np.arange(table.n_nodes * ns), np.diff(table.offsets))
+        self.node, slot = np.divmod(cell, ns)
+        self.target = np.searchsorted(table.window_offsets, slot, side="right") - 1
+        self.starts, self.ends = table.starts, table.ends
+        self.shape = (len(engine.targets), table.n_nodes)
+
+    def seen(self, times: Union[float, Sequence[float]]) -> np.ndarray:
+        """(n_targets, n_nodes) bool: whether node u sees target k at times[k] (or at one time)."""
+        t = np.asarray(times, dtype=float)
+        if t.ndim:
+            t = t[self.target]
+        hit = (self.starts <= t) & (t <= self.ends)
+        out = np.zeros(self.shape, dtype=bool)
+        out[self.target[hit], self.node[hit]] = True
+        return out
+
+    def catchable(self, k: int) -> IntervalSet:
+        """Times some graph node sees target k."""
+        mine = self.target == k
+        return IntervalSet(self.starts[mine], self.ends[mine])
+
+def travel_times(engine: InterceptionEngine, points: Sequence[Coord], visible: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    (m, m) matrix of shortest obstacle-avoiding travel times between points: the
+    direct leg where it is visible, otherwise a leg to a visible graph node, the
+    graph's all-pairs distance, and a leg from a visible graph node. Pairs with no
+    such route get the straight-line time. `visible` (m, n_nodes), if given, says
+    which nodes each point sees.
+    """
+    pts = np.asarray(points, dtype=float).reshape(-1, 2)
+    nodes, index = engine.nodes, engine.scene.index
+    m, n = len(pts), len(nodes)
+    leg = np.hypot(pts[:, None, 0] - nodes[None, :, 0], pts[:, None, 1] - nodes[None, :, 1])
+    if visible is None:
+        visible = visible_many(np.repeat(pts, n, axis=0), np.tile(nodes, (m, 1)), index).reshape(m, n)
+    leg[~visible] = np.inf
+    d = np.full((m, m), np.inf)
+    for i in range(m):
+        ok = visible[i]
+        if ok.any():
+            to_nodes = np.min(leg[i, ok][:, None] + engine.dist[ok], axis=0)  # via the first node seen
+            d[i] = np.min(to_nodes[None, :] + leg, axis=1)
+    a, b = np.triu_indices(m, 1)
+    ok = visible_many(pts[a], pts[b], index)
+    a, b = a[ok], b[ok]
+    direct = np.hypot(*(pts[a] - pts[b]).T)
+    d[a, b] = np.minimum(d[a, b], direct)
+    d[b, a] = np.minimum(d[b, a], direct)
+    np.fill_diagonal(d, 0.0)
+    # a point no graph node sees (a target inside an obstacle) keeps the surrogate
+    # finite with the straight line; such a target is caught elsewhere anyway
+    gone = ~np.isfinite(d)
+    d[gone] = np.hypot(pts[:, None, 0] - pts[None, :, 0], pts[:, None, 1] - pts[None, :, 1])[gone]
+    return d / engine.v
+
+class _Surrogate:
+    """Static TSP with time windows over matrix indices: 0 is the depot, k + 1 target k."""
+    def __init__(self, cost: np.ndarray, opens: np.ndarray, closes: np.ndarray):
+        self.c = cost
+        self.opens, self.closes = opens, closes
+
+    def vertex(self, i: int, end: bool = False) -> Segment:
+        if i == 0:
+            return (0.0, 0.0, 0.0, math.inf if end else 0.0)  # leave at 0, return any time
+        return (0.0, 0.0, float(self.opens[i]), float(self.closes[i]))
+
+    def vertices(self, route: np.ndarray) -> Segment:
+        e, l = self.opens[route].copy(), self.closes[route].copy()
+        e[0] = l[0] = e[-1] = 0.0
+        l[-1] = math.inf
+        zero = np.zeros(len(route))
+        return (zero, zero, e, l)
+
+    def route_segment(self, route: Sequence[int]) -> Segment:
+        s = self.vertex(route[0])
+        for k in range(1, len(route)):
+            s = _join(s, float(self.c[route[k - 1], route[k]]), self.vertex(route[k], end=k == len(route) - 1))
+        return s
+
+    # construction
+
+    def insert_all(self) -> List[int]:
+        """
+        Cheapest insertion: repeatedly the (target, position) pair that adds the least.
+        Inserting after position i leaves the prefixes up to i and the suffixes from
+        i + 1 as they were, so only the others are joined again.
+        """
+        c = self.c.tolist()
+        route = [0, 0]
+        # P[i]: positions 0..i; S[i]: positions i + 1..end; the gap after i joins the two
+        P, S = [self.vertex(0)], [self.vertex(0, end=True)]
+        todo = np.arange(1, len(self.c))
+        while len(todo):
+            Pa, Sa = tuple(np.array(P).T), tuple(np.array(S).T)
+            r = np.asarray(route)
+            k = todo[:, None]
+            V = (0.0, 0.0, self.opens[k], self.closes[k])
+            score = _score(_join_many(_join_many(Pa, self.c[r[None, :-1], k], V), self.c[k, r[None, 1:]], Sa))
+            a, i = np.unravel_index(np.argmin(score), score.shape)
+            x, i = int(todo[a]), int(i)
+            todo = np.delete(todo, a)
+            route.insert(i + 1, x)
+            S.insert(i, S[i])  # the suffixes after the new position are unchanged
+            del P[i + 1:]
+            for j in range(i + 1, len(route) - 1):
+                P.append(_join(P[-1], c[route[j - 1]][route[j]], self.vertex(route[j])))
+            for j in range(i, -1, -1):
+                S[j] = _join(self.vertex(route[j + 1]), c[route[j + 1]][route[j + 2]], S[j + 1])
+        return route
+
+    # local search
+
+    def _tables(self, route: np.ndarray, span: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (4, m, m) arrays: F[:, x, y] is positions x..y in order and R[:, x, y] the same
+        reversed, for y - x <= span; F also holds every prefix F[:, 0, y] and suffix F[:, x, m - 1].
+        """
+        m = len(route)
+        V = np.array(self.vertices(route))
+        F = np.full((4, m, m), np.nan)
+        R = np.full((4, m, m), np.nan)
+        x = np.arange(m)
+        F[:, x, x] = R[:, x, x] = V
+        fwd = self.c[route[:-1], route[1:]]
+        back = self.c[route[1:], route[:-1]]
+        for L in range(1, min(span, m - 1) + 1):
+            x = np.arange(m - L)
+            y = x + L
+            F[:, x, y] = _join_many(tuple(F[:, x, y - 1]), fwd[y - 1], tuple(V[:, y]))
+            R[:, x, y] = _join_many(tuple(V[:, y]), back[y - 1], tuple(R[:, x, y - 1]))
+        vs = [tuple(v) for v in V.T.tolist()]
+        vs[-1] = self.vertex(0, end=True)
+        fwd = fwd.tolist()
+        for y in range(span + 1, m):
+            F[:, 0, y] = _join(tuple(F[:, 0, y - 1]), fwd[y - 1], vs[y])
+        for x in range(m - 2 - span, -1, -1):
+            F[:, x, m - 1] = _join(vs[x], fwd[x], tuple(F[:, x + 1, m - 1]))
+        return F, R
+
+    def _moves(self, route: np.ndarray, or_opt: int, span: int):
+        """
+        Every 2-opt and or-opt move within `span` positions, priced, as a list of
+        (score, lo, hi, make): move k rewrites route[lo[k]:hi[k] + 1] to make(k).
+        """
+        F, R = self._tables(route, span)
+        c, m, last = self.c, len(route), len(route) - 1
+        seg = lambda T, x, y: tuple(T[:, x, y])
+        out = []
+
+        # 2-opt: reverse positions i+1..j
+        i, j = _ranges(np.arange(0, m - 3), np.arange(2, m - 1), span, m - 2)
+        s = _join_many(_join_many(seg(F, 0, i), c[route[i], route[j]], seg(R, i + 1, j)),
+                       c[route[i + 1], route[j + 1]], seg(F, j + 1, last))
+        out.append((_score(s), i + 1, j, lambda k, i=i, j=j: route[j[k]:i[k]:-1]))
+
+        # or-opt: move positions a..b behind position p, as they are (F) or reversed (R)
+        for length in range(1, or_opt + 1):
+            a_all = np.arange(1, m - length)
+            for T, flip in ((F, False), (R, True)) if length > 1 else ((F, False),):
+                for ahead in (True, False):
+                    if ahead:  # p > b
+                        a, p = _ranges(a_all, a_all + length, span + 1, m - 2)
+                    else:      # p < a - 1
+                        p, a = _ranges(np.maximum(a_all - 2 - span, 0), a_all, span + 1, m - 2, reverse=True)
+                    if not len(a):
+                        continue
+                    b = a + length - 1
+                    head, tail = (route[b], route[a]) if flip else (route[a], route[b])
+                    chain = seg(T, a, b)
+                    if ahead:
+                        s = _join_many(seg(F, 0, a - 1), c[route[a - 1], route[b + 1]], seg(F, b + 1, p))
+                        s = _join_many(_join_many(s, c[route[p], head], chain), c[tail, route[p + 1]], seg(F, p + 1, last))
+                        lo, hi = a, p
+                    else:
+                        s = _join_many(_join_many(seg(F, 0, p), c[route[p], head], chain), c[tail, route[p + 1]],
+                                       seg(F, p + 1, a - 1))
+                        s = _join_many(s, c[route[a - 1], route[b + 1]], seg(F, b + 1, last))
+                        lo, hi = p + 1, b
+
+                    def make(k, a=a, b=b, p=p, flip=flip, ahead=ahead):
+                        a, b, p = int(a[k]), int(b[k]), int(p[k])
+                        chain = route[a:b + 1][::-1] if flip else route[a:b + 1]
+                        if ahead:
+                            return np.concatenate([route[b + 1:p + 1], chain])
+                        return np.concatenate([chain, route[p + 1:a]])
+                    out.append((_score(s), lo, hi, make))
+        return out
+
+    def improve(self, route: Sequence[int], or_opt: int = 3, span: int = 10,
+                max_moves: Optional[int] = None) -> Tuple[List[int], int]:
+        """
+        2-opt / or-opt down to a local optimum (or max_moves moves). Each pass prices
+        every move, then applies the improving ones that touch disjoint stretches of
+        the tour, best first; if together they do worse than the best alone, only it.
+        """
+        route = np.asarray(route)
+        current = _score(self.route_segment(route))
+        moves = 0
+        while max_moves is None or moves < max_moves:
+            tol = _EPS * max(1.0, abs(current))
+            cands = []
+            for score, lo, hi, make in self._moves(route, or_opt, span):
+                for k in np.flatnonzero(score < current - tol).tolist():
+                    cands.append((float(score[k]), int(lo[k]), int(hi[k]), make, k))
+            if not cands:
+                break
+            cands.sort(key=lambda e: e[0])
+            limit = len(cands) if max_moves is None else max_moves - moves
+            taken: List[Tuple[int, int]] = []
+            new = route.copy()
+            for score, lo, hi, make, k in cands:
+                if len(taken) == limit:
+                    break
+                if all(hi + 1 < a or b + 1 < lo for a, b in taken):  # no shared position or leg
+                    new[lo:hi + 1] = make(k)
+                    taken.append((lo, hi))
+            joint = _score(self.route_segment(new))
+            if len(taken) > 1 and joint > cands[0][0]:
+                score, lo, hi, make, k = cands[0]
+                new = route.copy()
+                new[lo:hi + 1] = make(k)
+                joint, taken = score, taken[:1]
+            route, current = new, joint
+            moves += len(taken)
+        return route.tolist(), moves
+
+def _ranges(first: np.ndarray, start: np.ndarray, width: int, stop: int, reverse: bool = False):
+    """
+    Pairs (first[r], v) for v in start[r] .. min(start[r] + width - 1, stop), flattened;
+    with reverse, v runs over first[r] .. start[r] - 2 and the pairs are (v, start[r]).
+    """
+    if reverse:
+        lo, hi, owner = first, start - 2, start
+    else:
+        lo, hi, owner = start, np.minimum(start + width - 1, stop), first
+    n = np.maximum(hi - lo + 1, 0)
+    rows = np.repeat(np.arange(len(lo)), n)
+    v = np.arange(int(n.sum())) - np.repeat(np.cumsum(n) - n, n) + np.repeat(lo, n)
+    return (v, owner[rows]) if reverse else (owner[rows], v)
+
+def _sweep(engine: InterceptionEngine, sightings: _Sightings, seen: List[IntervalSet],
+           depot_sees: np.ndarray, batch: int = 8) -> Tuple[List[int], List[float]]:
+    """
+    Nearest-neighbour order and estimated interception times: from the last catch,
+    the target whose estimated catch (the leg to where it is now, or its next
+    visible moment if later) comes first. The leg is the shorter of the direct one,
+    if visible, and the route through the graph nodes seen from both ends. Targets
+    are priced in batches in order of a lower bound (the straight-line leg), so only
+    the few that could come first get a visibility test.
+    """
+    targets, nodes, v, index = engine.targets, engine.nodes, engine.v, engine.scene.index
+    upper = np.array([w.upper for w in seen])
+    pos, t, sees = engine.scene.depot.xy, 0.0, depot_sees
+    todo = np.arange(len(targets))
+    order, times = [], []
+    while len(todo):
+        X = np.array([targets[k].xy(t) for k in todo.tolist()])
+        straight = np.hypot(X[:, 0] - pos[0], X[:, 1] - pos[1])
+        route = np.full(len(todo), np.inf)
+        if sees.any():
+            d_nodes = np.min(np.hypot(nodes[sees, 0] - pos[0], nodes[sees, 1] - pos[1])[:, None] + engine.dist[sees], axis=0)
+            to_x = np.hypot(X[:, None, 0] - nodes[None, :, 0], X[:, None, 1] - nodes[None, :, 1])
+            to_x[~sightings.seen(t)[todo]] = np.inf
+            route = np.min(d_nodes[None, :] + to_x, axis=1)
+        # no route at all: the straight line stands in, as if visible
+        route = np.where(np.isfinite(route), route, straight)
+        bound = np.minimum(t + straight / v, upper[todo])  # est >= bound
+        best, j_best = math.inf, -1
+        ranked = np.argsort(bound, kind="stable")
+        for s in range(0, len(ranked), batch):
+            js = ranked[s:s + batch]
+            if bound[js[0]] >= best:
+                break
+            leg = route[js]
+            shorter = straight[js] < leg
+            if shorter.any():
+                direct = visible_many(pos, X[js[shorter]], index)
+                leg[np.flatnonzero(shorter)[direct]] = straight[js[shorter]][direct]
+            for j, d in zip(js.tolist(), (leg / v).tolist()):
+                k = int(todo[j])
+                est = min(seen[k].next_feasible(t + d), seen[k].upper)
+                if est < best or (est == best and j < j_best):
+                    best, j_best = est, j
+        k, t = int(todo[j_best]), best
+        todo = np.delete(todo, j_best)
+        order.append(k)
+        times.append(t)
+        pos, sees = targets[k].xy(t), sightings.seen(t)[k]
+    return order, times
+
+def _as_solver(engine: Union[InterceptionEngine, MTTSPSolver]) -> MTTSPSolver:
+    if isinstance(engine, MTTSPSolver):
+        return engine
+    return MTTSPSolver(engine.scene, engine.targets, engine=engine)
+
+def simulate(engine: Union[InterceptionEngine, MTTSPSolver],
+             order: Sequence[int]) -> Optional[Tuple[List[int], List[float], float]]:
+    """
+    Follow the visiting order with the solver's own successor steps
+    (`MTTSPSolver.departure` and `earliest_intercept`), then return to the depot,
+    so the cost is the one the solver gives the same order. A target that can no
+    longer be caught in its turn is postponed: from then on the next target is the
+    one caught earliest. Returns (order actually followed, interception times,
+    return time), or None if some target cannot be caught.
+    """
+    S = _as_solver(engine)
+    last, t, pos = DEPOT, 0.0, S.scene.depot.xy
+    todo = list(order)
+    done, times = [], []
+    while todo:
+        t, pos, d_nodes = S.departure(last, t, pos)
+        k, t_k = todo[0], S.earliest_intercept(pos, t, todo[0], d_nodes)
+        if not math.isfinite(t_k):
+            t_k, k = min((S.earliest_intercept(pos, t, j, d_nodes), j) for j in todo)
+            if not math.isfinite(t_k):
+                return None
+        todo.remove(k)
+        done.append(k)
+        times.append(t_k)
+        last, t, pos = k, t_k, S.targets[k].xy(t_k)
+    t, pos, d_nodes = S.departure(last, t, pos)
+    back = t + float(d_nodes[S.depot_node]) / S.v
+    return (done, times, back) if math.isfinite(back) else None
+
+def build_tour(
+    engine: Union[InterceptionEngine, MTTSPSolver],
+    *,
+    polish: int = 0,
+    band: float = 0.05,
+    or_opt: int = 3,
+    span: int = 10,
+    max_moves: Optional[int] = None,
+) -> Optional[HeuristicTour]:
+    """
+    A feasible tour, built as in the module docstring; None if some target cannot be
+    caught. Moves shift targets by at most `span` positions. Accepts an
+    `MTTSPSolver` (its engine is used) or an `InterceptionEngine`, which has no
+    target limit.
+    """
+    solver = _as_solver(engine)
+    engine = solver.engine
+    targets = engine.targets
+    if not targets:
+        return HeuristicTour(order=[], tour=[], cost=0.0, surrogate_cost=0.0, moves=0)
+    sightings = _Sightings(engine)
+    seen = [sightings.catchable(k) for k in range(len(targets))]
+    if not all(seen):
+        return None  # a target no graph node ever sees
+    depot = engine.scene.depot.xy
+    depot_sees = visible_many(depot, engine.nodes, engine.scene.index)
+    order, est = _sweep(engine, sightings, seen, depot_sees)
+    times = np.zeros(len(targets))
+    times[order] = est
+
+    def surrogate(times: np.ndarray) -> Tuple[_Surrogate, np.ndarray, np.ndarray]:
+        """Surrogate pinned at `times`, with each target's visible stretch around them."""
+        points = [depot] + [tgt.xy(t) for tgt, t in zip(targets, times.tolist())]
+        visible = np.vstack([depot_sees, sightings.seen(times)])
+        opens, closes = np.zeros(len(targets) + 1), np.zeros(len(targets) + 1)
+        for k, t in enumerate(times.tolist()):
+            piece = min(int(seen[k].ends.searchsorted(t)), len(seen[k]) - 1)
+            opens[k + 1], closes[k + 1] = seen[k].starts[piece], seen[k].ends[piece]
+        return _Surrogate(travel_times(engine, points, visible), opens, closes), opens, closes
+
+    S, opens, closes = surrogate(times)
+    slack = band * float(np.max(times))
+    S.opens = np.maximum(opens, np.r_[0.0, times - slack])
+    S.closes = np.maximum(np.minimum(closes, np.r_[0.0, times + slack]), S.opens)
+    route = S.insert_all()
+    S.opens, S.closes = opens, closes
+    best: Optional[HeuristicTour] = None
+    moves = 0
+    for r in range(max(0, polish) + 1):
+        if r:
+            S = surrogate(times)[0]
+        route, k = S.improve(route, or_opt, span, max_moves)
+        moves += k
+        run = simulate(solver, [i - 1 for i in route[1:-1]])
+        if run is None:
+            break
+        done, caught, cost = run
+        if best is None or cost < best.cost:
+            best = HeuristicTour(order=done, tour=[(targets[k].id, t) for k, t in zip(done, caught)], cost=cost,
+                                 surrogate_cost=S.route_segment(route)[0], moves=moves)
+        route = [0] + [k + 1 for k in done] + [0]
+        times[done] = caught
+    if best is not None:
+        best.moves = moves
+    return best
@@ -0,0 +1,144 @@
+# mtvg/instrument.py
+"""
+Opt-in counters and stage timers for the hot paths.
+
+Off by default, and then every hook is a single global lookup. Turn it on
+  - for a block:       with instrumented() as rep: ...; print(rep)
+  - for a process:     MTVG_INSTRUMENT=1 (or true / yes / on; collect, read with
+                       `report()`), and/or MTVG_INSTRUMENT_FILE=path.json (collect and
+                       dump the report there at exit; unless MTVG_INSTRUMENT is set to
+                       0 / false / no / off, which wins). MTVG_INSTRUMENT values other
+                       than those raise ValueError on import.
+
+Recorded names:
+  counters  visible.calls, visible_many.calls, visible_many.segments,
+            refine.calls, refine.iterations (visibility bisection),
+            kinematic.bisect_iterations, lazy_graph.pairs_tested,
+            {dijkstra,astar,bidirectional_dijkstra,one_to_many}.{pops,pushes}
+  timers    shapely.intersection, build_visibility_graph.{index,nodes,edges,graph},
+            visible_intervals.{visibility,kinematic}
+
+Only the calling process is recorded; work done on a process pool (workers > 1)
+is not counted.
+"""
+from __future__ import annotations
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+import atexit
+import json
+import multiprocessing
+import os
+import time
+
+ENV_VAR = "MTVG_INSTRUMENT"
+FILE_ENV_VAR = "MTVG_INSTRUMENT_FILE"
+_ON_VALUES = ("1", "true", "yes", "on")
+_OFF_VALUES = ("", "0", "false", "no", "off")
+
+@dataclass
+class Timer:
+    seconds: float = 0.0
+    calls: int = 0
+
+@dataclass
+class Report:
+    counters: Dict[str, int] = field(default_factory=dict)
+    timers: Dict[str, Timer] = field(default_factory=dict)
+
+    def add(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name: str, seconds: float) -> None:
+        t = self.timers.get(name)
+        if t is None:
+            t = self.timers[name] = Timer()
+        t.seconds += seconds
+        t.calls += 1
+
+    def clear(self) -> None:
+        self.counters.clear()
+        self.timers.clear()
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "timers": {k: {"seconds": t.seconds, "calls": t.calls} for k, t in sorted(self.timers.items())},
+        }
+
+    def to_json(self, indent: Optional[int] = 1) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def __str__(self) -> str:
+        lines = [f"{k:<36} {v:>12}" for k, v in sorted(self.counters.items())]
+        lines += [f"{k:<36} {t.seconds * 1e3:>10.3f}ms  x{t.calls}" for k, t in sorted(self.timers.items())]
+        return "\n".join(lines)
+
+_active: Optional[Report] = None
+_OFF = nullcontext()
+
+def report() -> Optional[Report]:
+    """The report being recorded into, or None when instrumentation is off."""
+    return _active
+
+def count(name: str, n: int = 1) -> None:
+    rep = _active
+    if rep is not None:
+        rep.add(name, n)
+
+def count_heap_ops(name: str, pushed: int, left: int) -> None:
+    """Record a search's heap traffic as `name`.pushes and `name`.pops (left = still queued)."""
+    rep = _active
+    if rep is not None:
+        rep.add(f"{name}.pushes", pushed)
+        rep.add(f"{name}.pops", pushed - left)
+
+class _Stage:
+    __slots__ = ("rep", "name", "t")
+
+    def __init__(self, rep: Report, name: str):
+        self.rep, self.name = rep, name
+
+    def __enter__(self) -> None:
+        self.t = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.rep.add_time(self.name, time.perf_counter() - self.t)
+
+def stage(name: str):
+    """Context manager adding the wall time of its block to timer `name`."""
+    rep = _active
+    return _OFF if rep is None else _Stage(rep, name)
+
+@contextmanager
+def instrumented(rep: Optional[Report] = None) -> Iterator[Report]:
+    """Record into `rep` (a fresh Report by default) for the duration of the block."""
+    global _active
+    prev = _active
+    _active = rep if rep is not None else Report()
+    try:
+        yield _active
+    finally:
+        _active = prev
+
+def _from_env() -> None:
+    global _active
+    value = os.environ.get(ENV_VAR, "").strip().lower()
+    path = os.environ.get(FILE_ENV_VAR, "")
+    if value not in _ON_VALUES and value not in _OFF_VALUES:
+        raise ValueError(f"{ENV_VAR}={os.environ[ENV_VAR]!r}: expected one of {', '.join(_ON_VALUES + _OFF_VALUES[1:])}"
+                         f" (set {FILE_ENV_VAR} for a report file)")
+    # the file alone turns recording on only if MTVG_INSTRUMENT does not say otherwise
+    on = value in _ON_VALUES or (bool(path) and ENV_VAR not in os.environ)
+    if not on or multiprocessing.parent_process() is not None:
+        return  # off, or a pool worker of an instrumented process
+    _active = Report()
+    if path:
+        rep = _active
+
+        def dump() -> None:
+            with open(path, "w") as f:
+                f.write(rep.to_json())
+        atexit.register(dump)
+
+_from_env()
@@ -0,0 +1,197 @@
+# mtvg/interception.py
+"""
+Earliest-interception queries: leaving a point at time t_d, when can the agent
+first be at target k?
+
+For every graph node u and target k an `ArrivalFunction` a_uk(t') gives the earliest
+time the agent can catch k on a straight visible leg when leaving u at t'. It is
+piecewise over departure times: along each visible interval [alpha, beta] of (u, k),
+L(t) = t - |u - tau(t)| / v is the latest departure that still reaches tau(t). When
+the target is slower than the agent L is increasing, so a_uk(t') = alpha while
+t' <= L(alpha), then follows L^-1 up to L(beta), then jumps to the next interval. A
+faster target can make L turn down inside an interval (it recedes faster than the
+agent can follow), so an interval is only skipped once t' exceeds the maximum of L
+over it. For piecewise-linear trajectories that maximum is exact: L is concave on
+every linear piece, so it peaks at a piece end or where d|u - tau| / dt = v. Other
+trajectories are assumed to have L increasing, as in the bisection kinematic filter.
+Leaving node q at t_d, the answer is min_u a_uk(t_d + D[q, u] / v) over graph
+distances D.
+
+`InterceptionEngine.earliest_arrival` memoizes node queries in an LRU cache keyed on
+(node, target, t_d rounded up to a multiple of `quantum`); rounding up keeps every
+answer feasible, since the agent can always wait at q, at the price of leaving up to
+`quantum` late.
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+import math
+import numpy as np
+
+from .apsp import all_pairs_shortest_paths
+from .geometry import Coord, visible_many
+from .interval_table import IntervalTable, build_interval_table
+from .interval_set import IntervalSet
+from .intervals import TimeInterval, kinematic_filter, visible_intervals
+from .models import Scene, Target
+from .visibility_graph import Graph, NodeId, build_visibility_graph
+
+def _latest_departure_max(u: Coord, tau: Callable[[float], Coord], v: float, a: float, b: float) -> float:
+    """max of L(t) = t - |u - tau(t)| / v over [a, b]; exact for piecewise-linear tau, else L(b)."""
+    def latest_departure(t: float) -> float:
+        x, y = tau(t)
+        return t - math.hypot(x - u[0], y - u[1]) / v
+
+    bps = getattr(tau, "breakpoints", None)
+    if bps is None:
+        return latest_departure(b)
+    cuts = [a] + sorted(set(float(t) for t in bps if a < t < b)) + [b]
+    best = max(latest_departure(t) for t in cuts)
+    for lo, hi in zip(cuts[:-1], cuts[1:]):
+        (xa, ya), (xb, yb) = tau(lo), tau(hi)
+        speed = math.hypot(xb - xa, yb - ya) / (hi - lo) if hi > lo else 0.0
+        if speed <= v:
+            continue  # L is increasing on this piece
+        # along the direction of motion the offset from u grows at `speed`; the distance
+        # grows at rate v once along / |offset| = v / speed
+        ex, ey = (xb - xa) / (speed * (hi - lo)), (yb - ya) / (speed * (hi - lo))
+        dx, dy = xa - u[0], ya - u[1]
+        c = v / speed
+        along = c * abs(dx * ey - dy * ex) / math.sqrt(1.0 - c * c)
+        t = lo + (along - (dx * ex + dy * ey)) / speed
+        if lo < t < hi:
+            best = max(best, latest_departure(t))
+    return best
+
+class ArrivalFunction:
+    """a(t') for one node u and target trajectory tau; see the module docstring."""
+    __slots__ = ("u", "tau", "v", "alpha", "beta", "l_alpha", "l_max")
+
+    def __init__(self, u: Coord, tau: Callable[[float], Coord], v: float,
+                 intervals: Union[IntervalSet, Sequence[TimeInterval]]):
+        self.u, self.tau, self.v = u, tau, v
+        ivs = IntervalSet.from_pairs(intervals)
+        self.alpha = ivs.starts.tolist()
+        self.beta = ivs.ends.tolist()
+
+        def latest_departure(t: float) -> float:
+            x, y = tau(t)
+            return t - math.hypot(x - u[0], y - u[1]) / v
+        self.l_alpha = [latest_departure(a) for a in self.alpha]
+        # prefix maximum of max L per interval: the first index where it reaches t' is the
+        # first interval with any time reachable when leaving at t'
+        self.l_max: List[float] = []
+        m = -math.inf
+        for a, b in zip(self.alpha, self.beta):
+            m = max(m, _latest_departure_max(u, tau, v, a, b))
+            self.l_max.append(m)
+
+    def __bool__(self) -> bool:
+        return bool(self.alpha)
+
+    def __call__(self, t_dep: float) -> float:
+        j = bisect_left(self.l_max, t_dep)
+        while j < len(self.alpha):
+            if self.l_alpha[j] >= t_dep:
+                return self.alpha[j]
+            kin = kinematic_filter(self.u, self.tau, [(max(self.alpha[j], t_dep), self.beta[j])], t_dep, self.v)
+            if kin:
+                return kin.lower
+            j += 1
+        return math.inf
+
+class InterceptionEngine:
+    """
+    Earliest-interception queries over one scene and target list. The visibility graph,
+    its all-pairs distances and the interval table are built here unless passed in
+    (they must then cover the same nodes, depot first).
+    """
+    def __init__(
+        self,
+        scene: Scene,
+        targets: Sequence[Target],
+        *,
+        graph: Optional[Graph] = None,
+        dist: Optional[np.ndarray] = None,
+        table: Optional[IntervalTable] = None,
+        quantum: float = 1e-6,
+        cache_size: Optional[int] = 1 << 16,
+        workers: int = 1,
+        **interval_kwargs,
+    ):
+        self.scene = scene
+        self.targets = list(targets)
+        self.v = scene.v_max
+        self.quantum = quantum
+        self.interval_kwargs = interval_kwargs
+        self.graph = graph if graph is not None else build_visibility_graph(scene.index, [scene.depot.xy], workers=workers)
+        self.nodes = np.asarray(self.graph.nodes, dtype=float).reshape(-1, 2)
+        self.dist = dist if dist is not None else np.asarray(all_pairs_shortest_paths(self.graph, workers=workers).dist)
+        if table is None:
+            table = build_interval_table(scene, self.targets, self.graph.nodes, workers=workers, **interval_kwargs)
+        self.table = table
+        # per target: nodes with any visibility and their arrival functions
+        self.functions: List[Tuple[np.ndarray, List[ArrivalFunction]]] = []
+        for k, tgt in enumerate(self.targets):
+            us, fs = [], []
+            for u in range(len(self.nodes)):
+                ivs = table.target_intervals(u, k)
+                if ivs:
+                    us.append(u)
+                    fs.append(ArrivalFunction(tuple(self.nodes[u].tolist()), tgt.xy, self.v, ivs))
+            self.functions.append((np.asarray(us, dtype=np.int64), fs))
+        self._cached = lru_cache(maxsize=cache_size)(self._node_arrival)
+
+    def _via_nodes(self, d_nodes: np.ndarray, t: float, k: int, best: float = math.inf) -> float:
+        """min_u a_uk(t + d_nodes[u] / v)."""
+        us, fs = self.functions[k]
+        if len(us) == 0:
+            return best
+        t_u = (t + d_nodes[us] / self.v).tolist()
+        for i in sorted(range(len(fs)), key=t_u.__getitem__):
+            if t_u[i] >= best:
+                break  # arrival >= departure, and the rest leave even later
+            best = min(best, fs[i](t_u[i]))
+        return best
+
+    def _node_arrival(self, q: NodeId, k: int, step: int) -> float:
+        return self._via_nodes(self.dist[q], step * self.quantum, k)
+
+    def earliest_arrival(self, q: NodeId, t_d: float, target: int) -> float:
+        """
+        Earliest time at which an agent leaving graph node q at t_d (or later) can
+        catch target index `target`; inf if it never can. Memoized.
+        """
+        return self._cached(q, target, math.ceil(t_d / self.quantum))
+
+    def node_distances(self, p: Coord) -> np.ndarray:
+        """Shortest obstacle-avoiding distance from an arbitrary point p to every graph node."""
+        vis = np.flatnonzero(visible_many(p, self.nodes, self.scene.index))
+        if len(vis) == 0:
+            return np.full(len(self.nodes), math.inf)
+        leg = np.hypot(self.nodes[vis, 0] - p[0], self.nodes[vis, 1] - p[1])
+        return np.min(leg[:, None] + self.dist[vis], axis=0)
+
+    def arrival_from_point(self, p: Coord, t_d: float, target: int, d_nodes: Optional[np.ndarray] = None) -> float:
+        """
+        Like `earliest_arrival`, from an arbitrary point p (not memoized): the best of a
+        direct leg from p and the routes through the graph nodes.
+        """
+        if d_nodes is None:
+            d_nodes = self.node_distances(p)
+        tgt = self.targets[target]
+        best = math.inf
+        for win in tgt.windows:
+            if win[1] < t_d or win[0] >= best:
+                continue
+            direct = visible_intervals(p, tgt, win, self.scene, require_kinematic=True,
+                                       earliest_departure=t_d, **self.interval_kwargs)
+            best = min(best, direct.lower)
+        return self._via_nodes(d_nodes, t_d, target, best)
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    def cache_clear(self) -> None:
+        self._cached.cache_clear()
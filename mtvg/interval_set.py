@@ -0,0 +1,247 @@
+# mtvg/interval_set.py
+"""
+Finite unions of closed time intervals, stored as sorted NumPy arrays.
+
+An `IntervalSet` holds disjoint intervals [starts[i], ends[i]] with
+starts[i] < ends[i] < starts[i + 1]; overlapping or touching input intervals are
+merged and intervals of zero length are dropped, so sets that differ only on
+isolated instants compare equal. Every operation is a handful of array passes
+(sort, searchsorted, reduceat) with no per-interval Python loop, except that sets
+of a few intervals, where each NumPy call costs more than the work itself, are
+normalized and intersected by plain list merges.
+
+Sets behave like the sorted `[(a, b), ...]` lists used elsewhere in the package:
+they iterate as (a, b) float tuples, index and slice, have a length, are false
+when empty, and compare equal to such a list.
+"""
+from __future__ import annotations
+from typing import Iterable, Iterator, Tuple, Union
+import math
+import numpy as np
+
+TimeInterval = Tuple[float, float]
+
+_SMALL = 16  # up to this many intervals, list merges beat NumPy's per-call overhead
+
+def _frozen(a: np.ndarray) -> np.ndarray:
+    a.setflags(write=False)
+    return a
+
+def _merge(pairs: Iterable[TimeInterval]) -> Tuple[list, list]:
+    """Starts and ends of the union of (a, b) pairs sorted by a; empty pairs dropped."""
+    S: list = []
+    E: list = []
+    for a, b in pairs:
+        if b <= a:
+            continue
+        if E and a <= E[-1]:
+            if b > E[-1]:
+                E[-1] = b
+        else:
+            S.append(a)
+            E.append(b)
+    return S, E
+
+class IntervalSet:
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, starts: Iterable[float] = (), ends: Iterable[float] = ()):
+        """Union of the intervals [starts[i], ends[i]], in any order; empty ones are ignored."""
+        s = np.array(starts, dtype=np.float64).reshape(-1)
+        e = np.array(ends, dtype=np.float64).reshape(-1)
+        if s.shape != e.shape:
+            raise ValueError("starts and ends must have the same length")
+        if len(s) <= _SMALL:
+            S, E = _merge(sorted(zip(s.tolist(), e.tolist())))
+            self.starts, self.ends = _frozen(np.array(S, dtype=np.float64)), _frozen(np.array(E, dtype=np.float64))
+            return
+        keep = e > s
+        s, e = s[keep], e[keep]
+        if len(s) > 1:
+            order = np.argsort(s, kind="stable")
+            s, e = s[order], e[order]
+            if not (e[:-1] < s[1:]).all():
+                # a new run starts where the interval begins after every earlier end
+                reach = np.maximum.accumulate(e)
+                first = np.flatnonzero(np.concatenate(([True], s[1:] > reach[:-1])))
+                s, e = s[first], np.maximum.reduceat(e, first)
+        self.starts, self.ends = _frozen(s), _frozen(e)
+
+    @classmethod
+    def _raw(cls, s: np.ndarray, e: np.ndarray) -> "IntervalSet":
+        # arrays already sorted, disjoint and non-empty
+        out = cls.__new__(cls)
+        out.starts, out.ends = _frozen(s), _frozen(e)
+        return out
+
+    @classmethod
+    def _from_lists(cls, S: list, E: list) -> "IntervalSet":
+        return cls._raw(np.array(S, dtype=np.float64), np.array(E, dtype=np.float64))
+
+    @classmethod
+    def from_pairs(cls, pairs: Union["IntervalSet", Iterable[TimeInterval], np.ndarray]) -> "IntervalSet":
+        """From (a, b) pairs or an (n, 2) array; an IntervalSet is returned as is."""
+        if isinstance(pairs, IntervalSet):
+            return pairs
+        if isinstance(pairs, (list, tuple)) and len(pairs) <= _SMALL:
+            return cls._from_lists(*_merge(sorted((float(a), float(b)) for a, b in pairs)))
+        a = np.array(pairs if isinstance(pairs, np.ndarray) else list(pairs), dtype=np.float64).reshape(-1, 2)
+        return cls(a[:, 0], a[:, 1])
+
+    @classmethod
+    def empty(cls) -> "IntervalSet":
+        return _EMPTY
+
+    @classmethod
+    def union_all(cls, sets: Iterable[Union["IntervalSet", Iterable[TimeInterval]]]) -> "IntervalSet":
+        """Union of many sets in one sort."""
+        sets = [cls.from_pairs(s) for s in sets]
+        if not sets:
+            return cls.empty()
+        return cls(np.concatenate([s.starts for s in sets]), np.concatenate([s.ends for s in sets]))
+
+    # list-like view
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __bool__(self) -> bool:
+        return len(self.starts) > 0
+
+    def __iter__(self) -> Iterator[TimeInterval]:
+        return zip(self.starts.tolist(), self.ends.tolist())
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return IntervalSet._raw(self.starts[i], self.ends[i])
+        return (float(self.starts[i]), float(self.ends[i]))
+
+    def to_list(self) -> list:
+        return list(self)
+
+    def to_array(self) -> np.ndarray:
+        """(n, 2) array of [start, end] rows."""
+        return np.stack([self.starts, self.ends], axis=1)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, IntervalSet):
+            return np.array_equal(self.starts, other.starts) and np.array_equal(self.ends, other.ends)
+        if isinstance(other, (list, tuple)):
+            return self.to_list() == [tuple(iv) for iv in other]
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.starts.tobytes(), self.ends.tobytes()))
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({self.to_list()!r})"
+
+    def __reduce__(self):
+        return (IntervalSet, (self.starts, self.ends))
+
+    # measures and queries
+
+    @property
+    def lower(self) -> float:
+        """First start (inf when empty)."""
+        return float(self.starts[0]) if len(self.starts) else math.inf
+
+    @property
+    def upper(self) -> float:
+        """Last end (-inf when empty)."""
+        return float(self.ends[-1]) if len(self.ends) else -math.inf
+
+    def measure(self) -> float:
+        return float(np.sum(self.ends - self.starts))
+
+    def contains(self, t):
+        """Whether t (a float or an array of times) lies in the set."""
+        t = np.asarray(t, dtype=np.float64)
+        k = np.searchsorted(self.ends, t, side="left")
+        inside = np.append(self.starts, math.inf)[k] <= t
+        return bool(inside) if inside.ndim == 0 else inside
+
+    def __contains__(self, t: float) -> bool:
+        return self.contains(t)
+
+    def next_feasible(self, t):
+        """Earliest time >= t in the set (inf if none); t may be a float or an array."""
+        k = self.ends.searchsorted(t, side="left")
+        if np.ndim(t) == 0:
+            return max(float(t), float(self.starts[k])) if k < len(self.starts) else math.inf
+        return np.maximum(t, np.append(self.starts, math.inf)[k])
+
+    # algebra
+
+    def union(self, other: Union["IntervalSet", Iterable[TimeInterval]]) -> "IntervalSet":
+        return IntervalSet.union_all((self, other))
+
+    def intersection(self, other: Union["IntervalSet", Iterable[TimeInterval]]) -> "IntervalSet":
+        other = IntervalSet.from_pairs(other)
+        if not self or not other:
+            return _EMPTY
+        if len(self) + len(other) <= _SMALL:
+            return self._intersect_small(other)
+        # for each interval of self, the run of intervals of other overlapping it
+        lo = np.searchsorted(other.ends, self.starts, side="right")
+        hi = np.searchsorted(other.starts, self.ends, side="left")
+        n = np.maximum(hi - lo, 0)
+        total = int(n.sum())
+        if total == 0:
+            return IntervalSet.empty()
+        i = np.repeat(np.arange(len(self.starts)), n)
+        j = np.arange(total) - np.repeat(np.cumsum(n) - n, n) + np.repeat(lo, n)
+        s = np.maximum(self.starts[i], other.starts[j])
+        e = np.minimum(self.ends[i], other.ends[j])
+        keep = e > s
+        return IntervalSet._raw(s[keep], e[keep])
+
+    def _intersect_small(self, other: "IntervalSet") -> "IntervalSet":
+        a_s, a_e = self.starts.tolist(), self.ends.tolist()
+        b_s, b_e = other.starts.tolist(), other.ends.tolist()
+        S, E = [], []
+        i = j = 0
+        while i < len(a_s) and j < len(b_s):
+            s, e = max(a_s[i], b_s[j]), min(a_e[i], b_e[j])
+            if e > s:
+                S.append(s)
+                E.append(e)
+            if a_e[i] < b_e[j]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet._from_lists(S, E)
+
+    def complement(self, lo: float = -math.inf, hi: float = math.inf) -> "IntervalSet":
+        """The closure of [lo, hi] minus the set."""
+        return IntervalSet(np.concatenate(([lo], self.ends)), np.concatenate((self.starts, [hi]))).clip(lo, hi)
+
+    def difference(self, other: Union["IntervalSet", Iterable[TimeInterval]]) -> "IntervalSet":
+        """Closure of self minus other (shared endpoints are kept)."""
+        other = IntervalSet.from_pairs(other)
+        if not self or not other:
+            return self
+        return self.intersection(other.complement(self.lower, self.upper))
+
+    def clip(self, lo: float, hi: float) -> "IntervalSet":
+        """Intersection with [lo, hi]."""
+        if not self or (lo <= self.starts[0] and hi >= self.ends[-1]):
+            return self
+        if len(self) <= _SMALL:
+            return IntervalSet._from_lists(*_merge((max(a, lo), min(b, hi)) for a, b in self))
+        a = self.ends.searchsorted(lo, side="right")
+        b = self.starts.searchsorted(hi, side="left")
+        if b <= a:
+            return _EMPTY
+        s, e = self.starts[a:b].copy(), self.ends[a:b].copy()
+        s[0], e[-1] = max(s[0], lo), min(e[-1], hi)
+        return IntervalSet._raw(s, e)
+
+    def shift(self, dt: float) -> "IntervalSet":
+        return IntervalSet._raw(self.starts + dt, self.ends + dt)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+_EMPTY = IntervalSet._raw(np.zeros(0), np.zeros(0))
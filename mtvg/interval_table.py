@@ -0,0 +1,107 @@
+# mtvg/interval_table.py
+"""
+Visibility intervals for every (node, target, window) combination, in flat arrays.
+
+Cell c = node * n_slots + slot, where slot = window_offsets[target] + window index,
+holds the intervals starts[offsets[c]:offsets[c + 1]], ends[...]. Rows of nodes
+can be computed on a process pool; each worker receives the scene with its
+preprocessed `SceneIndex` arrays once, through the pool initializer.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .geometry import Coord
+from .interval_set import IntervalSet
+from .intervals import visible_intervals
+from .models import Scene, Target
+
+@dataclass(frozen=True, eq=False)
+class IntervalTable:
+    n_nodes: int
+    window_offsets: np.ndarray  # (n_targets + 1,) int64, first slot of each target's windows
+    offsets: np.ndarray         # (n_nodes * n_slots + 1,) int64
+    starts: np.ndarray          # (n_intervals,) float64
+    ends: np.ndarray            # (n_intervals,) float64
+
+    @property
+    def n_slots(self) -> int:
+        return int(self.window_offsets[-1])
+
+    def cell(self, node: int, target: int, window: int) -> int:
+        slot = int(self.window_offsets[target]) + window
+        if not 0 <= window < int(self.window_offsets[target + 1] - self.window_offsets[target]):
+            raise IndexError(f"target {target} has no window {window}")
+        return node * self.n_slots + slot
+
+    def get(self, node: int, target: int, window: int) -> IntervalSet:
+        c = self.cell(node, target, window)
+        s, e = self.offsets[c], self.offsets[c + 1]
+        return IntervalSet._raw(self.starts[s:e], self.ends[s:e])
+
+    def target_intervals(self, node: int, target: int) -> IntervalSet:
+        """Intervals of all the target's windows (adjacent cells; windows are sorted and disjoint)."""
+        row = node * self.n_slots
+        s = self.offsets[row + self.window_offsets[target]]
+        e = self.offsets[row + self.window_offsets[target + 1]]
+        return IntervalSet._raw(self.starts[s:e], self.ends[s:e])
+
+    def counts(self) -> np.ndarray:
+        """(n_nodes, n_slots) number of intervals per cell."""
+        return np.diff(self.offsets).reshape(self.n_nodes, self.n_slots)
+
+# Per-process state, set up once by the pool initializer.
+_worker_args: Optional[Tuple[Scene, Sequence[Target], Sequence[Coord], Dict[str, Any]]] = None
+
+def _init_worker(scene: Scene, targets: Sequence[Target], nodes: Sequence[Coord], kwargs: Dict[str, Any]) -> None:
+    global _worker_args
+    _worker_args = (scene, targets, nodes, kwargs)
+
+def _solve_rows(block: Tuple[int, int]) -> List[IntervalSet]:
+    return _rows(*_worker_args, *block)
+
+def _rows(scene: Scene, targets: Sequence[Target], nodes: Sequence[Coord], kwargs: Dict[str, Any],
+          start: int, stop: int) -> List[IntervalSet]:
+    """Interval sets of the cells of nodes start..stop-1, in cell order."""
+    return [visible_intervals(nodes[i], tgt, win, scene, **kwargs)
+            for i in range(start, stop) for tgt in targets for win in tgt.windows]
+
+def build_interval_table(
+    scene: Scene,
+    targets: Sequence[Target],
+    nodes: Sequence[Coord],
+    *,
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+    **interval_kwargs: Any,
+) -> IntervalTable:
+    """
+    `visible_intervals(node, target, window, scene, **interval_kwargs)` for every node,
+    target and target window. With workers > 1, blocks of `chunk_size` nodes are
+    solved on a process pool (targets must then be picklable, e.g. built with
+    make_linear_xy rather than local closures).
+    """
+    nodes = [(float(x), float(y)) for x, y in nodes]
+    targets = list(targets)
+    n = len(nodes)
+    window_offsets = np.zeros(len(targets) + 1, dtype=np.int64)
+    np.cumsum([len(t.windows) for t in targets], out=window_offsets[1:])
+    scene.index.edges  # build the shared arrays once, before they are shipped to workers
+
+    if workers > 1 and n > 1:
+        if chunk_size is None:
+            chunk_size = max(1, n // (4 * workers))
+        blocks = [(s, min(s + chunk_size, n)) for s in range(0, n, chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(scene, targets, nodes, interval_kwargs)) as pool:
+            cells = [c for block in pool.map(_solve_rows, blocks) for c in block]
+    else:
+        cells = _rows(scene, targets, nodes, interval_kwargs, 0, n)
+
+    offsets = np.zeros(len(cells) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in cells], out=offsets[1:])
+    return IntervalTable(n_nodes=n, window_offsets=window_offsets, offsets=offsets,
+                         starts=np.concatenate([c.starts for c in cells] or [np.zeros(0)]),
+                         ends=np.concatenate([c.ends for c in cells] or [np.zeros(0)]))
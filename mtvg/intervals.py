@@ -1,25 +1,33 @@
 # mtvg/intervals.py
 from __future__ import annotations
-from typing import Callable, List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional, Union
 import math
+import numpy as np
+from shapely.geometry import Polygon
 
-from .geometry import Coord, make_obstacles_union, visible
+from . import instrument
+from .geometry import Coord, ObstacleEdges, SceneIndex, visible, visible_many
+from .interval_set import IntervalSet, TimeInterval
 from .models import Target, Window, Scene
 
-# Type aliases
-TimeInterval = Tuple[float, float]
-
 def _sample_times(t0: float, tf: float, n: int) -> List[float]:
     if n <= 1:
         return [t0, tf]
     return [t0 + (tf - t0) * i / (n - 1) for i in range(n)]
 
+def positions(tau: Callable[[float], Coord], times) -> np.ndarray:
+    """tau at each time as an (n, 2) array, vectorized when tau offers `xy_many`."""
+    xy_many = getattr(tau, "xy_many", None)
+    if xy_many is not None:
+        return xy_many(np.asarray(times, dtype=float))
+    return np.array([tau(t) for t in times], dtype=float).reshape(-1, 2)
+
 def _binary_refine_visibility(
     q: Coord,
     tau: Callable[[float], Coord],
     t_lo: float,
     t_hi: float,
-    obs_union,
+    obs_union: Union[Polygon, SceneIndex],
     want_visible: bool,
     tol: float = 1e-5,
     max_iter: int = 40,
@@ -32,7 +40,8 @@ def _binary_refine_visibility(
     a, b = t_lo, t_hi
     fa = visible(q, tau(a), obs_union)
     # We expect fa == want_visible
-    for _ in range(max_iter):
+    it = 0
+    for it in range(1, max_iter + 1):
         m = 0.5 * (a + b)
         fm = visible(q, tau(m), obs_union)
         if fm == want_visible:
@@ -42,9 +51,286 @@ def _binary_refine_visibility(
             b = m
         if abs(b - a) < tol:
             break
+    rep = instrument.report()
+    if rep is not None:
+        rep.add("refine.calls")
+        rep.add("refine.iterations", it)
     # return the endpoint that is visible -> so if want_visible True, return a (last visible)
     return a if want_visible else b
 
+def _linear_pieces(tau: Callable[[float], Coord], t0: float, tf: float) -> Optional[List[Tuple[float, float]]]:
+    """
+    Sub-intervals of [t0, tf] on which tau is affine, taken from `tau.breakpoints`
+    (times where the velocity may change), or None when tau does not expose them.
+    """
+    bps = getattr(tau, "breakpoints", None)
+    if bps is None:
+        return None
+    cuts = [t0] + sorted(t for t in set(bps) if t0 < t < tf) + [tf]
+    return list(zip(cuts[:-1], cuts[1:]))
+
+def _cross(ax, ay, bx, by):
+    return ax * by - ay * bx
+
+def _sightline_events(q: Coord, A: np.ndarray, B: np.ndarray, edges: ObstacleEdges) -> np.ndarray:
+    """
+    Parameters s in (0, 1) along the target path A -> B at which the combinatorial
+    relation between the sight segment q -> A + s (B - A) and the obstacles can change:
+    the sight line passes an obstacle vertex, the target crosses an obstacle edge,
+    or the target passes through q. Between consecutive events visibility is constant.
+    """
+    D = B - A
+    if not D.any():
+        return np.zeros(0)
+    qv = edges.a - np.asarray(q, dtype=float)
+    qa = A - np.asarray(q, dtype=float)
+    # cross(v - q, A + s D - q) = 0 -> sight line through vertex v
+    c1 = _cross(qv[:, 0], qv[:, 1], D[0], D[1])
+    c0 = _cross(qv[:, 0], qv[:, 1], qa[0], qa[1])
+    nz = c1 != 0
+    ev = [-c0[nz] / c1[nz]]
+    # path crossing an edge a -> b: A + s D = a + u (b - a), u in [0, 1]
+    e = edges.b - edges.a
+    den = _cross(D[0], D[1], e[:, 0], e[:, 1])
+    ok = den != 0
+    aA = edges.a[ok] - A
+    s_e = _cross(aA[:, 0], aA[:, 1], e[ok, 0], e[ok, 1]) / den[ok]
+    u_e = _cross(aA[:, 0], aA[:, 1], D[0], D[1]) / den[ok]
+    ev.append(s_e[(u_e >= 0) & (u_e <= 1)])
+    # target passing through q
+    if _cross(D[0], D[1], -qa[0], -qa[1]) == 0:
+        ev.append(np.array([-(qa @ D) / (D @ D)]))
+    s = np.concatenate(ev)
+    return np.unique(s[(s > 0) & (s < 1)])
+
+def _exact_visible_intervals(q: Coord, tau: Callable[[float], Coord], pieces: List[Tuple[float, float]],
+                             edges: ObstacleEdges) -> IntervalSet:
+    """Visibility intervals of a piecewise-affine tau from sight-line events (see `_sightline_events`)."""
+    cuts: List[np.ndarray] = []
+    for ta, tb in pieces:
+        A = np.asarray(tau(ta), dtype=float)
+        B = np.asarray(tau(tb), dtype=float)
+        s = _sightline_events(q, A, B, edges)
+        cuts.append(np.concatenate(([ta], ta + s * (tb - ta), [tb])))
+    t = np.unique(np.concatenate(cuts))
+    lo, hi = t[:-1], t[1:]
+    keep = hi > lo
+    lo, hi = lo[keep], hi[keep]
+    if len(lo) == 0:
+        return IntervalSet.empty()
+    mids = 0.5 * (lo + hi)
+    flags = visible_many(q, positions(tau, mids), edges)
+    # visible open cells are merged; a single blocked instant between two of them (the
+    # sight line grazing a vertex) has measure zero and is absorbed, as sampling would
+    return IntervalSet(lo[flags], hi[flags])
+
+def _sampled_visible_intervals(q: Coord, tau: Callable[[float], Coord], t0: float, tf: float,
+                               index: SceneIndex, n_samples: int, refine_tol: float) -> IntervalSet:
+    # 1) sample times (all sight lines q -> tau(t) checked in one batch)
+    times = _sample_times(t0, tf, n_samples)
+    taus = positions(tau, times)
+    vis_flags = visible_many(q, taus, index).tolist()
+
+    # 2) find contiguous true segments in vis_flags -> candidate intervals
+    intervals: List[TimeInterval] = []
+    i = 0
+    while i < len(times):
+        if vis_flags[i]:
+            j = i
+            while j + 1 < len(times) and vis_flags[j + 1]:
+                j += 1
+            # times[i]..times[j] is a candidate visible block; refine endpoints
+            left = times[i]
+            right = times[j]
+            # refine left boundary: find first visible point after the last non-visible sample
+            if i > 0 and not vis_flags[i - 1]:
+                left = _binary_refine_visibility(q, tau, times[i - 1], times[i], index, False, tol=refine_tol)
+            # refine right boundary: find first non-visible after right (if exists)
+            if j + 1 < len(times) and not vis_flags[j + 1]:
+                right = _binary_refine_visibility(q, tau, times[j], times[j + 1], index, True, tol=refine_tol)
+            intervals.append((left, right))
+            i = j + 1
+        else:
+            i += 1
+
+    return IntervalSet.from_pairs(intervals)
+
+def _sweep_may_change(q: np.ndarray, c: np.ndarray, r: float, edges: ObstacleEdges) -> bool:
+    """
+    False when visibility from q is certainly constant while the target stays in the
+    disk D(c, r): no obstacle edge touches D, and no obstacle vertex other than q lies
+    in the convex hull of q and D. (Every edge meeting that hull then cuts it without
+    separating q from D, so no sight line q -> x, x in D, can start or stop crossing it.)
+    """
+    a, b = edges.a, edges.b
+    ab = b - a
+    L2 = np.einsum("ij,ij->i", ab, ab)
+    u = np.clip(np.einsum("ij,ij->i", c - a, ab) / np.where(L2 > 0, L2, 1.0), 0.0, 1.0)
+    near = a + u[:, None] * ab - c
+    if np.any(np.einsum("ij,ij->i", near, near) <= r * r):
+        return True
+    d = c - q
+    dd = float(d @ d)
+    if dd <= r * r:
+        return False  # hull is D itself, which touches no edge
+    w = a[np.any(a != q, axis=1)] - q
+    proj = w @ d
+    # inside the cone from q tangent to D, and before the tangent chord
+    in_cone = (proj > 0) & (proj * proj >= np.einsum("ij,ij->i", w, w) * (dd - r * r))
+    return bool(np.any(in_cone & (proj <= dd - r * r)))
+
+def _adaptive_visible_intervals(q: Coord, tau: Callable[[float], Coord], t0: float, tf: float,
+                                index: SceneIndex, speed: float, min_gap: float,
+                                refine_tol: float) -> IntervalSet:
+    """
+    Coarse-to-fine visibility: a cell [a, b] is accepted as constant once the disk
+    around (tau(a) + tau(b)) / 2 of radius speed (b - a) / 2, which contains the target
+    throughout the cell, passes `_sweep_may_change`; otherwise it is halved until it is
+    no longer than min_gap. Visibility is then sampled at every cell boundary, so any
+    occlusion (or visible stretch) longer than min_gap contains a sample.
+    """
+    edges = index.edges
+    qa = np.asarray(q, dtype=float)
+    pad = 1.0 + 1e-9
+    cells: List[Tuple[float, float]] = []
+    stack = [(t0, tf)]
+    while stack:
+        a, b = stack.pop()
+        pa, pb = positions(tau, (a, b))
+        c = 0.5 * (pa + pb)
+        r = 0.5 * speed * (b - a) * pad + 1e-12
+        if b - a <= min_gap or not _sweep_may_change(qa, c, r, edges):
+            cells.append((a, b))
+        else:
+            m = 0.5 * (a + b)
+            stack.append((m, b))
+            stack.append((a, m))
+    times = [cells[0][0]] + [b for _, b in cells]
+    flags = visible_many(q, positions(tau, times), edges).tolist()
+
+    starts: List[float] = []
+    ends: List[float] = []
+    for k, (a, b) in enumerate(cells):
+        fa, fb = flags[k], flags[k + 1]
+        if fa and fb:
+            starts.append(a); ends.append(b)
+        elif fa != fb:
+            # short uncertain cell with a transition: locate it as the fixed grid does
+            t = _binary_refine_visibility(q, tau, a, b, index, fa, tol=refine_tol)
+            starts.append(a if fa else t); ends.append(t if fa else b)
+    return IntervalSet(starts, ends)
+
+def _kinematic_filter_bisect(q: Coord, tau: Callable[[float], Coord], intervals: IntervalSet,
+                             earliest_departure: float, v_max: float, refine_tol: float) -> IntervalSet:
+    """Bisection fallback for arbitrary trajectories; assumes the reachable part of each interval is a suffix."""
+    kin_intervals: List[TimeInterval] = []
+    for (a, b) in intervals:
+        # For kinematic feasibility we need times t where dist(q, tau(t)) / v_max <= t - earliest_departure
+        # Define f(t) = t - (dist(q,t)/v_max) - earliest_departure. We need f(t) >= 0.
+        def f(t: float) -> float:
+            p = tau(t)
+            d = math.hypot(q[0] - p[0], q[1] - p[1])
+            return t - (d / v_max) - earliest_departure
+
+        # If f(b) < 0, no feasible t in [a,b]
+        if f(b) < 0:
+            continue
+        # If f(a) >= 0, whole interval feasible
+        if f(a) >= 0:
+            kin_intervals.append((a, b))
+            continue
+        # Otherwise find root in (a,b] where f(t)=0 via binary search
+        lo, hi = a, b
+        it = 0
+        for it in range(1, 51):
+            mid = 0.5 * (lo + hi)
+            if f(mid) >= 0:
+                hi = mid
+            else:
+                lo = mid
+            if hi - lo < refine_tol:
+                break
+        instrument.count("kinematic.bisect_iterations", it)
+        kin_intervals.append((hi, b))
+    return IntervalSet.from_pairs(kin_intervals)
+
+def _quadratic_nonpos(a2: float, a1: float, a0: float) -> List[Tuple[float, float]]:
+    """{t : a2 t^2 + a1 t + a0 <= 0} as at most two closed intervals (possibly unbounded), in order."""
+    inf = math.inf
+    if a2 == 0.0:
+        if a1 > 0: return [(-inf, -a0 / a1)]
+        if a1 < 0: return [(-a0 / a1, inf)]
+        return [(-inf, inf)] if a0 <= 0 else []
+    disc = a1 * a1 - 4.0 * a2 * a0
+    if disc < 0:
+        return [(-inf, inf)] if a2 < 0 else []
+    # numerically stable pair of roots
+    qq = -0.5 * (a1 + math.copysign(math.sqrt(disc), a1))
+    ra = qq / a2
+    rb = a0 / qq if qq != 0 else ra
+    r1, r2 = min(ra, rb), max(ra, rb)
+    return [(r1, r2)] if a2 > 0 else [(-inf, r1), (r2, inf)]
+
+def _kinematic_filter_exact(q: Coord, tau: Callable[[float], Coord], intervals: IntervalSet,
+                            earliest_departure: float, v_max: float) -> IntervalSet:
+    """
+    Closed-form filter for piecewise-affine tau. On a piece tau(t) = q + A + V t,
+    |tau(t) - q| <= v_max (t - t_d) with t >= t_d is the quadratic inequality
+      (|V|^2 - v^2) t^2 + 2 (A.V + v^2 t_d) t + (|A|^2 - v^2 t_d^2) <= 0,
+    whose solution set is an interval, two rays, everything or nothing. When the
+    target is faster than the agent the reachable times can end before the interval
+    does, so the result need not be a suffix. The reachable set is solved once per
+    trajectory piece and then intersected with all intervals at once.
+    """
+    if not intervals:
+        return intervals
+    inf = math.inf
+    t_min, t_max = intervals.lower, intervals.upper
+    bps = sorted(set(float(t) for t in tau.breakpoints))
+    cuts = [-inf] + bps + [inf]
+    qx, qy = q
+    v2, td = v_max * v_max, earliest_departure
+
+    starts: List[float] = []
+    ends: List[float] = []
+    for lo, hi in zip(cuts[:-1], cuts[1:]):
+        if hi <= max(lo, td, t_min) or lo >= t_max:
+            continue
+        if math.isinf(lo) or math.isinf(hi):  # held at an end waypoint
+            xa, ya = tau(hi if math.isinf(lo) else lo)
+            vx = vy = 0.0
+        else:
+            (xa, ya), (xb, yb) = tau(lo), tau(hi)
+            vx, vy = (xb - xa) / (hi - lo), (yb - ya) / (hi - lo)
+            xa, ya = xa - vx * lo, ya - vy * lo
+        ax, ay = xa - qx, ya - qy
+        sols = _quadratic_nonpos(vx * vx + vy * vy - v2, 2.0 * (ax * vx + ay * vy + v2 * td),
+                                 ax * ax + ay * ay - v2 * td * td)
+        for s, e in sols:
+            s, e = max(s, lo, td), min(e, hi)
+            if e >= s:
+                if ends and ends[-1] >= s:
+                    ends[-1] = max(ends[-1], e)
+                else:
+                    starts.append(s)
+                    ends.append(e)
+    if len(starts) == 1:  # the usual case: a single ray or interval
+        return intervals.clip(starts[0], ends[0]) if ends[0] > starts[0] else IntervalSet.empty()
+    return intervals & IntervalSet(starts, ends)
+
+def kinematic_filter(q: Coord, tau: Callable[[float], Coord], intervals: Union[IntervalSet, List[TimeInterval]],
+                     earliest_departure: float, v_max: float, *, refine_tol: float = 1e-5) -> IntervalSet:
+    """
+    Parts of `intervals` at which an agent leaving q no earlier than earliest_departure
+    at speed <= v_max can be at tau(t): dist(q, tau(t)) <= v_max (t - earliest_departure).
+    `intervals` is an IntervalSet, or (a, b) pairs / an (n, 2) array converted to one.
+    Exact for trajectories exposing `breakpoints`; otherwise bisection to refine_tol.
+    """
+    intervals = IntervalSet.from_pairs(intervals)
+    if getattr(tau, "breakpoints", None) is not None:
+        return _kinematic_filter_exact(q, tau, intervals, earliest_departure, v_max)
+    return _kinematic_filter_bisect(q, tau, intervals, earliest_departure, v_max, refine_tol)
+
 def visible_intervals(
     q: Coord,
     target: Target,
@@ -55,7 +341,10 @@ def visible_intervals(
     refine_tol: float = 1e-5,
     earliest_departure: Optional[float] = None,
     require_kinematic: bool = False,
-) -> List[TimeInterval]:
+    mode: str = "auto",
+    min_gap: Optional[float] = None,
+    max_target_speed: Optional[float] = None,
+) -> IntervalSet:
     """
     Compute time intervals within `window` where the straight segment q -> tau(t)
     is collision-free. Optionally filter those times by kinematic reachability:
@@ -72,75 +361,53 @@ def visible_intervals(
       refine_tol: binary search tolerance to refine interval endpoints
       earliest_departure: earliest time agent can leave q (if None, skip kinematic check)
       require_kinematic: if True, apply the kinematic filter (requires earliest_departure not None)
+      mode: "exact" solves for the times the sight line sweeps across obstacle vertices
+        and edges, for trajectories that expose `breakpoints` (e.g. make_linear_xy);
+        "sample" uses n_samples samples plus bisection and works for any XYFunc;
+        "auto" picks "exact" when possible;
+        "adaptive" works for any XYFunc with a known speed bound: it subdivides the
+        window only where the sight line could sweep across an obstacle vertex and
+        never misses an occlusion longer than min_gap.
+      min_gap: resolution of mode="adaptive" (default: the n_samples grid spacing)
+      max_target_speed: bound on |d tau / dt| for mode="adaptive" (default:
+        `target.xy.max_speed` when the trajectory provides it)
 
     Returns:
-      list of disjoint closed intervals [(a,b), ...] with a < b (or empty).
+      IntervalSet of disjoint closed intervals [(a,b), ...] with a < b (possibly empty);
+      it iterates and compares like the equivalent list of pairs.
     """
     t0, tf = window
     if tf <= t0:
-        return []
+        return IntervalSet.empty()
 
-    obs_union = make_obstacles_union(scene.obstacles)
+    if mode not in ("auto", "exact", "sample", "adaptive"):
+        raise ValueError(f"unknown mode {mode!r}; expected 'auto', 'exact', 'sample' or 'adaptive'")
     tau = target.xy
+    index = scene.index
+    pieces = _linear_pieces(tau, t0, tf) if mode in ("auto", "exact") else None
+    if mode == "exact" and pieces is None:
+        raise ValueError("mode='exact' needs a piecewise-linear trajectory exposing `breakpoints`")
+    speed = None
+    if mode == "adaptive":
+        speed = max_target_speed if max_target_speed is not None else getattr(tau, "max_speed", None)
+        if speed is None:
+            raise ValueError("mode='adaptive' needs max_target_speed for this trajectory")
+        if min_gap is None:
+            min_gap = (tf - t0) / max(n_samples - 1, 1)
+    if require_kinematic and earliest_departure is None:
+        raise ValueError("earliest_departure must be provided when require_kinematic=True")
 
-    # 1) sample times
-    times = _sample_times(t0, tf, n_samples)
-    vis_flags = [visible(q, tau(t), obs_union) for t in times]
-
-    # 2) find contiguous true segments in vis_flags -> candidate intervals
-    intervals: List[TimeInterval] = []
-    i = 0
-    while i < len(times):
-        if vis_flags[i]:
-            j = i
-            while j + 1 < len(times) and vis_flags[j + 1]:
-                j += 1
-            # times[i]..times[j] is a candidate visible block; refine endpoints
-            left = times[i]
-            right = times[j]
-            # refine left boundary: find last non-visible point before left (if exists)
-            if i > 0 and not vis_flags[i - 1]:
-                left = _binary_refine_visibility(q, tau, times[i - 1], times[i], obs_union, True, tol=refine_tol)
-            # refine right boundary: find first non-visible after right (if exists)
-            if j + 1 < len(times) and not vis_flags[j + 1]:
-                right = _binary_refine_visibility(q, tau, times[j], times[j + 1], obs_union, True, tol=refine_tol)
-            intervals.append((left, right))
-            i = j + 1
+    with instrument.stage("visible_intervals.visibility"):
+        if speed is not None:
+            intervals = _adaptive_visible_intervals(q, tau, t0, tf, index, speed, min_gap, refine_tol)
+        elif pieces is not None:
+            intervals = _exact_visible_intervals(q, tau, pieces, index.edges)
         else:
-            i += 1
+            intervals = _sampled_visible_intervals(q, tau, t0, tf, index, n_samples, refine_tol)
 
-    # 3) Optionally apply kinematic reachability filter
+    # Optionally apply kinematic reachability filter
     if require_kinematic:
-        if earliest_departure is None:
-            raise ValueError("earliest_departure must be provided when require_kinematic=True")
-        v_max = scene.v_max
-        kin_intervals: List[TimeInterval] = []
-        for (a, b) in intervals:
-            # For kinematic feasibility we need times t where dist(q, tau(t)) / v_max <= t - earliest_departure
-            # Define f(t) = t - (dist(q,t)/v_max) - earliest_departure. We need f(t) >= 0.
-            def f(t: float) -> float:
-                p = tau(t)
-                d = math.hypot(q[0] - p[0], q[1] - p[1])
-                return t - (d / v_max) - earliest_departure
-
-            # If f(b) < 0, no feasible t in [a,b]
-            if f(b) < 0:
-                continue
-            # If f(a) >= 0, whole interval feasible
-            if f(a) >= 0:
-                kin_intervals.append((a, b))
-                continue
-            # Otherwise find root in (a,b] where f(t)=0 via binary search
-            lo, hi = a, b
-            for _ in range(50):
-                mid = 0.5 * (lo + hi)
-                if f(mid) >= 0:
-                    hi = mid
-                else:
-                    lo = mid
-                if hi - lo < refine_tol:
-                    break
-            kin_intervals.append((hi, b))
-        intervals = kin_intervals
+        with instrument.stage("visible_intervals.kinematic"):
+            intervals = kinematic_filter(q, tau, intervals, earliest_departure, scene.v_max, refine_tol=refine_tol)
 
     return intervals
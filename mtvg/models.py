@@ -1,8 +1,11 @@
 # mtvg/models.py
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Callable, Iterable, List, Tuple, Optional, Dict
-from .geometry import Obstacle, Coord
+from dataclasses import dataclass, field
+from bisect import bisect_right
+from typing import Callable, Iterable, List, Tuple, Optional, Dict, Sequence, Union
+import numpy as np
+from .geometry import Obstacle, Coord, SceneIndex
+from .interval_set import IntervalSet
 
 # A target’s trajectory: t -> (x, y)
 XYFunc = Callable[[float], Coord]
@@ -16,20 +19,25 @@ class Depot:
 class Target:
     """
     Moving target with (possibly multiple) time windows.
-    - xy(t): R -> R^2 gives position at time t (assume piecewise-constant velocity within each window).
-    - windows: list of (t0, tf) with t0 < tf.
+    - xy(t): R -> R^2 gives position at time t (assume piecewise-constant velocity within each window);
+      a PiecewiseLinearTrajectory or any plain callable.
+    - windows: (t0, tf) pairs with t0 < tf, stored as an IntervalSet (sorted; overlapping
+      or touching windows are merged).
     - name: optional label.
     """
     id: int
-    xy: XYFunc
-    windows: List[Window]
+    xy: Union[XYFunc, "PiecewiseLinearTrajectory"]
+    windows: IntervalSet
     name: str = "target"
 
+    def __post_init__(self):
+        self.windows = IntervalSet.from_pairs(self.windows)
+
     def domain(self) -> Window:
         """Overall time span covered by windows."""
         if not self.windows:
             return (0.0, 0.0)
-        return (min(t0 for t0, _ in self.windows), max(tf for _, tf in self.windows))
+        return (self.windows.lower, self.windows.upper)
 
 @dataclass
 class Scene:
@@ -42,25 +50,101 @@ class Scene:
     obstacles: List[Obstacle]
     v_max: float
     depot: Depot
+    _index: Optional[SceneIndex] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def index(self) -> SceneIndex:
+        """Preprocessed obstacle geometry, built on first use and rebuilt when `obstacles` changes."""
+        if self._index is None or self._index.obstacles != tuple(self.obstacles):
+            self._index = SceneIndex(self.obstacles)
+        return self._index
 
     def as_points(self) -> List[Coord]:
         """Convenience: points that must be in the visibility graph (at least the depot)."""
         return [self.depot.xy]
 
+class PiecewiseLinearTrajectory:
+    """
+    Piecewise-constant-velocity motion through waypoints (times[k], points[k]),
+    held at the first / last waypoint outside [times[0], times[-1]].
+    Usable wherever an XYFunc is expected; `breakpoints` lets interval code see
+    that it is affine between consecutive times.
+    """
+    __slots__ = ("times", "points", "_ts", "_ps")
+
+    def __init__(self, times: Sequence[float], points: Sequence[Coord]):
+        t = np.array(times, dtype=float).reshape(-1)
+        p = np.array(points, dtype=float).reshape(-1, 2)
+        if len(t) == 0 or len(t) != len(p):
+            raise ValueError("need one point per time and at least one waypoint")
+        if np.any(np.diff(t) < 0):
+            raise ValueError("waypoint times must be non-decreasing")
+        t.flags.writeable = False
+        p.flags.writeable = False
+        self.times = t
+        self.points = p
+        # plain-float copies for the scalar path (no numpy scalar overhead per call)
+        self._ts: List[float] = t.tolist()
+        self._ps: List[Coord] = [(x, y) for x, y in p.tolist()]
+
+    @classmethod
+    def linear(cls, p0: Coord, p1: Coord, t0: float, tf: float) -> "PiecewiseLinearTrajectory":
+        # tf < t0 clamps to a jump at t0 (p0 up to t0, p1 after), as LinearXY always did
+        return cls([t0, max(t0, tf)], [p0, p1])
+
+    @property
+    def breakpoints(self) -> np.ndarray:
+        return self.times
+
+    @property
+    def max_speed(self) -> float:
+        dt = np.diff(self.times)
+        if not np.any(dt > 0):
+            return 0.0
+        step = np.hypot(*np.diff(self.points, axis=0).T)
+        return float(np.max(step[dt > 0] / dt[dt > 0]))
+
+    def segment(self, t: float) -> int:
+        """Index k of the piece [times[k], times[k+1]) containing t (clamped to the valid range)."""
+        return min(max(bisect_right(self._ts, t) - 1, 0), max(len(self._ts) - 2, 0))
+
+    def __call__(self, t: float) -> Coord:
+        ts, ps = self._ts, self._ps
+        if t <= ts[0]: return ps[0]
+        if t >= ts[-1]: return ps[-1]
+        k = bisect_right(ts, t) - 1
+        (x0, y0), (x1, y1) = ps[k], ps[k + 1]
+        alpha = (t - ts[k]) / (ts[k + 1] - ts[k])
+        return (x0 + alpha * (x1 - x0), y0 + alpha * (y1 - y0))
+
+    def xy_many(self, times: np.ndarray) -> np.ndarray:
+        """Positions at an array of times, shape (len(times), 2)."""
+        times = np.asarray(times, dtype=float)
+        t, p = self.times, self.points
+        k = np.clip(np.searchsorted(t, times, side="right") - 1, 0, max(len(t) - 2, 0))
+        if len(t) == 1:
+            return np.broadcast_to(p[0], times.shape + (2,)).copy()
+        dt = t[k + 1] - t[k]
+        alpha = np.clip(np.divide(times - t[k], dt, out=np.zeros_like(times), where=dt > 0), 0.0, 1.0)
+        out = p[k] + alpha[..., None] * (p[k + 1] - p[k])
+        out[times >= t[-1]] = p[-1]
+        out[times <= t[0]] = p[0]  # same precedence as __call__ when t[0] == t[-1]
+        return out
+
+    def velocity(self, t: float) -> Coord:
+        """Velocity at t (right-continuous at waypoints; zero outside the waypoint span)."""
+        ts, ps = self._ts, self._ps
+        if t < ts[0] or t >= ts[-1]: return (0.0, 0.0)
+        k = bisect_right(ts, t) - 1
+        dt = ts[k + 1] - ts[k]
+        return ((ps[k + 1][0] - ps[k][0]) / dt, (ps[k + 1][1] - ps[k][1]) / dt)
+
+    def __repr__(self) -> str:
+        return f"PiecewiseLinearTrajectory(times={self._ts!r}, points={self._ps!r})"
+
 # Convenience generator for straight-line trajectories (constant velocity)
-def make_linear_xy(p0: Coord, p1: Coord, t0: float, tf: float) -> XYFunc:
+def make_linear_xy(p0: Coord, p1: Coord, t0: float, tf: float) -> PiecewiseLinearTrajectory:
     """
     Returns xy(t) that moves from p0 at t0 to p1 at tf (clamped outside [t0, tf]).
     """
-    x0, y0 = p0
-    dx = p1[0] - x0
-    dy = p1[1] - y0
-    T = max(tf - t0, 1e-12)
-
-    def xy(t: float) -> Coord:
-        if t <= t0: return (x0, y0)
-        if t >= tf: return (p1[0], p1[1])
-        alpha = (t - t0) / T
-        return (x0 + alpha * dx, y0 + alpha * dy)
-
-    return xy
+    return PiecewiseLinearTrajectory.linear(p0, p1, t0, tf)
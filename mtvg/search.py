@@ -0,0 +1,126 @@
+# mtvg/search.py
+"""
+Goal-directed and multi-target shortest-path queries on a visibility graph.
+
+Edge weights are Euclidean lengths, so the straight-line distance to the goal is an
+admissible and consistent A* heuristic. All searches work on both `Graph` and
+`CSRGraph` and can report their work through a `SearchStats`.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import math
+
+from . import instrument
+from .visibility_graph import AnyGraph, NodeId, SearchStats, dijkstra, euclid
+
+__all__ = ["SearchStats", "dijkstra", "astar", "bidirectional_dijkstra", "one_to_many"]
+
+def _walk_back(prev: Dict[NodeId, NodeId], node: NodeId) -> List[NodeId]:
+    path = [node]
+    while node in prev:
+        node = prev[node]
+        path.append(node)
+    return path
+
+def astar(G: AnyGraph, src: NodeId, dst: NodeId, *, stats: Optional[SearchStats] = None) -> Tuple[float, List[NodeId]]:
+    """Single-pair A* with the straight-line heuristic; same result as `dijkstra`."""
+    nodes = G.nodes
+    goal = nodes[dst]
+    dist: Dict[NodeId, float] = {src: 0.0}
+    prev: Dict[NodeId, NodeId] = {}
+    closed = set()
+    pq = [(euclid(nodes[src], goal), 0.0, src)]
+    expanded = pushed = 0
+    while pq:
+        _, d, u = heapq.heappop(pq)
+        if u in closed: continue
+        closed.add(u)
+        expanded += 1
+        if u == dst: break
+        for v, w in G.neighbors(u):
+            nd = d + w
+            if nd < dist.get(v, math.inf) and v not in closed:
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd + euclid(nodes[v], goal), nd, v))
+                pushed += 1
+    instrument.count_heap_ops("astar", pushed + 1, len(pq))
+    if stats is not None:
+        stats.expanded += expanded
+        stats.pushed += pushed + 1
+    if dst not in closed: return math.inf, []
+    path = _walk_back(prev, dst)
+    path.reverse()
+    return dist[dst], path
+
+def bidirectional_dijkstra(G: AnyGraph, src: NodeId, dst: NodeId, *, stats: Optional[SearchStats] = None) -> Tuple[float, List[NodeId]]:
+    """
+    Dijkstra grown from both ends at once (the graph is undirected); stops once the
+    two frontier minima together reach the best meeting distance found so far.
+    """
+    if src == dst:
+        instrument.count_heap_ops("bidirectional_dijkstra", 1, 0)
+        if stats is not None:
+            stats.expanded += 1
+            stats.pushed += 1
+        return 0.0, [src]
+    dist = ({src: 0.0}, {dst: 0.0})
+    prev: Tuple[Dict[NodeId, NodeId], Dict[NodeId, NodeId]] = ({}, {})
+    done = (set(), set())
+    pqs = ([(0.0, src)], [(0.0, dst)])
+    best, meet = math.inf, -1
+    expanded, pushed = 0, 2
+    while pqs[0] and pqs[1]:
+        if pqs[0][0][0] + pqs[1][0][0] >= best:
+            break
+        side = 0 if pqs[0][0][0] <= pqs[1][0][0] else 1
+        d, u = heapq.heappop(pqs[side])
+        if u in done[side]: continue
+        done[side].add(u)
+        expanded += 1
+        dist_s, dist_o = dist[side], dist[1 - side]
+        for v, w in G.neighbors(u):
+            nd = d + w
+            if nd < dist_s.get(v, math.inf):
+                dist_s[v] = nd
+                prev[side][v] = u
+                heapq.heappush(pqs[side], (nd, v))
+                pushed += 1
+            if v in dist_o and dist_s[v] + dist_o[v] < best:
+                best, meet = dist_s[v] + dist_o[v], v
+    instrument.count_heap_ops("bidirectional_dijkstra", pushed, len(pqs[0]) + len(pqs[1]))
+    if stats is not None:
+        stats.expanded += expanded
+        stats.pushed += pushed
+    if meet < 0: return math.inf, []
+    fwd = _walk_back(prev[0], meet)
+    fwd.reverse()
+    return best, fwd + _walk_back(prev[1], meet)[1:]
+
+def one_to_many(G: AnyGraph, src: NodeId, targets: Iterable[NodeId], *, stats: Optional[SearchStats] = None) -> Dict[NodeId, float]:
+    """Distances from src to each target (inf if unreachable); stops once all are settled."""
+    remaining = set(targets)
+    out = {t: math.inf for t in remaining}
+    dist: Dict[NodeId, float] = {src: 0.0}
+    pq = [(0.0, src)]
+    expanded = pushed = 0
+    while pq and remaining:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]: continue
+        expanded += 1
+        if u in remaining:
+            out[u] = d
+            remaining.discard(u)
+            if not remaining: break
+        for v, w in G.neighbors(u):
+            nd = d + w
+            if nd < dist.get(v, math.inf):
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+                pushed += 1
+    instrument.count_heap_ops("one_to_many", pushed + 1, len(pq))
+    if stats is not None:
+        stats.expanded += expanded
+        stats.pushed += pushed + 1
+    return out
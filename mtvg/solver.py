@@ -0,0 +1,301 @@
+# mtvg/solver.py
+"""
+Bounded-suboptimal search for the moving-target TSP with obstacles.
+
+A state is (set of intercepted targets, last target, time): the agent stands at
+the last target's interception point tau_k(t) (or at the depot). A successor
+intercepts one more target k at the earliest feasible time, either directly from
+the current point or by travelling the visibility graph to a node q and catching
+k on a straight, visible leg from q (see `interception.InterceptionEngine`). When
+every target is caught, the agent returns to the depot; the cost is the return time.
+
+Because the agent is at least as fast as every target, arriving earlier at a
+target dominates arriving later (the agent can shadow the target), so per
+(set, last target) only the earliest arrival is kept. The same argument lets an
+agent that caught a target on an obstacle boundary, where no graph node is
+visible, shadow it until one is before moving on.
+
+Search orders:
+  "focal":  expand, among open states with f <= w * f_min, the one with the most
+            targets caught (FOCAL search); the result costs at most w * optimum.
+  "wastar": weighted A* on g + w * h; same bound.
+`anytime` re-runs with decreasing w, pruning by the incumbent, and reports each
+improved tour with a lower bound on the optimum.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import heapq
+import math
+import numpy as np
+
+from .geometry import Coord
+from .interception import InterceptionEngine
+from .models import Scene, Target
+
+DEPOT = -1  # `last` of the start state
+RETURN = -2  # `last` of a goal state (back at the depot)
+
+@dataclass
+class Solution:
+    tour: List[Tuple[int, float]]  # (target id, interception time), in visiting order
+    cost: float                    # time of return to the depot
+    lower_bound: float             # proven lower bound on the optimal cost
+    w: float                       # suboptimality factor the search ran with
+    expanded: int
+    generated: int
+
+    @property
+    def gap(self) -> float:
+        """cost / lower_bound, the proven suboptimality of this tour."""
+        return self.cost / self.lower_bound if self.lower_bound > 0 else math.inf
+
+class _State:
+    __slots__ = ("mask", "last", "t", "pos", "g", "h", "parent", "dead")
+
+    def __init__(self, mask: int, last: int, t: float, pos: Coord, h: float, parent: Optional["_State"]):
+        self.mask, self.last, self.t, self.pos = mask, last, t, pos
+        self.g, self.h = t, h
+        self.parent = parent
+        self.dead = False
+
+    @property
+    def f(self) -> float:
+        return self.g + self.h
+
+class MTTSPSolver:
+    """
+    Preprocesses a scene once (visibility graph over the depot and convex vertices,
+    all-pairs graph distances, node x target x window visibility intervals) and then
+    answers `solve` / `anytime` queries. An `InterceptionEngine` already built for the
+    scene and targets can be passed in instead.
+    """
+    def __init__(self, scene: Scene, targets: Sequence[Target], *, engine: Optional[InterceptionEngine] = None,
+                 workers: int = 1, **interval_kwargs):
+        self.scene = scene
+        self.targets = list(targets)
+        self.v = scene.v_max
+        if engine is None:
+            engine = InterceptionEngine(scene, self.targets, workers=workers, **interval_kwargs)
+        self.engine = engine
+        self.graph, self.nodes, self.dist, self.table = (
+            self.engine.graph, self.engine.nodes, self.engine.dist, self.engine.table)
+        self.depot_node = 0  # supplied points come first
+        self.opens = [t.windows.lower for t in self.targets]
+        self.closes = [t.windows.upper for t in self.targets]
+        self.full = (1 << len(self.targets)) - 1
+
+    # successor generation (public so that other tour builders step exactly like the search)
+
+    def node_distances(self, p: Coord) -> np.ndarray:
+        """Shortest obstacle-avoiding distance from point p to every graph node."""
+        if p == self.scene.depot.xy:
+            return self.dist[self.depot_node]
+        return self.engine.node_distances(p)
+
+    def earliest_intercept(self, p: Coord, t: float, k: int, d_nodes: np.ndarray) -> float:
+        """Earliest time >= t the agent at p can catch target k (inf if never); d_nodes = node_distances(p)."""
+        if p == self.scene.depot.xy:
+            return self.engine.earliest_arrival(self.depot_node, t, k)
+        return self.engine.arrival_from_point(p, t, k, d_nodes)
+
+    def departure(self, last: int, t: float, pos: Coord) -> Tuple[float, Coord, np.ndarray]:
+        """
+        When and where the agent moves on from a state, with its graph distances. A
+        target caught as it emerges from an obstacle can sit on the boundary, where no
+        graph node is visible; the agent then shadows it (it is at least as fast) until
+        one is.
+        """
+        d_nodes = self.node_distances(pos)
+        if last < 0 or np.isfinite(d_nodes).any():
+            return t, pos, d_nodes
+        tau, upper = self.targets[last].xy, self.closes[last]
+        step = max(self.engine.quantum, 1e-9)
+        while t < upper:
+            t = min(t + step, upper)
+            step *= 2.0
+            pos = tau(t)
+            d_nodes = self.node_distances(pos)
+            if np.isfinite(d_nodes).any():
+                break
+        return t, pos, d_nodes
+
+    def _heuristic(self, mask: int, t: float, pos: Coord) -> float:
+        """Admissible: the agent must still return to the depot and wait for unopened windows."""
+        depot = self.scene.depot.xy
+        h = math.hypot(pos[0] - depot[0], pos[1] - depot[1]) / self.v
+        for k in range(len(self.targets)):
+            if not mask >> k & 1:
+                h = max(h, self.opens[k] - t)
+        return h
+
+    def _successors(self, s: _State) -> Iterator[_State]:
+        t, p, d_nodes = self.departure(s.last, s.t, s.pos)
+        if s.mask == self.full:
+            back = t + float(d_nodes[self.depot_node]) / self.v
+            if math.isfinite(back):
+                yield _State(s.mask, RETURN, back, self.scene.depot.xy, 0.0, s)
+            return
+        for k in range(len(self.targets)):
+            if s.mask >> k & 1 or self.closes[k] < t:
+                continue
+            t_k = self.earliest_intercept(p, t, k, d_nodes)
+            if math.isfinite(t_k):
+                pos = self.targets[k].xy(t_k)
+                mask = s.mask | 1 << k
+                yield _State(mask, k, t_k, pos, self._heuristic(mask, t_k, pos), s)
+
+    # search
+
+    def _check_size(self) -> None:
+        if len(self.targets) > 62:
+            raise ValueError("at most 62 targets (visited sets are int bitmasks)")
+
+    def _search(self, w: float, strategy: str, incumbent: float, max_open: Optional[int],
+                max_expansions: Optional[int]) -> Tuple[Optional[_State], float, int, int]:
+        """
+        One bounded-suboptimal search. Returns (goal or None, lower bound, expanded,
+        generated). States with f >= incumbent are pruned; if the open list exceeds
+        max_open, its worst half is dropped and the smallest dropped f caps the bound.
+        """
+        depot = self.scene.depot.xy
+        root = _State(0, DEPOT, 0.0, depot, self._heuristic(0, 0.0, depot), None)
+        best_t: Dict[Tuple[int, int], float] = {}
+        open_f: List[Tuple[float, int, _State]] = []   # every live state, by f
+        focal: List[Tuple[tuple, int, _State]] = []    # states eligible for expansion
+        pending: List[Tuple[float, int, _State]] = []  # focal search: f > w * f_min for now
+        pruned_f = math.inf
+        n_live = 0
+        counter = 0
+        expanded = generated = 0
+
+        def focal_key(s: _State) -> tuple:
+            if strategy == "wastar":
+                return (s.g + w * s.h,)
+            return (-bin(s.mask).count("1"), s.f)
+
+        def push(s: _State, f_min: float) -> None:
+            nonlocal counter, n_live
+            counter += 1
+            n_live += 1
+            heapq.heappush(open_f, (s.f, counter, s))
+            if strategy == "wastar" or s.f <= w * f_min:
+                heapq.heappush(focal, (focal_key(s), counter, s))
+            else:
+                heapq.heappush(pending, (s.f, counter, s))
+
+        def f_min() -> float:
+            while open_f and open_f[0][2].dead:
+                heapq.heappop(open_f)
+            return open_f[0][0] if open_f else math.inf
+
+        def trim() -> None:
+            nonlocal pruned_f, n_live, open_f, focal, pending
+            live = sorted((e for e in open_f if not e[2].dead), key=lambda e: e[0])
+            keep = max(1, max_open // 2)
+            for _, _, s in live[keep:]:
+                s.dead = True
+            if len(live) > keep:
+                pruned_f = min(pruned_f, live[keep][0])
+            open_f = live[:keep]
+            focal = [e for e in focal if not e[2].dead]
+            pending = [e for e in pending if not e[2].dead]
+            heapq.heapify(focal); heapq.heapify(pending)
+            n_live = keep if len(live) > keep else len(live)
+
+        push(root, root.f)
+        generated = 1
+        while True:
+            fm = f_min()
+            if fm == math.inf:
+                return None, min(pruned_f, incumbent), expanded, generated
+            if strategy == "focal":
+                while pending and pending[0][0] <= w * fm:
+                    _, c, s = heapq.heappop(pending)
+                    if not s.dead:
+                        heapq.heappush(focal, (focal_key(s), c, s))
+            while focal and focal[0][2].dead:
+                heapq.heappop(focal)
+            if not focal:
+                # every eligible state was dropped; promote the best remaining one
+                _, c, s = open_f[0]
+                heapq.heappush(focal, (focal_key(s), c, s))
+            _, c, s = heapq.heappop(focal)
+            if strategy == "focal" and s.f > w * fm:
+                heapq.heappush(pending, (s.f, c, s))  # f_min dropped since s was queued
+                continue
+            s.dead = True
+            n_live -= 1
+            if s.last == RETURN:
+                return s, min(fm, pruned_f, s.g), expanded, generated
+            if s.t > best_t.get((s.mask, s.last), math.inf):
+                continue  # dominated after it was queued
+            expanded += 1
+            if max_expansions is not None and expanded > max_expansions:
+                return None, min(fm, pruned_f, incumbent), expanded, generated
+            for c in self._successors(s):
+                generated += 1
+                if c.f >= incumbent:
+                    pruned_f = min(pruned_f, incumbent)
+                    continue
+                key = (c.mask, c.last)
+                if c.last != RETURN:
+                    if c.t >= best_t.get(key, math.inf):
+                        continue
+                    best_t[key] = c.t
+                push(c, fm)
+            if max_open is not None and n_live > max_open:
+                trim()
+
+    def _solution(self, goal: _State, lower_bound: float, w: float, expanded: int, generated: int) -> Solution:
+        tour = []
+        s = goal.parent
+        while s is not None and s.last >= 0:
+            tour.append((self.targets[s.last].id, s.t))
+            s = s.parent
+        tour.reverse()
+        return Solution(tour=tour, cost=goal.g, lower_bound=min(lower_bound, goal.g), w=w,
+                        expanded=expanded, generated=generated)
+
+    def solve(self, w: float = 1.0, *, strategy: str = "focal", max_open: Optional[int] = None,
+              max_expansions: Optional[int] = None) -> Optional[Solution]:
+        """
+        Tour costing at most w times the optimum (None if there is no feasible tour, or
+        the expansion limit was hit). With max_open the bound is reported, not guaranteed:
+        see Solution.lower_bound.
+        """
+        if w < 1.0:
+            raise ValueError("w must be >= 1")
+        self._check_size()
+        if strategy not in ("focal", "wastar"):
+            raise ValueError(f"unknown strategy {strategy!r}; expected 'focal' or 'wastar'")
+        goal, lb, expanded, generated = self._search(w, strategy, math.inf, max_open, max_expansions)
+        return None if goal is None else self._solution(goal, lb, w, expanded, generated)
+
+    def anytime(self, w0: float = 3.0, *, strategy: str = "focal", shrink: float = 0.5,
+                max_open: Optional[int] = None, max_expansions: Optional[int] = None) -> Iterator[Solution]:
+        """
+        Runs searches with w = w0, then 1 + shrink * (w - 1), ... down to 1, each pruned by
+        the best tour so far, and yields every improved tour with its lower bound. Stops
+        once the bound meets the incumbent cost.
+        """
+        self._check_size()
+        best: Optional[Solution] = None
+        w = w0
+        while True:
+            incumbent = best.cost if best is not None else math.inf
+            goal, lb, expanded, generated = self._search(w, strategy, incumbent, max_open, max_expansions)
+            if best is not None:
+                lb = max(lb, best.lower_bound)  # earlier bounds still hold
+            if goal is not None:
+                best = self._solution(goal, lb, w, expanded, generated)
+                yield best
+            elif best is not None and lb > best.lower_bound:
+                # no better tour under this w: the incumbent is within the new bound
+                best = Solution(best.tour, best.cost, min(lb, best.cost), w, expanded, generated)
+                yield best
+            if w <= 1.0 or (best is not None and best.lower_bound >= best.cost):
+                return
+            w = max(1.0, 1.0 + shrink * (w - 1.0))
+            if w - 1.0 < 1e-3:
+                w = 1.0
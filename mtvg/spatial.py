@@ -0,0 +1,191 @@
+# mtvg/spatial.py
+"""
+Uniform-grid spatial hash over 2D points.
+
+Points are bucketed by (floor(x / cell), floor(y / cell)). Queries visit cells in
+rings of growing Chebyshev radius around the query's cell, clipped to the box of
+occupied cells; every point in ring r is at least (r - 1) * cell away, so
+candidates can be reported in exact distance order while the rings are still
+being expanded, and the expansion stops at the first ring beyond a distance limit. With a cell size near the mean
+point spacing, each query touches O(1 + k) cells.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import heapq
+import math
+import numpy as np
+
+from .geometry import Coord, ObstacleEdges, visible_many
+
+Cell = Tuple[int, int]
+
+class GridIndex:
+    """Mutable grid hash from integer ids to points."""
+    def __init__(self, cell: float):
+        if not cell > 0:
+            raise ValueError("cell size must be positive")
+        self.cell = float(cell)
+        self.cells: Dict[Cell, List[int]] = {}
+        self.coords: Dict[int, Coord] = {}
+        self._lo = [math.inf, math.inf]   # occupied cell-key bounds (grow only)
+        self._hi = [-math.inf, -math.inf]
+
+    @classmethod
+    def build(cls, points: Iterable[Tuple[int, Coord]], cell: Optional[float] = None) -> "GridIndex":
+        """Index (id, point) pairs; the default cell holds about one point on average."""
+        items = list(points)
+        if cell is None:
+            cell = 1.0
+            if len(items) > 1:
+                xy = np.asarray([p for _, p in items], dtype=float)
+                w, h = np.ptp(xy, axis=0)
+                cell = math.sqrt(max(w * h, max(w, h) ** 2 / len(items), 1e-18) / len(items))
+        grid = cls(cell)
+        for i, p in items:
+            grid.add(i, p)
+        return grid
+
+    def key(self, p: Coord) -> Cell:
+        return (math.floor(p[0] / self.cell), math.floor(p[1] / self.cell))
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def __contains__(self, i: int) -> bool:
+        return i in self.coords
+
+    def add(self, i: int, p: Coord) -> None:
+        if i in self.coords:
+            self.remove(i)
+        k = self.key(p)
+        self.cells.setdefault(k, []).append(i)
+        self.coords[i] = p
+        for d in (0, 1):
+            self._lo[d] = min(self._lo[d], k[d])
+            self._hi[d] = max(self._hi[d], k[d])
+
+    def remove(self, i: int) -> None:
+        k = self.key(self.coords.pop(i))
+        bucket = self.cells[k]
+        bucket.remove(i)
+        if not bucket:
+            del self.cells[k]
+
+    def _ring(self, c: Cell, r: int) -> Iterator[List[int]]:
+        """Non-empty buckets at Chebyshev radius r from cell c, within the occupied bounds."""
+        cx, cy = c
+        (x_lo, y_lo), (x_hi, y_hi) = self._lo, self._hi
+        get = self.cells.get
+        if r == 0:
+            b = get(c)
+            if b:
+                yield b
+            return
+        xs = range(max(cx - r, x_lo), min(cx + r, x_hi) + 1)
+        for y in (cy - r, cy + r):
+            if y_lo <= y <= y_hi:
+                for x in xs:
+                    b = get((x, y))
+                    if b:
+                        yield b
+        ys = range(max(cy - r + 1, y_lo), min(cy + r - 1, y_hi) + 1)
+        for x in (cx - r, cx + r):
+            if x_lo <= x <= x_hi:
+                for y in ys:
+                    b = get((x, y))
+                    if b:
+                        yield b
+
+    def by_distance(self, p: Coord, max_dist: float = math.inf) -> Iterator[Tuple[float, int]]:
+        """Every indexed (distance, id) with distance <= max_dist, nearest first."""
+        if not self.coords:
+            return
+        c = self.key(p)
+        # rings that cannot reach the occupied cells are skipped
+        gap = max(self._lo[0] - c[0], c[0] - self._hi[0], self._lo[1] - c[1], c[1] - self._hi[1], 0)
+        r_max = max(c[0] - self._lo[0], self._hi[0] - c[0], c[1] - self._lo[1], self._hi[1] - c[1])
+        heap: List[Tuple[float, int]] = []
+        for r in range(gap, r_max + 1):
+            if (r - 1) * self.cell > max_dist:
+                break  # ring r and beyond are all farther
+            for bucket in self._ring(c, r):
+                for i in bucket:
+                    q = self.coords[i]
+                    heapq.heappush(heap, (math.hypot(q[0] - p[0], q[1] - p[1]), i))
+            bound = r * self.cell  # nothing beyond ring r is nearer than this
+            while heap and heap[0][0] <= bound:
+                if heap[0][0] > max_dist:
+                    return
+                yield heapq.heappop(heap)
+        while heap and heap[0][0] <= max_dist:
+            yield heapq.heappop(heap)
+
+    def nearest(self, p: Coord, k: int = 1) -> List[int]:
+        """Ids of the k nearest points, nearest first (ties by id)."""
+        out = []
+        for _, i in self.by_distance(p):
+            if len(out) == k:
+                break
+            out.append(i)
+        return out
+
+    def within(self, p: Coord, r: float) -> List[int]:
+        """Ids of the points at distance <= r, nearest first."""
+        return [i for _, i in self.by_distance(p, r)]
+
+    def visible_from(self, p: Coord, obstacles: ObstacleEdges, *, k: Optional[int] = None,
+                     max_dist: float = math.inf, batch: int = 32) -> List[int]:
+        """
+        Ids of points seen from p, nearest first: candidates are tested closest-first in
+        vectorized batches, stopping once k are found or candidates exceed max_dist.
+        """
+        out: List[int] = []
+        cand: List[int] = []
+
+        def flush() -> None:
+            pts = np.asarray([self.coords[i] for i in cand], dtype=float)
+            out.extend(i for i, ok in zip(cand, visible_many(p, pts, obstacles).tolist()) if ok)
+            cand.clear()
+
+        for _, i in self.by_distance(p, max_dist):
+            cand.append(i)
+            if len(cand) == batch:
+                flush()
+                if k is not None and len(out) >= k:
+                    return out[:k]
+                batch *= 2  # few batches for "all visible" queries
+        if cand:
+            flush()
+        return out if k is None else out[:k]
+
+def unique_points(pts: Sequence[Coord], tol: float = 1e-9) -> List[Coord]:
+    """
+    Points with near-duplicates dropped (|dx| <= tol and |dy| <= tol to an earlier
+    kept point), as float tuples in input order. O(n) expected via a grid of cell tol.
+    """
+    out: List[Coord] = []
+    if tol <= 0:
+        seen = set()
+        for x, y in pts:
+            c = (float(x), float(y))
+            if c not in seen:
+                seen.add(c)
+                out.append(c)
+        return out
+    cells: Dict[Cell, List[Coord]] = {}
+    for x, y in pts:
+        x, y = float(x), float(y)
+        cx, cy = math.floor(x / tol), math.floor(y / tol)
+        dup = False
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for ux, uy in cells.get((gx, gy), ()):
+                    if abs(x - ux) <= tol and abs(y - uy) <= tol:
+                        dup = True
+                        break
+                if dup: break
+            if dup: break
+        if not dup:
+            cells.setdefault((cx, cy), []).append((x, y))
+            out.append((x, y))
+    return out
@@ -0,0 +1,387 @@
+# mtvg/sweep.py
+"""
+Lee's rotational plane sweep for visibility graphs.
+
+For every node p, all obstacle vertices and nodes are sorted by angle around p and a
+ray from p is rotated once around it. The obstacle edges the ray currently crosses are
+kept ordered by distance along the ray in a treap, so each candidate w is checked
+against the single nearest edge instead of the whole obstacle set, and edges enter and
+leave in O(log n) expected time: O(n log n) per node, O(n^2 log n) in total.
+
+Visibility matches `geometry.segment_intersects_obstacles`: segments may touch obstacles
+at their endpoints only. Obstacles are assumed interior-disjoint (edges of different
+obstacles never cross); nodes lying on an obstacle edge or vertex (to within 1e-9, like
+visible_many) are treated as extra vertices or as that vertex.
+"""
+from __future__ import annotations
+from functools import cmp_to_key
+from typing import Callable, Dict, Iterator, List, Sequence, Set, Tuple
+import math
+import random
+import numpy as np
+
+from .geometry import Coord, Obstacle, orient as _orient, points_inside
+
+_EPS = 1e-9  # contact tolerance, as in visible_many
+
+# (previous vertex, next vertex, inserted): the obstacle wedge at a ring vertex; inserted
+# marks a node lying inside the edge previous -> next
+_Wedge = Tuple[Coord, Coord, bool]
+
+def _near(a: Coord, b: Coord) -> bool:
+    return abs(a[0] - b[0]) <= _EPS and abs(a[1] - b[1]) <= _EPS
+
+def _half(p: Coord, c: Coord) -> int:
+    """0 for directions with angle in [0, pi), 1 for [pi, 2 pi)."""
+    dy = c[1] - p[1]
+    return 0 if dy > 0 or (dy == 0 and c[0] > p[0]) else 1
+
+def _ccw_rings(obstacles: Sequence[Obstacle]) -> List[List[Coord]]:
+    rings = []
+    for obs in obstacles:
+        ring = [(float(x), float(y)) for x, y in obs.vertices]
+        if len(ring) > 1 and ring[0] == ring[-1]:
+            ring.pop()
+        if len(ring) < 3:
+            continue
+        area2 = sum(_orient((0.0, 0.0), ring[k], ring[(k + 1) % len(ring)]) for k in range(len(ring)))
+        if area2 < 0:
+            ring.reverse()
+        rings.append(ring)
+    return rings
+
+def _split_at_nodes(rings: List[List[Coord]], nodes: Sequence[Coord]) -> List[List[Tuple[Coord, _Wedge]]]:
+    """
+    Insert nodes lying inside an obstacle edge (up to _EPS, like `visible_many`) as extra
+    (straight-angle) ring vertices. Each ring vertex comes with its wedge, spanned by the
+    original vertices around it: an inserted node may be off the edge's line by
+    rounding, and the wedges must follow the obstacle itself.
+    """
+    pts = np.asarray(nodes, dtype=float).reshape(-1, 2)
+    out = []
+    for ring in rings:
+        new_ring: List[Tuple[Coord, _Wedge]] = []
+        m = len(ring)
+        for k in range(m):
+            a, b = ring[k], ring[(k + 1) % m]
+            new_ring.append((a, (ring[k - 1], b, False)))
+            if not len(pts):
+                continue
+            lo = np.minimum(a, b) - _EPS
+            hi = np.maximum(a, b) + _EPS
+            cand = np.flatnonzero(np.all((pts >= lo) & (pts <= hi), axis=1))
+            tol = _EPS * math.hypot(b[0] - a[0], b[1] - a[1])
+            on_edge = []
+            for c in cand.tolist():
+                c_xy = nodes[c]
+                if not _near(c_xy, a) and not _near(c_xy, b) and abs(_orient(a, b, c_xy)) <= tol:
+                    on_edge.append(((c_xy[0] - a[0]) ** 2 + (c_xy[1] - a[1]) ** 2, c_xy))
+            new_ring.extend((c_xy, (a, b, True)) for _, c_xy in sorted(on_edge))
+        out.append(new_ring)
+    return out
+
+def _wedge_blocks(v: Coord, wedges: List[_Wedge], tip: Coord) -> bool:
+    """
+    True iff the segment v -> tip enters (or runs along) an obstacle at vertex v. A tip
+    within _EPS of an incident edge's line counts as on it, as in `visible_many`.
+    """
+    for prev, nxt, inserted in wedges:
+        if inserted:
+            # v lies inside the edge prev -> nxt, whose interior side is on the left
+            if _orient(prev, nxt, tip) >= -_EPS * math.dist(prev, nxt):
+                return True
+            continue
+        # interior of a CCW polygon at v is the CCW sweep from (nxt - v) to (prev - v)
+        turn = _orient(prev, v, nxt)
+        c1 = _orient(v, nxt, tip)
+        c2 = _orient(v, tip, prev)
+        if abs(c1) <= _EPS * math.dist(v, nxt):
+            c1 = 0.0
+        if abs(c2) <= _EPS * math.dist(v, prev):
+            c2 = 0.0
+        if turn > 0:
+            if c1 >= 0 and c2 >= 0:
+                return True
+        elif turn < 0:
+            if c1 >= 0 or c2 >= 0:
+                return True
+        elif c1 >= 0:
+            return True
+    return False
+
+class _ActiveEdges:
+    """Edges crossing the sweep ray, nearest first: a treap whose order is given by the caller."""
+    def __init__(self, seed: int = 0):
+        self._rng = random.Random(seed)
+        self._prio: Dict[int, float] = {}
+        self._left: Dict[int, int] = {}
+        self._right: Dict[int, int] = {}
+        self._parent: Dict[int, int] = {}
+        self._root = -1
+
+    def __contains__(self, e: int) -> bool:
+        return e in self._prio
+
+    def __len__(self) -> int:
+        return len(self._prio)
+
+    def __iter__(self) -> Iterator[int]:
+        """In order, lazily: taking the first few edges costs O(log n)."""
+        stack: List[int] = []
+        node = self._root
+        while stack or node >= 0:
+            while node >= 0:
+                stack.append(node)
+                node = self._left[node]
+            node = stack.pop()
+            yield node
+            node = self._right[node]
+
+    def _rotate_up(self, x: int) -> None:
+        p = self._parent[x]
+        g = self._parent[p]
+        if self._left[p] == x:
+            b = self._right[x]
+            self._left[p], self._right[x] = b, p
+        else:
+            b = self._left[x]
+            self._right[p], self._left[x] = b, p
+        if b >= 0:
+            self._parent[b] = p
+        self._parent[p] = x
+        self._parent[x] = g
+        if g < 0:
+            self._root = x
+        elif self._left[g] == p:
+            self._left[g] = x
+        else:
+            self._right[g] = x
+
+    def insert(self, e: int, goes_before: Callable[[int], bool]) -> None:
+        """Insert e ahead of the edges f with goes_before(f), which must be a suffix of the order."""
+        parent, node, left = -1, self._root, False
+        while node >= 0:
+            parent = node
+            left = goes_before(node)
+            node = self._left[node] if left else self._right[node]
+        prio = self._rng.random()
+        self._prio[e] = prio
+        self._left[e] = self._right[e] = -1
+        self._parent[e] = parent
+        if parent < 0:
+            self._root = e
+            return
+        if left:
+            self._left[parent] = e
+        else:
+            self._right[parent] = e
+        while self._parent[e] >= 0 and self._prio[self._parent[e]] > prio:
+            self._rotate_up(e)
+
+    def remove(self, e: int) -> None:
+        while True:
+            l, r = self._left[e], self._right[e]
+            if l < 0 and r < 0:
+                break
+            self._rotate_up(l if r < 0 or (l >= 0 and self._prio[l] < self._prio[r]) else r)
+        p = self._parent[e]
+        if p < 0:
+            self._root = -1
+        elif self._left[p] == e:
+            self._left[p] = -1
+        else:
+            self._right[p] = -1
+        for d in (self._prio, self._left, self._right, self._parent):
+            del d[e]
+
+class VisibilitySweep:
+    """Sweep state for one obstacle set and node list; `visible_from(i)` runs the sweep around node i."""
+    def __init__(self, obstacles: Sequence[Obstacle], points: Sequence[Coord]):
+        self.coords: List[Coord] = []
+        self.is_obstacle_vertex: List[bool] = []
+        self.wedges: List[List[_Wedge]] = []
+        self.incident: List[List[int]] = []
+        self.edges: List[Tuple[int, int]] = []
+        ids: Dict[Coord, int] = {}
+
+        def vid(c: Coord) -> int:
+            k = ids.get(c)
+            if k is None:
+                k = ids[c] = len(self.coords)
+                self.coords.append(c)
+                self.is_obstacle_vertex.append(False)
+                self.wedges.append([])
+                self.incident.append([])
+            return k
+
+        node_coords = [(float(x), float(y)) for x, y in points]
+        for ring in _split_at_nodes(_ccw_rings(obstacles), node_coords):
+            m = len(ring)
+            ring_ids = [vid(c) for c, _ in ring]
+            for k in range(m):
+                u, v = ring_ids[k], ring_ids[(k + 1) % m]
+                self.is_obstacle_vertex[u] = True
+                self.wedges[u].append(ring[k][1])
+                e = len(self.edges)
+                self.edges.append((u, v))
+                self.incident[u].append(e)
+                self.incident[v].append(e)
+
+        # a node within _EPS of a ring vertex is that vertex
+        ring_pts = np.asarray(self.coords, dtype=float).reshape(-1, 2)
+        self.node_vids = []
+        for c in node_coords:
+            k = ids.get(c)
+            if k is None and len(ring_pts):
+                close = np.flatnonzero(np.all(np.abs(ring_pts - c) <= _EPS, axis=1))
+                k = int(close[0]) if len(close) else None
+            self.node_vids.append(vid(c) if k is None else k)
+        pure = [i for i, k in enumerate(self.node_vids) if not self.is_obstacle_vertex[k]]
+        self.node_inside = [False] * len(points)
+        if pure and obstacles:
+            flags = points_inside([points[i] for i in pure], obstacles)
+            for i, f in zip(pure, flags.tolist()):
+                self.node_inside[i] = f
+        self.node_of_vid: Dict[int, int] = {k: i for i, k in enumerate(self.node_vids)}
+
+    def _ray_param(self, e: int, p: Coord, d: Coord) -> float:
+        """Distance (in units of d) from p to edge e along the ray p + t d."""
+        a = self.coords[self.edges[e][0]]
+        b = self.coords[self.edges[e][1]]
+        ex, ey = b[0] - a[0], b[1] - a[1]
+        den = d[0] * ey - d[1] * ex
+        if den == 0.0:
+            return math.inf
+        return ((a[0] - p[0]) * ey - (a[1] - p[1]) * ex) / den
+
+    def _crosses(self, e: int, p: Coord, w: Coord) -> bool:
+        """Edge e (known to cross the ray p -> w) meets the segment p -> w."""
+        a = self.coords[self.edges[e][0]]
+        b = self.coords[self.edges[e][1]]
+        op = _orient(a, b, p)
+        ow = _orient(a, b, w)
+        return ow == 0.0 or (op > 0) != (ow > 0)
+
+    def _insert(self, active: _ActiveEdges, e: int, v: int, p: Coord, d: Coord, s_v: float) -> None:
+        """Insert edge e, which starts at vertex v on the current ray, in distance order."""
+        u0, u1 = self.edges[e]
+        x_new = self.coords[u1 if u0 == v else u0]
+        cv = self.coords[v]
+
+        def new_first(f: int) -> bool:
+            t = self._ray_param(f, p, d)
+            if v in self.edges[f] and math.isclose(t, s_v, rel_tol=1e-12, abs_tol=1e-15):
+                # both start at v: the one turned further towards p is nearer afterwards
+                f0, f1 = self.edges[f]
+                x_old = self.coords[f1 if f0 == v else f0]
+                return _orient(cv, x_new, x_old) < 0
+            return s_v < t
+
+        active.insert(e, new_first)
+
+    def visible_from(self, i: int) -> Set[int]:
+        """Node indices j whose segment from node i is collision-free."""
+        out: Set[int] = set()
+        if self.node_inside[i]:
+            return out
+        vp = self.node_vids[i]
+        p = self.coords[vp]
+        n_v = len(self.coords)
+        coords = self.coords
+
+        def by_angle(a: int, b: int) -> int:
+            ca, cb = coords[a], coords[b]
+            ha, hb = _half(p, ca), _half(p, cb)
+            if ha != hb:
+                return ha - hb
+            o = _orient(p, ca, cb)
+            if o != 0:
+                return -1 if o > 0 else 1
+            da = (ca[0] - p[0]) ** 2 + (ca[1] - p[1]) ** 2
+            db = (cb[0] - p[0]) ** 2 + (cb[1] - p[1]) ** 2
+            return (da > db) - (da < db)
+
+        order = sorted((k for k in range(n_v) if k != vp), key=cmp_to_key(by_angle))
+        if not order:
+            return out
+        # angular rank of every vertex; vertices on one ray from p share a rank
+        groups: List[List[int]] = []
+        rank: Dict[int, int] = {}
+        for k in order:
+            if groups:
+                g0 = coords[groups[-1][0]]
+                if _half(p, g0) == _half(p, coords[k]) and _orient(p, g0, coords[k]) == 0:
+                    groups[-1].append(k)
+                    rank[k] = len(groups) - 1
+                    continue
+            groups.append([k])
+            rank[k] = len(groups) - 1
+        skip = set(self.incident[vp])
+
+        # edges crossing the starting ray (angle 0, pointing +x), nearest first
+        init = []
+        for e, (u, v) in enumerate(self.edges):
+            if e in skip:
+                continue
+            o = _orient(p, self.coords[u], self.coords[v])
+            if o == 0:
+                continue
+            cw, ccw = (u, v) if o > 0 else (v, u)
+            if rank[cw] > rank[ccw]:
+                init.append((self._ray_param(e, p, (1.0, 0.0)), e))
+        init.sort()
+        active = _ActiveEdges(seed=i)
+        for _, e in init:
+            active.insert(e, lambda f: False)
+
+        for group in groups:
+            first = coords[group[0]]
+            d = (first[0] - p[0], first[1] - p[1])
+            dd = d[0] * d[0] + d[1] * d[1]
+
+            ray_blocked = False
+            for w in group:
+                j = self.node_of_vid.get(w)
+                if j is not None and not ray_blocked and not self.node_inside[j]:
+                    cw_ = self.coords[w]
+                    own = self.incident[w]
+                    hit = False
+                    for e in active:
+                        if e in own:
+                            continue
+                        hit = self._crosses(e, p, cw_)
+                        break
+                    if not hit and not _wedge_blocks(p, self.wedges[vp], cw_) \
+                            and not _wedge_blocks(cw_, self.wedges[w], p):
+                        out.add(j)
+                if self.is_obstacle_vertex[w]:
+                    ray_blocked = True
+
+            # rotate past this ray: drop edges ending here, then add edges starting here
+            for w in group:
+                cw_ = self.coords[w]
+                for e in self.incident[w]:
+                    if e in skip:
+                        continue
+                    u0, u1 = self.edges[e]
+                    if _orient(p, cw_, self.coords[u1 if u0 == w else u0]) < 0 and e in active:
+                        active.remove(e)
+            for w in group:
+                cw_ = self.coords[w]
+                s_w = ((cw_[0] - p[0]) * d[0] + (cw_[1] - p[1]) * d[1]) / dd
+                for e in self.incident[w]:
+                    if e in skip:
+                        continue
+                    u0, u1 = self.edges[e]
+                    if _orient(p, cw_, self.coords[u1 if u0 == w else u0]) > 0:
+                        self._insert(active, e, w, p, d, s_w)
+        return out
+
+def sweep_visible_pairs(obstacles: Sequence[Obstacle], points: Sequence[Coord]) -> List[Tuple[int, int]]:
+    """All pairs (i, j), i < j, of `points` that see each other, in lexicographic order."""
+    sweep = VisibilitySweep(obstacles, points)
+    pairs: List[Tuple[int, int]] = []
+    for i in range(len(points)):
+        vis = sweep.visible_from(i)
+        pairs.extend((i, j) for j in sorted(vis) if j > i)
+    return pairs
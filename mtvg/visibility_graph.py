@@ -1,16 +1,39 @@
 # mtvg/visibility_graph.py
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+from pathlib import Path
+import heapq
 import math
-from .geometry import Coord, Obstacle, make_obstacles_union, visible, extract_convex_vertices
+import numpy as np
+from . import cache, instrument
+from .geometry import (Coord, Obstacle, ObstacleEdges, SceneIndex, _orient_sign, extract_convex_vertices,
+                       segments_hit_box, visible_many)
+from .spatial import GridIndex, unique_points
+from .sweep import VisibilitySweep
 
 NodeId = int
 
+_DEDUP_TOL = 1e-9  # unique_points tolerance used for the node set
+_REDUCED_BATCH = 2048  # segments per visible_many call when building a reduced graph
+
 @dataclass
 class Graph:
     nodes: List[Coord]
     adj: Dict[NodeId, List[Tuple[NodeId, float]]]
+    # obstacles the graph was built against, needed by insert_point
+    obstacle_edges: Optional[ObstacleEdges] = field(default=None, compare=False, repr=False)
+    # the obstacles themselves and the nodes present only as their convex vertices,
+    # needed by add_obstacle / remove_obstacle
+    obstacles: Optional[List[Obstacle]] = field(default=None, compare=False, repr=False)
+    vertex_nodes: Set[NodeId] = field(default_factory=set, compare=False, repr=False)
+    reduced: bool = field(default=False, compare=False, repr=False)
+    # ids released by remove_point, reused smallest first
+    free: List[NodeId] = field(default_factory=list, compare=False, repr=False)
+    # spatial hash over the live nodes, built by `spatial()` and kept up to date afterwards
+    _grid: Optional[GridIndex] = field(default=None, compare=False, repr=False)
 
     @classmethod
     def empty(cls) -> "Graph":
@@ -20,62 +43,655 @@ class Graph:
         nid = len(self.nodes)
         self.nodes.append(coord)
         self.adj[nid] = []
+        if self._grid is not None:
+            self._grid.add(nid, coord)
         return nid
 
     def add_undirected_edge(self, u: NodeId, v: NodeId, w: float) -> None:
         self.adj[u].append((v, w))
         self.adj[v].append((u, w))
 
+    def insert_point(self, coord: Coord) -> NodeId:
+        """
+        Add a node at coord and connect it to every node it sees. Only the segments from
+        the new point are tested (one vectorized batch), so this is O(n) rather than a
+        rebuild. Reuses an id freed by `remove_point` if there is one.
+        """
+        if self.obstacle_edges is None:
+            raise ValueError("graph has no obstacle data; build it with build_visibility_graph")
+        if self.reduced:
+            raise ValueError("points cannot be inserted into a reduced graph; rebuild it instead")
+        live = sorted(self.adj)
+        if self.free:
+            nid = heapq.heappop(self.free)
+            self.nodes[nid] = coord
+            self.adj[nid] = []
+            if self._grid is not None:
+                self._grid.add(nid, coord)
+        else:
+            nid = self.add_node(coord)
+        if live:
+            pts = np.asarray([self.nodes[u] for u in live], dtype=float)
+            for k in np.flatnonzero(visible_many(coord, pts, self.obstacle_edges)).tolist():
+                u = live[k]
+                self.add_undirected_edge(nid, u, euclid(coord, self.nodes[u]))
+        return nid
+
+    def remove_point(self, nid: NodeId) -> None:
+        """Delete node nid and its edges; the id is kept for reuse by `insert_point`."""
+        if self.reduced:
+            raise ValueError("points cannot be removed from a reduced graph; rebuild it instead")
+        nbrs = self.adj.pop(nid)
+        for v in {v for v, _ in nbrs}:
+            self.adj[v] = [(u, w) for u, w in self.adj[v] if u != nid]
+        heapq.heappush(self.free, nid)
+        self.vertex_nodes.discard(nid)
+        if self._grid is not None:
+            self._grid.remove(nid)
+
+    def _check_obstacle_data(self) -> None:
+        if self.obstacles is None or self.obstacle_edges is None:
+            raise ValueError("graph has no obstacle data; build it with build_visibility_graph")
+        if self.reduced:
+            raise ValueError("obstacles cannot be changed on a reduced graph; rebuild it instead")
+
+    def _node_at(self, coord: Coord) -> Optional[NodeId]:
+        """A live node within the node-dedup tolerance of coord, if any."""
+        for u in self.nodes_within(coord, 2 * _DEDUP_TOL):
+            p = self.nodes[u]
+            if abs(p[0] - coord[0]) <= _DEDUP_TOL and abs(p[1] - coord[1]) <= _DEDUP_TOL:
+                return u
+        return None
+
+    def _edge_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        us, vs = [], []
+        for u, nbrs in self.adj.items():
+            for v, _ in nbrs:
+                if u < v:
+                    us.append(u)
+                    vs.append(v)
+        return np.asarray(us, dtype=np.int64), np.asarray(vs, dtype=np.int64)
+
+    def _drop_edges(self, us: np.ndarray, vs: np.ndarray) -> None:
+        gone: Dict[NodeId, Set[NodeId]] = {}
+        for u, v in zip(us.tolist(), vs.tolist()):
+            gone.setdefault(u, set()).add(v)
+            gone.setdefault(v, set()).add(u)
+        for u, drop in gone.items():
+            self.adj[u] = [(v, w) for v, w in self.adj[u] if v not in drop]
+
+    def add_obstacle(self, obstacle: Obstacle) -> List[NodeId]:
+        """
+        Add an obstacle to a built graph, with the same result (up to node ids) as
+        rebuilding over the enlarged obstacle list: edges whose segments meet the
+        obstacle's bounding box are tested against its polygon alone and dropped if
+        blocked, then its convex vertices are inserted like `insert_point`.
+        Returns the ids of the new vertex nodes.
+        """
+        self._check_obstacle_data()
+        own = ObstacleEdges.from_obstacles([obstacle])
+        if own.is_empty:
+            return []
+        lo, hi = own.a.min(axis=0), own.a.max(axis=0)
+        us, vs = self._edge_arrays()
+        pts = np.asarray(self.nodes, dtype=float).reshape(-1, 2)
+        near = np.flatnonzero(segments_hit_box(pts[us], pts[vs], lo, hi))
+        blocked = near[~visible_many(pts[us[near]], pts[vs[near]], own)]
+        self._drop_edges(us[blocked], vs[blocked])
+
+        self.obstacles = self.obstacles + [obstacle]
+        self.obstacle_edges = ObstacleEdges.from_obstacles(self.obstacles)
+        added = []
+        for c in extract_convex_vertices([obstacle]):
+            c = (float(c[0]), float(c[1]))
+            if self._node_at(c) is None:
+                nid = self.insert_point(c)
+                self.vertex_nodes.add(nid)
+                added.append(nid)
+        return added
+
+    def remove_obstacle(self, obstacle: Union[Obstacle, int]) -> List[NodeId]:
+        """
+        Remove an obstacle (or the one at that index of `obstacles`) from a built graph,
+        with the same result (up to node ids) as a rebuild: nodes present only as its
+        convex vertices are deleted, and the non-adjacent node pairs whose segments
+        meet its bounding box and are blocked by its polygon are re-tested against the
+        remaining obstacles. Returns the ids of the deleted nodes.
+        """
+        self._check_obstacle_data()
+        k = obstacle if isinstance(obstacle, int) else self.obstacles.index(obstacle)
+        removed = self.obstacles[k]
+        self.obstacles = self.obstacles[:k] + self.obstacles[k + 1:]
+        self.obstacle_edges = ObstacleEdges.from_obstacles(self.obstacles)
+        own = ObstacleEdges.from_obstacles([removed])
+        if own.is_empty:
+            return []
+
+        still_vertices = set(unique_points(extract_convex_vertices(self.obstacles)))
+        dropped = []
+        for c in extract_convex_vertices([removed]):
+            u = self._node_at(c)
+            if u is not None and u in self.vertex_nodes and self.nodes[u] not in still_vertices:
+                self.remove_point(u)
+                dropped.append(u)
+
+        lo, hi = own.a.min(axis=0), own.a.max(axis=0)
+        live = np.asarray(sorted(self.adj), dtype=np.int64)
+        pts = np.asarray(self.nodes, dtype=float).reshape(-1, 2)
+        cand_u, cand_v = [], []
+        for i in range(len(live) - 1):
+            u, vs = live[i], live[i + 1:]
+            vs = vs[segments_hit_box(pts[u], pts[vs], lo, hi)]
+            if len(vs):
+                vs = vs[~np.isin(vs, [v for v, _ in self.adj[u]])]
+                cand_u.append(np.full(len(vs), u))
+                cand_v.append(vs)
+        if not cand_u:
+            return dropped
+        us, vs = np.concatenate(cand_u), np.concatenate(cand_v)
+        # pairs the removed obstacle did not block are still blocked by another one
+        was = ~visible_many(pts[us], pts[vs], own)
+        us, vs = us[was], vs[was]
+        now = visible_many(pts[us], pts[vs], self.obstacle_edges)
+        for u, v in zip(us[now].tolist(), vs[now].tolist()):
+            self.add_undirected_edge(u, v, euclid(self.nodes[u], self.nodes[v]))
+        return dropped
+
+    def spatial(self) -> GridIndex:
+        """Grid hash over the live nodes (built on first use)."""
+        if self._grid is None:
+            self._grid = GridIndex.build((u, self.nodes[u]) for u in self.adj)
+        return self._grid
+
+    def nearest_nodes(self, coord: Coord, k: int = 1) -> List[NodeId]:
+        """The k nodes nearest to coord, nearest first."""
+        return self.spatial().nearest(coord, k)
+
+    def nodes_within(self, coord: Coord, radius: float) -> List[NodeId]:
+        """Nodes at Euclidean distance <= radius from coord, nearest first."""
+        return self.spatial().within(coord, radius)
+
+    def visible_nodes(self, coord: Coord, *, k: Optional[int] = None, max_dist: float = math.inf) -> List[NodeId]:
+        """
+        Nodes seen from an arbitrary point, nearest first; with k or max_dist only the
+        closest candidates are tested.
+        """
+        if self.obstacle_edges is None:
+            raise ValueError("graph has no obstacle data; build it with build_visibility_graph")
+        return self.spatial().visible_from(coord, self.obstacle_edges, k=k, max_dist=max_dist)
+
+    def neighbors(self, u: NodeId) -> List[Tuple[NodeId, float]]:
+        return self.adj[u]
+
+    def edges(self) -> Iterator[Tuple[NodeId, NodeId, float]]:
+        """Each undirected edge once, as (u, v, w) with u < v."""
+        for u, nbrs in self.adj.items():
+            for v, w in nbrs:
+                if u < v:
+                    yield u, v, w
+
+    def freeze(self) -> "CSRGraph":
+        """Immutable array-backed copy; neighbor order is preserved, freed ids become isolated nodes."""
+        n = len(self.nodes)
+        deg = np.array([len(self.adj.get(u, ())) for u in range(n)], dtype=np.int64)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(deg, out=indptr[1:])
+        nnz = int(indptr[-1])
+        indices = np.empty(nnz, dtype=np.int64)
+        weights = np.empty(nnz, dtype=np.float64)
+        for u in range(n):
+            nbrs = self.adj.get(u)
+            if nbrs:
+                s, e = indptr[u], indptr[u + 1]
+                indices[s:e], weights[s:e] = zip(*nbrs)
+        coords = np.asarray(self.nodes, dtype=np.float64).reshape(n, 2)
+        return CSRGraph(coords=coords, indptr=indptr, indices=indices, weights=weights)
+
+@dataclass(frozen=True, eq=False)
+class CSRGraph:
+    """
+    Compressed sparse row form of `Graph`: the neighbors of u are
+    indices[indptr[u]:indptr[u + 1]] with matching float64 weights.
+    Arrays are made read-only; use `thaw()` to get an editable `Graph` back.
+    """
+    coords: np.ndarray   # (n, 2) float64
+    indptr: np.ndarray   # (n + 1,) int64
+    indices: np.ndarray  # (nnz,) int64, each undirected edge stored in both rows
+    weights: np.ndarray  # (nnz,) float64
+
+    def __post_init__(self):
+        for a in (self.coords, self.indptr, self.indices, self.weights):
+            a.flags.writeable = False
+
+    @cached_property
+    def nodes(self) -> List[Coord]:
+        return [tuple(c) for c in self.coords.tolist()]
+
+    @property
+    def num_nodes(self) -> int:
+        return self.coords.shape[0]
+
+    @property
+    def num_edges(self) -> int:
+        return self.indices.shape[0] // 2
+
+    @property
+    def nbytes(self) -> int:
+        return self.coords.nbytes + self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes
+
+    def degree(self, u: NodeId) -> int:
+        return int(self.indptr[u + 1] - self.indptr[u])
+
+    def neighbors(self, u: NodeId) -> List[Tuple[NodeId, float]]:
+        s, e = self.indptr[u], self.indptr[u + 1]
+        return list(zip(self.indices[s:e].tolist(), self.weights[s:e].tolist()))
+
+    def edges(self) -> Iterator[Tuple[NodeId, NodeId, float]]:
+        """Each undirected edge once, as (u, v, w) with u < v."""
+        rows = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+        keep = rows < self.indices
+        yield from zip(rows[keep].tolist(), self.indices[keep].tolist(), self.weights[keep].tolist())
+
+    def thaw(self) -> Graph:
+        adj = {u: self.neighbors(u) for u in range(self.num_nodes)}
+        return Graph(nodes=list(self.nodes), adj=adj)
+
+_UNTESTED, _VISIBLE, _BLOCKED = 0, 1, 2
+
+@dataclass
+class LazyStats:
+    nodes: int
+    expanded: int  # rows computed
+    tested: int    # node pairs whose visibility was tested
+    pairs: int     # n (n - 1) / 2
+
+    @property
+    def fraction_tested(self) -> float:
+        return self.tested / self.pairs if self.pairs else 0.0
+
+class _LazyRows(dict):
+    """adj of a LazyGraph: a missing row is computed on first access."""
+    def __init__(self, graph: "LazyGraph"):
+        super().__init__()
+        self.graph = graph
+
+    def __missing__(self, u: NodeId) -> List[Tuple[NodeId, float]]:
+        row = self[u] = self.graph._expand(u)
+        return row
+
+class LazyGraph:
+    """
+    Visibility graph over a fixed node set (as `build_visibility_graph` would choose)
+    whose edges are found on demand: the neighbors of u are computed the first time
+    `adj[u]` is read, i.e. when a search expands u. Pair results are memoized in a
+    symmetric n x n int8 table (untested / visible / blocked), so expanding v later
+    only tests the pairs no earlier expansion covered. Construction does no
+    visibility tests; rows come out sorted by node id, as in a pairwise build.
+    """
+    def __init__(self, obstacles: Union[List[Obstacle], SceneIndex], points: List[Coord]):
+        index = obstacles if isinstance(obstacles, SceneIndex) else SceneIndex(obstacles)
+        self.obstacles = list(index.obstacles)
+        self.obstacle_edges = index.edges
+        self.nodes = unique_points(list(points) + extract_convex_vertices(index))
+        self.vertex_nodes = set(range(len(unique_points(points)), len(self.nodes)))
+        self._pts = np.asarray(self.nodes, dtype=float).reshape(-1, 2)
+        n = len(self.nodes)
+        self._known = np.zeros((n, n), dtype=np.int8)  # zero pages are only touched when tested
+        np.fill_diagonal(self._known, _BLOCKED)
+        self.tested = 0
+        self.adj: Dict[NodeId, List[Tuple[NodeId, float]]] = _LazyRows(self)
+
+    def _expand(self, u: NodeId) -> List[Tuple[NodeId, float]]:
+        row = self._known[u]
+        todo = np.flatnonzero(row == _UNTESTED)
+        if len(todo):
+            ok = visible_many(self._pts[u], self._pts[todo], self.obstacle_edges)
+            flags = np.where(ok, _VISIBLE, _BLOCKED).astype(np.int8)
+            row[todo] = flags
+            self._known[todo, u] = flags
+            self.tested += len(todo)
+            instrument.count("lazy_graph.pairs_tested", len(todo))
+        pu = self.nodes[u]
+        return [(v, euclid(pu, self.nodes[v])) for v in np.flatnonzero(row == _VISIBLE).tolist()]
+
+    def neighbors(self, u: NodeId) -> List[Tuple[NodeId, float]]:
+        return self.adj[u]
+
+    def stats(self) -> LazyStats:
+        n = len(self.nodes)
+        return LazyStats(nodes=n, expanded=len(self.adj), tested=self.tested, pairs=n * (n - 1) // 2)
+
+    def materialize(self) -> Graph:
+        """Every row computed, as a plain `Graph` (equal to the pairwise build)."""
+        G = Graph(nodes=list(self.nodes), adj={u: list(self.adj[u]) for u in range(len(self.nodes))})
+        G.obstacle_edges, G.obstacles, G.vertex_nodes = self.obstacle_edges, self.obstacles, set(self.vertex_nodes)
+        return G
+
+    def edges(self) -> Iterator[Tuple[NodeId, NodeId, float]]:
+        """Each undirected edge once, as (u, v, w) with u < v (computes every row)."""
+        return self.materialize().edges()
+
+    def freeze(self) -> CSRGraph:
+        return self.materialize().freeze()
+
+AnyGraph = Union[Graph, CSRGraph, LazyGraph]
+
+@dataclass
+class SearchStats:
+    """Work counters filled in by the shortest-path searches."""
+    expanded: int = 0  # nodes settled (popped with their final distance)
+    pushed: int = 0    # heap insertions
+
 def euclid(a: Coord, b: Coord) -> float:
     return math.hypot(a[0] - b[0], a[1] - b[1])
 
+class _Tangency:
+    """
+    Bitangency filter for reduced graphs. An edge between two obstacle vertices is
+    tangent at an endpoint if both neighbours of that vertex lie on one closed side of
+    the edge's line. Vertices shared by several obstacles count as tangent for every
+    edge, and edges incident to a supplied point are always kept.
+    """
+    def __init__(self, all_points: List[Coord], edges: ObstacleEdges, n_supplied: int):
+        wedges: Dict[Coord, List[int]] = {}
+        for k, a in enumerate(edges.a.tolist()):
+            wedges.setdefault(tuple(a), []).append(k)
+        n = len(all_points)
+        self.n_supplied = n_supplied
+        self.pts = np.asarray(all_points, dtype=float).reshape(-1, 2)
+        self.prev = np.zeros((n, 2))
+        self.next = np.zeros((n, 2))
+        self.filtered = np.zeros(n, dtype=bool)
+        for i in range(n_supplied, n):
+            ks = wedges.get(all_points[i], ())
+            if len(ks) == 1:
+                k = ks[0]
+                self.filtered[i] = True
+                self.prev[i] = edges.a[edges.prev[k]]
+                self.next[i] = edges.b[k]
+
+    def _ok_at(self, at: np.ndarray, other: np.ndarray) -> np.ndarray:
+        """Edge at -> other is tangent at `at` (index arrays of equal length)."""
+        o, q = self.pts[at], self.pts[other]
+        sp = _orient_sign(o[:, 0], o[:, 1], q[:, 0], q[:, 1], self.prev[at, 0], self.prev[at, 1])
+        sn = _orient_sign(o[:, 0], o[:, 1], q[:, 0], q[:, 1], self.next[at, 0], self.next[at, 1])
+        return ~self.filtered[at] | (sp * sn >= 0)
+
+    def keeps(self, us: np.ndarray, vs: np.ndarray) -> np.ndarray:
+        """Which of the edges us[k] - vs[k] survive the filter."""
+        return (us < self.n_supplied) | (vs < self.n_supplied) | (self._ok_at(us, vs) & self._ok_at(vs, us))
+
+    def mask(self, i: int, js: np.ndarray) -> np.ndarray:
+        """Which of the edges i -> js survive the filter."""
+        return self.keeps(np.full(len(js), i), js)
 
-def _unique_points(pts: List[Coord], tol: float = 1e-9) -> List[Coord]:
-    """Deduplicate points with a small tolerance."""
-    out: List[Coord] = []
-    for x, y in pts:
-        is_dup = False
-        for ux, uy in out:
-            if abs(x - ux) <= tol and abs(y - uy) <= tol:
-                is_dup = True
-                break
-        if not is_dup:
-            out.append((float(x), float(y)))
-    return out
-
-def build_visibility_graph(obstacles: List[Obstacle], points: List[Coord]) -> Graph:
+def _row_visibility(method: str, obstacles: List[Obstacle], all_points: List[Coord],
+                    edges: Optional[ObstacleEdges] = None, n_supplied: Optional[int] = None) -> Callable[[int], List[NodeId]]:
+    """
+    Returns row(i) -> sorted node ids j > i visible from node i (geometry preprocessed once).
+    With n_supplied (the number of leading supplied points), only the edges kept by
+    `_Tangency` are returned, and the pairwise method tests visibility of those alone.
+    """
+    if edges is None and (method != "sweep" or n_supplied is not None):
+        edges = ObstacleEdges.from_obstacles(obstacles)
+    tangent = _Tangency(all_points, edges, n_supplied) if n_supplied is not None else None
+    if method == "sweep":
+        sweep = VisibilitySweep(obstacles, all_points)
+
+        def row(i: int) -> List[NodeId]:
+            js = np.asarray(sorted(j for j in sweep.visible_from(i) if j > i), dtype=np.int64)
+            return (js if tangent is None else js[tangent.mask(i, js)]).tolist()
+        return row
+    pts = np.asarray(all_points, dtype=float).reshape(-1, 2)
+    if tangent is None:
+        # test the whole row i -> (i+1..n-1) in one vectorized batch
+        return lambda i: (np.flatnonzero(visible_many(pts[i], pts[i + 1:], edges)) + i + 1).tolist()
+
+    # pruned rows are short, so consecutive rows are tested together in batches of about
+    # _REDUCED_BATCH segments to spread the per-call cost of visible_many
+    done: Dict[int, List[NodeId]] = {}
+
+    def reduced_row(i: int) -> List[NodeId]:
+        if i not in done:
+            rows, size, k = [], 0, i
+            while k < len(pts) and (size == 0 or size < _REDUCED_BATCH):
+                js = np.arange(k + 1, len(pts))
+                js = js[tangent.mask(k, js)]
+                rows.append((k, js))
+                size += len(js)
+                k += 1
+            p0 = np.concatenate([np.broadcast_to(pts[r], (len(js), 2)) for r, js in rows])
+            p1 = pts[np.concatenate([js for _, js in rows])]
+            ok = visible_many(p0, p1, edges)
+            at = 0
+            for r, js in rows:
+                done[r] = js[ok[at:at + len(js)]].tolist()
+                at += len(js)
+        return done.pop(i)
+    return reduced_row
+
+# Per-process row solver, set up once by the pool initializer.
+_worker_row: Optional[Callable[[int], List[NodeId]]] = None
+
+def _init_worker(method: str, obstacles: List[Obstacle], all_points: List[Coord], n_supplied: Optional[int]) -> None:
+    global _worker_row
+    _worker_row = _row_visibility(method, obstacles, all_points, n_supplied=n_supplied)
+
+def _solve_rows(block: Tuple[int, int]) -> List[List[NodeId]]:
+    return [_worker_row(i) for i in range(*block)]
+
+def build_visibility_graph(
+    obstacles: Union[List[Obstacle], SceneIndex],
+    points: List[Coord],
+    *,
+    method: str = "pairwise",
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+    reduced: bool = False,
+    lazy: bool = False,
+) -> Union[Graph, LazyGraph]:
     """
     Nodes = user-supplied points ∪ convex obstacle vertices.
     Add an edge iff the segment is collision-free; weight = Euclidean.
+
+    method:
+      "pairwise": test every node pair against the obstacles (vectorized per row).
+      "sweep": Lee's rotational plane sweep, O(n^2 log n); same graph, but assumes
+               interior-disjoint obstacles (see mtvg.sweep).
+    workers: > 1 splits the rows i of the (i, j > i) pair triangle into blocks of
+      `chunk_size` rows and solves them on a process pool. Each worker preprocesses
+      the obstacles once; the merged graph is identical to the serial build.
+    obstacles may be a SceneIndex (e.g. `scene.index`) to reuse its preprocessing.
+    reduced: keep only the edges between obstacle vertices that are tangent at both ends
+      (see `_Tangency`), checked before any visibility test, plus the few others that a
+      shortest path between two supplied points needs (see `_repair`). Every edge passes
+      `visible`, and distances between supplied points equal the full graph's; distances
+      to an obstacle vertex may grow. Points cannot be inserted into or removed from a reduced graph.
+    lazy: return a `LazyGraph` instead, which tests a node's visibility only when a
+      search expands it (method, workers and cache_dir do not apply).
+    cache_dir: directory of prebuilt graphs (default: $MTVG_CACHE_DIR, if set). A graph
+      for the same obstacles, points, method and reduced flag is loaded from there
+      instead of rebuilt; a newly built one is stored (see mtvg.cache).
     """
-    convex = extract_convex_vertices(obstacles)
-    all_points = _unique_points(points + convex)
+    if method not in ("pairwise", "sweep"):
+        raise ValueError(f"unknown method {method!r}; expected 'pairwise' or 'sweep'")
+    if lazy:
+        if reduced:
+            raise ValueError("a lazy graph cannot be reduced")
+        return LazyGraph(obstacles, points)
+    directory = cache.cache_dir(cache_dir)
+    if directory is None:
+        return _build_graph(obstacles, points, method, workers, chunk_size, reduced)
+    path = directory / f"{cache.graph_key(obstacles, points, method, reduced)}.npz"
+    if path.exists():
+        with instrument.stage("build_visibility_graph.cache_load"):
+            G = cache.load_graph(path)
+        G.reduced = reduced
+        return G
+    index = obstacles if isinstance(obstacles, SceneIndex) else SceneIndex(obstacles)
+    G = _build_graph(index, points, method, workers, chunk_size, reduced)
+    cache.save_graph(path, index, G)
+    return G
 
-    G = Graph.empty()
-    for p in all_points:
-        G.add_node(p)
+def _build_graph(obstacles: Union[List[Obstacle], SceneIndex], points: List[Coord], method: str,
+                 workers: int, chunk_size: Optional[int], reduced: bool = False) -> Graph:
+    with instrument.stage("build_visibility_graph.index"):
+        index = obstacles if isinstance(obstacles, SceneIndex) else SceneIndex(obstacles)
+        obstacles = list(index.obstacles)
+        convex = extract_convex_vertices(index)
+        edges = index.edges
 
-    obs_union = make_obstacles_union(obstacles)
+    with instrument.stage("build_visibility_graph.nodes"):
+        all_points = unique_points(list(points) + convex)
+        n_points = len(unique_points(points))
+        n_supplied = n_points if reduced else None
+        G = Graph.empty()
+        G.obstacle_edges = edges
+        G.obstacles = obstacles
+        G.vertex_nodes = set(range(n_points, len(all_points)))
+        G.reduced = reduced
+        for p in all_points:
+            G.add_node(p)
 
     n = len(all_points)
-    for i in range(n):
-        pi = all_points[i]
-        for j in range(i + 1, n):
-            pj = all_points[j]
-            if visible(pi, pj, obs_union):
-                G.add_undirected_edge(i, j, euclid(pi, pj))
+    with instrument.stage("build_visibility_graph.edges"):
+        if workers > 1 and n > 1:
+            if chunk_size is None:
+                # several blocks per worker; early rows are longer, so this also balances load
+                chunk_size = max(1, n // (8 * workers))
+            blocks = [(s, min(s + chunk_size, n)) for s in range(0, n, chunk_size)]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(method, obstacles, all_points, n_supplied)) as pool:
+                rows = [r for block in pool.map(_solve_rows, blocks) for r in block]
+        else:
+            row = _row_visibility(method, obstacles, all_points, G.obstacle_edges, n_supplied)
+            rows = [row(i) for i in range(n)]
+
+    with instrument.stage("build_visibility_graph.graph"):
+        for i, visible_js in enumerate(rows):
+            pi = all_points[i]
+            for j in visible_js:
+                G.add_undirected_edge(i, j, euclid(pi, all_points[j]))
+    if reduced:
+        with instrument.stage("build_visibility_graph.repair"):
+            _repair(G, n_points)
     return G
 
-def dijkstra(G: Graph, src: NodeId, dst: NodeId) -> Tuple[float, List[NodeId]]:
-    import heapq
+def _repair(G: Graph, n_supplied: int) -> None:
+    """
+    Add to a tangent-pruned graph the other visible edges that shortest paths between
+    supplied points need. `visible` rejects segments along an obstacle edge, so where
+    a shortest path would follow one the full graph detours, bending at some vertex
+    without being tangent there.
+
+    The pruned graph plus the obstacle edges (plus) holds every Euclidean shortest
+    path that starts at a supplied point, since those only bend where they are tangent;
+    its distances D_t to a supplied point t bound the full graph's from below. A path
+    from an obstacle vertex x may leave it along a pruned pair, so there the bound is
+    h_t(x) = min(D_t[x], min over pruned pairs x y of |x y| + D_t[y]). A pair s, t is
+    settled when its plus path uses no obstacle edge (it is then a path of the pruned
+    graph as short as the bound); otherwise an A* search over the full graph, guided by
+    h_t and cut off at the pruned graph's distance, finds its shortest path. Only the
+    pruned pairs that could still shorten it are tested for visibility.
+    """
+    n = len(G.nodes)
+    pts = np.asarray(G.nodes, dtype=float).reshape(-1, 2)
+    ids = {c: u for u, c in enumerate(G.nodes)}
+    boundary: Set[Tuple[NodeId, NodeId]] = set()
+    for a, b in zip(G.obstacle_edges.a.tolist(), G.obstacle_edges.b.tolist()):
+        u, v = ids.get(tuple(a)), ids.get(tuple(b))
+        if u is not None and v is not None and u != v:
+            boundary.add((min(u, v), max(u, v)))
+    plus = Graph(nodes=G.nodes, adj={u: list(nbrs) for u, nbrs in G.adj.items()})
+    for u, v in boundary:
+        plus.add_undirected_edge(u, v, euclid(G.nodes[u], G.nodes[v]))
+    C = plus.freeze()
+
+    flagged: Dict[NodeId, List[NodeId]] = {}
+    trees: Dict[NodeId, np.ndarray] = {}
+    for t in range(n_supplied):
+        dist_t, prev_t = _csr_search(C, t, -1)
+        prev_t = prev_t.tolist()
+        for s in range(t):
+            u, on_boundary = s, False
+            while u != t and prev_t[u] >= 0 and not on_boundary:
+                v = prev_t[u]
+                on_boundary = (min(u, v), max(u, v)) in boundary
+                u = v
+            if on_boundary:
+                flagged.setdefault(t, []).append(s)
+                trees[t] = dist_t
+    if not flagged:
+        return
+
+    tangent = _Tangency(G.nodes, G.obstacle_edges, n_supplied)
+    us, vs = np.triu_indices(n, 1)
+    pruned = np.zeros((n, n), dtype=bool)
+    pruned[us, vs] = pruned[vs, us] = ~tangent.keeps(us, vs)
+    span = np.hypot(pts[:, None, 0] - pts[None, :, 0], pts[:, None, 1] - pts[None, :, 1])
+    known = np.zeros((n, n), dtype=np.int8)  # visibility of the pruned pairs, as in LazyGraph
+    for t, sources in flagged.items():
+        dist_t = trees[t]
+        h = np.minimum(dist_t, np.where(pruned, span + dist_t, math.inf).min(axis=1))
+        bound = _csr_search(G.freeze(), t, -1)[0]
+        for s in sources:
+            _astar_full(G, s, t, h, float(bound[s]), pruned, span, known, pts)
+
+def _astar_full(G: Graph, s: NodeId, t: NodeId, h: np.ndarray, bound: float, pruned: np.ndarray,
+                span: np.ndarray, known: np.ndarray, pts: np.ndarray) -> None:
+    """
+    A* from s to t over G plus the visible pruned pairs, ignoring paths not shorter than
+    `bound`; adds the missing edges of a shorter path to G.
+    """
+    g = {s: 0.0}
+    prev = {s: -1}
+    pq = [(float(h[s]), 0.0, s)]
+    while pq:
+        f, gx, x = heapq.heappop(pq)
+        if gx > g[x]:
+            continue
+        if f >= bound:
+            return
+        if x == t:
+            break
+        # pruned pairs that could lead to a shorter path, tested once for the whole repair
+        js = np.flatnonzero(pruned[x] & (gx + span[x] + h < bound))
+        todo = js[known[x, js] == _UNTESTED]
+        if len(todo):
+            flags = np.where(visible_many(pts[x], pts[todo], G.obstacle_edges), _VISIBLE, _BLOCKED).astype(np.int8)
+            known[x, todo] = flags
+            known[todo, x] = flags
+        nbrs = G.adj[x] + [(y, float(span[x, y])) for y in js[known[x, js] == _VISIBLE].tolist()]
+        for y, w in nbrs:
+            gy = gx + w
+            if gy < g.get(y, math.inf):  # a node may be reopened: h is admissible, not consistent
+                g[y] = gy
+                prev[y] = x
+                heapq.heappush(pq, (gy + float(h[y]), gy, y))
+    else:
+        return
+    have = {(u, v) for u in prev for v, _ in G.adj[u]}
+    v = t
+    while prev[v] >= 0:
+        u = prev[v]
+        if (u, v) not in have:
+            G.add_undirected_edge(u, v, euclid(G.nodes[u], G.nodes[v]))
+        v = u
+
+def dijkstra(G: AnyGraph, src: NodeId, dst: NodeId, *, stats: Optional[SearchStats] = None) -> Tuple[float, List[NodeId]]:
+    if isinstance(G, CSRGraph):
+        return _dijkstra_csr(G, src, dst, stats)
     n = len(G.nodes)
     dist = [math.inf] * n
     prev = [-1] * n
     dist[src] = 0.0
     pq = [(0.0, src)]
+    expanded = pushed = 0
     while pq:
         d, u = heapq.heappop(pq)
         if d > dist[u]: continue
+        expanded += 1
         if u == dst: break
         for v, w in G.adj[u]:
             nd = d + w
@@ -83,6 +699,11 @@ def dijkstra(G: Graph, src: NodeId, dst: NodeId) -> Tuple[float, List[NodeId]]:
                 dist[v] = nd
                 prev[v] = u
                 heapq.heappush(pq, (nd, v))
+                pushed += 1
+    if stats is not None:
+        stats.expanded += expanded
+        stats.pushed += pushed + 1
+    instrument.count_heap_ops("dijkstra", pushed + 1, len(pq))
     if not math.isfinite(dist[dst]): return math.inf, []
     path = []
     cur = dst
@@ -92,4 +713,49 @@ def dijkstra(G: Graph, src: NodeId, dst: NodeId) -> Tuple[float, List[NodeId]]:
     path.reverse()
     return dist[dst], path
 
+def shortest_path_tree(G: AnyGraph, src: NodeId) -> Tuple[np.ndarray, np.ndarray]:
+    """Distances and predecessors from src to every node (inf and -1 where unreachable)."""
+    C = G if isinstance(G, CSRGraph) else G.freeze()
+    return _csr_search(C, src, -1)
+
+def _dijkstra_csr(G: CSRGraph, src: NodeId, dst: NodeId, stats: Optional[SearchStats]) -> Tuple[float, List[NodeId]]:
+    dist, prev = _csr_search(G, src, dst, stats)
+    if not math.isfinite(dist[dst]): return math.inf, []
+    path = []
+    cur = dst
+    while cur != -1:
+        path.append(cur)
+        cur = int(prev[cur])
+    path.reverse()
+    return float(dist[dst]), path
 
+def _csr_search(G: CSRGraph, src: NodeId, dst: NodeId, stats: Optional[SearchStats] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # same search as `dijkstra`, with each node's edges relaxed as one array operation;
+    # dst < 0 settles every reachable node
+    indptr, indices, weights = G.indptr, G.indices, G.weights
+    dist = np.full(G.num_nodes, math.inf)
+    prev = np.full(G.num_nodes, -1, dtype=np.int64)
+    dist[src] = 0.0
+    pq = [(0.0, src)]
+    expanded = pushed = 0
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]: continue
+        expanded += 1
+        if u == dst: break
+        s, e = indptr[u], indptr[u + 1]
+        nbrs = indices[s:e]
+        nd = d + weights[s:e]
+        better = nd < dist[nbrs]
+        if better.any():
+            nbrs, nd = nbrs[better], nd[better]
+            dist[nbrs] = nd
+            prev[nbrs] = u
+            for v, dv in zip(nbrs.tolist(), nd.tolist()):
+                heapq.heappush(pq, (dv, v))
+            pushed += len(nd)
+    if stats is not None:
+        stats.expanded += expanded
+        stats.pushed += pushed + 1
+    instrument.count_heap_ops("dijkstra", pushed + 1, len(pq))
+    return dist, prev
@@ -1,10 +1,22 @@
 """
 Basic visualization helpers for MTVG-TSP.
+
+Obstacles, edges and paths are each drawn as one collection built straight from
+arrays, so figures with tens of thousands of visibility edges render in about a
+second. `animate_targets` renders target motion headlessly (Agg, no pyplot),
+to a GIF or a directory of PNG frames, redrawing only the moving markers per frame.
 """
 
 from dataclasses import dataclass
-from typing import Sequence, Tuple, Optional
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+
+from .intervals import positions
 
 Coord = Tuple[float, float]
 
@@ -12,38 +24,164 @@ Coord = Tuple[float, float]
 class PolyObstacle:
     vertices: Sequence[Coord]
 
+def edge_segments(G, max_edges: Optional[int] = None, seed: int = 0) -> np.ndarray:
+    """
+    Edges of a Graph or CSRGraph as an (m, 2, 2) array of endpoint pairs, read from
+    the CSR arrays; with max_edges, a uniform random subset of at most that many.
+    """
+    C = G if hasattr(G, "indptr") else G.freeze()
+    rows = np.repeat(np.arange(C.num_nodes), np.diff(C.indptr))
+    keep = rows < C.indices
+    seg = np.stack([C.coords[rows[keep]], C.coords[C.indices[keep]]], axis=1)
+    return _subsample(seg, max_edges, seed)
+
+def _subsample(seg: np.ndarray, max_edges: Optional[int], seed: int) -> np.ndarray:
+    if max_edges is None or len(seg) <= max_edges:
+        return seg
+    pick = np.random.default_rng(seed).choice(len(seg), size=max_edges, replace=False)
+    return seg[np.sort(pick)]
+
+def _as_segments(edges) -> np.ndarray:
+    """(m, 2, 2) segments from an array, or from (i, j, pi, pj) tuples."""
+    if isinstance(edges, np.ndarray):
+        return edges.reshape(-1, 2, 2)
+    return np.asarray([(pi, pj) for _, _, pi, pj in edges], dtype=float).reshape(-1, 2, 2)
+
+def _obstacle_collection(obstacles) -> PolyCollection:
+    return PolyCollection([np.asarray(o.vertices, dtype=float) for o in obstacles],
+                          facecolors=(0.5, 0.5, 0.5, 0.3), edgecolors="black")
+
 def draw_scene(
     obstacles: Sequence[PolyObstacle],
     depot: Optional[Coord] = None,
     static_points: Optional[Sequence[Coord]] = None,
-    visibility_edges: Optional[Sequence[Tuple[int, int, Coord, Coord]]] = None,
+    visibility_edges: Optional[Union[Sequence[Tuple[int, int, Coord, Coord]], np.ndarray]] = None,
     ax: Optional[plt.Axes] = None,
+    *,
+    graph=None,
+    paths: Optional[Sequence[Sequence[Coord]]] = None,
+    max_edges: Optional[int] = None,
+    seed: int = 0,
 ) -> plt.Axes:
-    """Draw obstacles, points, and edges."""
+    """
+    Draw obstacles, points, and edges.
+    - obstacles: anything with `.vertices` (PolyObstacle, geometry.Obstacle).
+    - visibility_edges: (i, j, pi, pj) tuples or an (m, 2, 2) segment array;
+      graph: a Graph / CSRGraph whose edges are drawn instead (see `edge_segments`).
+    - paths: polylines drawn on top (e.g. tours).
+    - max_edges: draw a random subset of at most this many edges (seeded).
+    """
     if ax is None:
         fig, ax = plt.subplots()
 
     # Obstacles
-    for obs in obstacles:
-        xs = [p[0] for p in obs.vertices] + [obs.vertices[0][0]]
-        ys = [p[1] for p in obs.vertices] + [obs.vertices[0][1]]
-        ax.fill(xs, ys, alpha=0.3, color="gray", edgecolor="black")
+    if obstacles:
+        ax.add_collection(_obstacle_collection(obstacles))
+
+    # Edges
+    if graph is not None:
+        seg = edge_segments(graph, max_edges, seed)
+    elif visibility_edges is not None and len(visibility_edges):
+        seg = _subsample(_as_segments(visibility_edges), max_edges, seed)
+    else:
+        seg = None
+    if seg is not None and len(seg):
+        ax.add_collection(LineCollection(seg, colors="blue", alpha=0.5, linewidths=0.8))
+
+    # Paths
+    if paths:
+        ax.add_collection(LineCollection([np.asarray(p, dtype=float) for p in paths],
+                                         colors="red", linewidths=2, zorder=3))
 
     # Depot
     if depot:
-        ax.scatter([depot[0]], [depot[1]], marker="*", s=150, label="depot")
+        ax.scatter([depot[0]], [depot[1]], marker="*", s=150, label="depot", zorder=4)
 
     # Points
-    if static_points:
-        xs = [p[0] for p in static_points]
-        ys = [p[1] for p in static_points]
-        ax.scatter(xs, ys, c="blue", s=30, label="nodes")
-
-    # Edges
-    if visibility_edges:
-        for _, _, pi, pj in visibility_edges:
-            ax.plot([pi[0], pj[0]], [pi[1], pj[1]], c="blue", alpha=0.5)
+    if static_points is not None and len(static_points):
+        xy = np.asarray(static_points, dtype=float).reshape(-1, 2)
+        ax.scatter(xy[:, 0], xy[:, 1], c="blue", s=30, label="nodes", zorder=3)
 
+    ax.autoscale_view()
     ax.set_aspect("equal", "box")
     ax.grid(True, alpha=0.2)
     return ax
+
+def animate_targets(
+    obstacles: Sequence[PolyObstacle],
+    targets: Sequence,
+    times: Sequence[float],
+    out: Union[str, Path],
+    *,
+    depot: Optional[Coord] = None,
+    graph=None,
+    paths: Optional[Sequence[Sequence[Coord]]] = None,
+    max_edges: Optional[int] = None,
+    fps: int = 10,
+    dpi: int = 80,
+    size: Tuple[float, float] = (5.0, 5.0),
+) -> List[Path]:
+    """
+    Render targets (anything with `.xy` and `.windows`, e.g. models.Target) at each
+    of `times` over a static scene drawn once. Targets outside all their windows are
+    shown hollow. `out` ending in ".gif" writes one animated GIF; otherwise `out` is a
+    directory that receives frame_0000.png, frame_0001.png, ...
+    Returns the written files. Uses Agg directly, so it needs no display and leaves
+    no figures registered with pyplot.
+    """
+    times = np.asarray(times, dtype=float)
+    if len(times) == 0:
+        raise ValueError("need at least one frame time")
+    xy = np.stack([positions(t.xy, times) for t in targets], axis=1) if targets else np.zeros((len(times), 0, 2))
+    live = np.zeros((len(times), len(targets)), dtype=bool)
+    for k, t in enumerate(targets):
+        for t0, tf in t.windows:
+            live[:, k] |= (times >= t0) & (times <= tf)
+
+    fig = Figure(figsize=size, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    draw_scene(obstacles, depot=depot, ax=ax, graph=graph, paths=paths, max_edges=max_edges)
+    if len(xy):
+        lo, hi = xy.reshape(-1, 2).min(axis=0), xy.reshape(-1, 2).max(axis=0)
+        ax.update_datalim([lo, hi])
+        ax.autoscale_view()
+    colors = plt.get_cmap("tab10")(np.arange(len(targets)) % 10)
+    markers = ax.scatter(xy[0, :, 0], xy[0, :, 1], s=40, zorder=5, animated=True)
+    label = ax.text(0.02, 0.98, "", transform=ax.transAxes, va="top", animated=True)
+
+    # static layers are rasterized once; each frame restores them and draws the markers
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    frames = []
+    for f, t in enumerate(times.tolist()):
+        canvas.restore_region(background)
+        markers.set_offsets(xy[f])
+        markers.set_facecolors(np.where(live[f][:, None], colors, 0.0))
+        markers.set_edgecolors(colors)
+        label.set_text(f"t = {t:.3f}")
+        ax.draw_artist(markers)
+        ax.draw_artist(label)
+        frames.append(np.asarray(canvas.buffer_rgba())[..., :3].copy())
+
+    from PIL import Image  # a matplotlib dependency
+    images = [Image.fromarray(a) for a in frames]
+    out = Path(out)
+    if out.suffix.lower() == ".gif":
+        # one palette for all frames (the first frame plus the marker colours); mapping
+        # onto a fixed palette is much cheaper than quantizing every frame afresh
+        source = frames[0]
+        if len(colors):
+            swatch = np.resize((colors[:, :3] * 255).astype(np.uint8), (4, source.shape[1], 3))
+            source = np.concatenate([source, swatch])
+        palette = Image.fromarray(source).quantize(256)
+        images = [im.quantize(palette=palette, dither=Image.Dither.NONE) for im in images]
+        out.parent.mkdir(parents=True, exist_ok=True)
+        images[0].save(out, save_all=True, append_images=images[1:], duration=max(1, round(1000 / fps)), loop=0)
+        return [out]
+    out.mkdir(parents=True, exist_ok=True)
+    written = []
+    for f, im in enumerate(images):
+        written.append(out / f"frame_{f:04d}.png")
+        im.save(written[-1])
+    return written
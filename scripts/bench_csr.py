@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Memory and Dijkstra query time of the dict-of-lists `Graph` against its frozen
+`CSRGraph` form, on a dense visibility graph.
+
+  python scripts/bench_csr.py --grid 4 --points 600 --queries 20
+"""
+import argparse
+import random
+import sys
+import time
+from mtvg.geometry import Obstacle
+from mtvg.visibility_graph import build_visibility_graph, dijkstra
+
+def dict_graph_bytes(G) -> int:
+    # container, node tuples and coordinates, adjacency dict, lists and (id, weight) tuples
+    total = sys.getsizeof(G.nodes) + sys.getsizeof(G.adj)
+    for c in G.nodes:
+        total += sys.getsizeof(c) + sum(sys.getsizeof(x) for x in c)
+    for u, nbrs in G.adj.items():
+        total += sys.getsizeof(u) + sys.getsizeof(nbrs)
+        for v, w in nbrs:
+            total += sys.getsizeof((v, w)) + sys.getsizeof(w)  # small ints are shared
+    return total
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--grid", type=int, default=4, help="obstacles per side")
+    ap.add_argument("--points", type=int, default=600, help="free query points")
+    ap.add_argument("--queries", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    g, s = args.grid, 0.3 / args.grid
+    obs = [Obstacle(vertices=((x, y), (x + s, y), (x + s, y + s), (x, y + s)))
+           for x in ((i + 0.35) / g for i in range(g)) for y in ((j + 0.35) / g for j in range(g))]
+    pts = [(rng.random(), rng.random()) for _ in range(args.points)]
+    G = build_visibility_graph(obs, pts, method="sweep")
+    t0 = time.perf_counter()
+    C = G.freeze()
+    t_freeze = time.perf_counter() - t0
+    n, m = len(G.nodes), C.num_edges
+    print(f"nodes={n} edges={m} freeze={t_freeze * 1e3:.1f} ms")
+
+    b_dict, b_csr = dict_graph_bytes(G), C.nbytes
+    print(f"memory  dict {b_dict / 2**20:8.2f} MiB ({b_dict / m:6.1f} B/edge)")
+    print(f"memory  csr  {b_csr / 2**20:8.2f} MiB ({b_csr / m:6.1f} B/edge)  x{b_dict / b_csr:.1f}")
+
+    pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(args.queries)]
+    times = {}
+    for name, graph in (("dict", G), ("csr", C)):
+        t0 = time.perf_counter()
+        res = [dijkstra(graph, a, b) for a, b in pairs]
+        times[name] = (time.perf_counter() - t0) / len(pairs)
+        if name == "dict":
+            ref = res
+        else:
+            assert res == ref, "CSR dijkstra differs from dict dijkstra"
+    print(f"dijkstra dict {times['dict'] * 1e3:8.2f} ms/query")
+    print(f"dijkstra csr  {times['csr'] * 1e3:8.2f} ms/query  x{times['dict'] / times['csr']:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Heuristic warm-start tours (mtvg.heuristic.build_tour) on many moving targets.
+
+Builds the interception engine once per seed (visibility graph, all-pairs distances,
+interval table), then times build_tour for each `--polish` setting and prints the
+exact tour cost, the surrogate's estimate of it and the moves the local search made.
+
+  PYTHONPATH=. python scripts/bench_heuristic.py [--kind clutter] [--size 20] [--targets 100] [--horizon 60] [--seeds 0 1 2] [--polish 0 1]
+"""
+import argparse
+import time
+
+from benchmarks.scenes import SCENES, linear_targets, make_scene
+from mtvg.heuristic import build_tour
+from mtvg.interception import InterceptionEngine
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--kind", choices=sorted(SCENES), default="clutter")
+    ap.add_argument("--size", type=int, default=20)
+    ap.add_argument("--targets", type=int, default=100)
+    ap.add_argument("--horizon", type=float, default=60.0)
+    ap.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    ap.add_argument("--polish", type=int, nargs="+", default=[0, 1])
+    args = ap.parse_args()
+
+    print(f"{'seed':>4} {'engine s':>9} {'polish':>6} {'tour s':>7} {'cost':>8} {'surrogate':>10} {'moves':>6}")
+    for seed in args.seeds:
+        scene = make_scene(args.kind, args.size, seed=seed)
+        targets = linear_targets(args.targets, seed=seed, horizon=args.horizon)
+        t = time.perf_counter()
+        engine = InterceptionEngine(scene, targets)
+        t_engine = time.perf_counter() - t
+        for polish in args.polish:
+            engine.cache_clear()
+            t = time.perf_counter()
+            H = build_tour(engine, polish=polish)
+            t_tour = time.perf_counter() - t
+            if H is None:
+                print(f"{seed:>4} {t_engine:9.2f} {polish:>6} {t_tour:7.2f} {'infeasible':>8}")
+                continue
+            print(f"{seed:>4} {t_engine:9.2f} {polish:>6} {t_tour:7.2f} {H.cost:8.2f} {H.surrogate_cost:10.2f} {H.moves:>6}")
+
+if __name__ == "__main__":
+    main()
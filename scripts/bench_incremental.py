@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Incremental obstacle updates vs full rebuilds of the visibility graph.
+
+Removes and re-adds random obstacles of a generated scene with
+Graph.remove_obstacle / Graph.add_obstacle, checks each result against a
+rebuild over the same obstacles, and prints the mean time of both.
+
+  PYTHONPATH=. python scripts/bench_incremental.py [--kind clutter] [--sizes 20 40 80] [--points 30] [--updates 5]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.scenes import SCENES, make_scene, query_points
+from mtvg.visibility_graph import build_visibility_graph
+
+def geometric(G):
+    """Node coordinates and edge endpoint pairs, independent of node ids."""
+    nodes = sorted(G.nodes[u] for u in G.adj)
+    edges = sorted(tuple(sorted((G.nodes[u], G.nodes[v]))) for u, v, _ in G.edges())
+    return nodes, edges
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--kind", choices=sorted(SCENES), default="clutter")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[20, 40, 80])
+    ap.add_argument("--points", type=int, default=30)
+    ap.add_argument("--updates", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'size':>5} {'nodes':>6} {'remove ms':>10} {'add ms':>8} {'rebuild ms':>11} {'speed-up':>9}")
+    for size in args.sizes:
+        scene = make_scene(args.kind, size, seed=0)
+        pts = query_points(scene, args.points, seed=0)
+        obs = list(scene.obstacles)
+        G = build_visibility_graph(obs, pts)
+        rng = random.Random(size)
+        t_rm = t_add = t_full = 0.0
+        for _ in range(args.updates):
+            k = rng.randrange(len(obs))
+            t = time.perf_counter()
+            G.remove_obstacle(k)
+            t_rm += time.perf_counter() - t
+            gone = obs.pop(k)
+            t = time.perf_counter()
+            R = build_visibility_graph(obs, pts)
+            t_full += time.perf_counter() - t
+            assert geometric(G) == geometric(R), "remove_obstacle differs from a rebuild"
+            t = time.perf_counter()
+            G.add_obstacle(gone)
+            t_add += time.perf_counter() - t
+            obs.append(gone)
+            assert geometric(G) == geometric(build_visibility_graph(obs, pts)), "add_obstacle differs from a rebuild"
+        n = args.updates
+        print(f"{size:>5} {len(G.adj):>6} {t_rm / n * 1e3:10.1f} {t_add / n * 1e3:8.1f} {t_full / n * 1e3:11.1f} "
+              f"{2 * t_full / (t_rm + t_add):8.1f}x")
+
+if __name__ == "__main__":
+    main()
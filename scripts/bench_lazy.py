@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Lazy (on-demand) visibility graph vs a full build, for a few point-to-point queries.
+
+For each scene size, answers `--queries` random A* queries between the supplied
+points on a full graph (build + search) and on a LazyGraph (search only, rows
+computed as nodes are expanded), checks the distances agree, and prints both
+times and the fraction of node pairs the lazy graph actually tested.
+
+  PYTHONPATH=. python scripts/bench_lazy.py [--kind clutter] [--sizes 20 40 80] [--points 30] [--queries 3]
+"""
+import argparse
+import math
+import random
+import time
+
+from benchmarks.scenes import SCENES, make_scene, query_points
+from mtvg.search import astar
+from mtvg.visibility_graph import build_visibility_graph
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--kind", choices=sorted(SCENES), default="clutter")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[20, 40, 80])
+    ap.add_argument("--points", type=int, default=30)
+    ap.add_argument("--queries", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'size':>5} {'nodes':>6} {'full ms':>8} {'lazy ms':>8} {'speed-up':>9} {'tested':>7}")
+    for size in args.sizes:
+        scene = make_scene(args.kind, size, seed=0)
+        pts = query_points(scene, args.points, seed=0)
+        rng = random.Random(size)
+        pairs = [tuple(rng.sample(range(len(pts)), 2)) for _ in range(args.queries)]
+
+        t = time.perf_counter()
+        G = build_visibility_graph(scene.obstacles, pts)
+        full = [astar(G, s, d)[0] for s, d in pairs]
+        t_full = time.perf_counter() - t
+
+        t = time.perf_counter()
+        L = build_visibility_graph(scene.obstacles, pts, lazy=True)
+        lazy = [astar(L, s, d)[0] for s, d in pairs]
+        t_lazy = time.perf_counter() - t
+
+        assert all(a == b or math.isclose(a, b) for a, b in zip(full, lazy)), "lazy distances differ"
+        st = L.stats()
+        print(f"{size:>5} {st.nodes:>6} {t_full * 1e3:8.1f} {t_lazy * 1e3:8.1f} {t_full / t_lazy:8.1f}x "
+              f"{st.fraction_tested:7.1%}")
+
+if __name__ == "__main__":
+    main()
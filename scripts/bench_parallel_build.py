@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the multi-process visibility graph build.
+
+Builds one random scene serially and with 1, 2, 4 and 8 workers, checks that every
+parallel graph is identical to the serial one, and prints wall time and speed-up.
+
+  python scripts/bench_parallel_build.py [--grid 12] [--points 50] [--method pairwise]
+"""
+import argparse
+import math
+import os
+import random
+import time
+
+from mtvg.geometry import Obstacle
+from mtvg.visibility_graph import build_visibility_graph
+
+def random_scene(grid: int, n_points: int, seed: int = 0):
+    rng = random.Random(seed)
+    obs = []
+    for c in range(grid * grid):
+        cx, cy, r, k = (c % grid + 0.5) / grid, (c // grid + 0.5) / grid, 0.4 / grid, rng.randint(3, 9)
+        angs = [2 * math.pi * (i + rng.uniform(0.0, 0.4)) / k for i in range(k)]
+        rads = [r * rng.uniform(0.4, 1.0) for _ in range(k)]
+        obs.append(Obstacle(vertices=tuple((cx + s * math.cos(a), cy + s * math.sin(a)) for a, s in zip(angs, rads))))
+    pts = [(rng.random(), rng.random()) for _ in range(n_points)]
+    return obs, pts
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--grid", type=int, default=12, help="obstacles per side (grid x grid obstacles)")
+    ap.add_argument("--points", type=int, default=50)
+    ap.add_argument("--method", default="pairwise", choices=["pairwise", "sweep"])
+    ap.add_argument("--chunk-size", type=int, default=None)
+    args = ap.parse_args()
+
+    obs, pts = random_scene(args.grid, args.points)
+    t = time.perf_counter()
+    G_ref = build_visibility_graph(obs, pts, method=args.method)
+    t_serial = time.perf_counter() - t
+    n_edges = sum(len(v) for v in G_ref.adj.values()) // 2
+    print(f"nodes={len(G_ref.nodes)} edges={n_edges} method={args.method} cpus={os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    print(f"{'serial':>8} {t_serial:9.3f} {1.0:8.2f}")
+    for workers in (1, 2, 4, 8):
+        t = time.perf_counter()
+        G = build_visibility_graph(obs, pts, method=args.method, workers=workers, chunk_size=args.chunk_size)
+        dt = time.perf_counter() - t
+        assert G.adj == G_ref.adj, f"parallel build with {workers} workers differs from serial"
+        print(f"{workers:>8} {dt:9.3f} {t_serial / dt:8.2f}")
+
+if __name__ == "__main__":
+    main()
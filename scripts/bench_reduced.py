@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Edge count, build time and dijkstra query time of the full vs the reduced
+(bitangent) visibility graph on generated scenes, and how many query distances
+differ (none should).
+
+  PYTHONPATH=. python scripts/bench_reduced.py [--kind clutter] [--sizes 20 40 80] [--points 30]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.scenes import SCENES, make_scene, query_points
+from mtvg.visibility_graph import build_visibility_graph, dijkstra
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--kind", choices=sorted(SCENES), default="clutter")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[20, 40, 80])
+    ap.add_argument("--points", type=int, default=30)
+    ap.add_argument("--queries", type=int, default=200)
+    args = ap.parse_args()
+
+    print(f"{'size':>5} {'nodes':>6} {'edges':>8} {'reduced':>8} {'build s':>8} {'red. s':>8} "
+          f"{'ms/q':>7} {'red. ms/q':>9} {'shorter':>7} {'longer':>6}")
+    for size in args.sizes:
+        scene = make_scene(args.kind, size, seed=0)
+        pts = query_points(scene, args.points, seed=0)
+        t = time.perf_counter()
+        full = build_visibility_graph(scene.index, pts)
+        t_full = time.perf_counter() - t
+        t = time.perf_counter()
+        red = build_visibility_graph(scene.index, pts, reduced=True)
+        t_red = time.perf_counter() - t
+        rng = random.Random(0)
+        pairs = [(rng.randrange(len(pts)), rng.randrange(len(pts))) for _ in range(args.queries)]
+        times, dists = [], []
+        for G in (full.freeze(), red.freeze()):
+            t = time.perf_counter()
+            dists.append([dijkstra(G, a, b)[0] for a, b in pairs])
+            times.append((time.perf_counter() - t) / len(pairs))
+        shorter = sum(b < a - 1e-9 for a, b in zip(*dists))
+        longer = sum(b > a + 1e-9 for a, b in zip(*dists))
+        print(f"{size:>5} {len(full.nodes):>6} {sum(1 for _ in full.edges()):>8} {sum(1 for _ in red.edges()):>8} "
+              f"{t_full:8.2f} {t_red:8.2f} {times[0] * 1e3:7.3f} {times[1] * 1e3:9.3f} {shorter:>7} {longer:>6}")
+
+if __name__ == "__main__":
+    main()
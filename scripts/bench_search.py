@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Node expansions and query time of dijkstra, A* and bidirectional Dijkstra on random
+single-pair queries over one visibility graph.
+
+  python scripts/bench_search.py [--grid 6] [--points 300] [--queries 200]
+"""
+import argparse
+import random
+import time
+
+from mtvg.geometry import Obstacle
+from mtvg.search import SearchStats, astar, bidirectional_dijkstra, dijkstra
+from mtvg.visibility_graph import build_visibility_graph
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--grid", type=int, default=6, help="obstacles per side")
+    ap.add_argument("--points", type=int, default=300)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--csr", action="store_true", help="query the frozen CSR graph")
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    g, s = args.grid, 0.5 / args.grid
+    obs = [Obstacle(vertices=((x, y), (x + s, y), (x + s, y + s), (x, y + s)))
+           for x in ((i + 0.25) / g for i in range(g)) for y in ((j + 0.25) / g for j in range(g))]
+    pts = [(rng.random(), rng.random()) for _ in range(args.points)]
+    G = build_visibility_graph(obs, pts, method="sweep")
+    H = G.freeze() if args.csr else G
+    n = len(G.nodes)
+    pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(args.queries)]
+    print(f"nodes={n} queries={len(pairs)} form={'csr' if args.csr else 'dict'}")
+    print(f"{'search':>14} {'expanded/q':>11} {'pushed/q':>9} {'ms/q':>7}")
+    for name, fn in (("dijkstra", dijkstra), ("astar", astar), ("bidirectional", bidirectional_dijkstra)):
+        stats = SearchStats()
+        t = time.perf_counter()
+        for a, b in pairs:
+            fn(H, a, b, stats=stats)
+        dt = (time.perf_counter() - t) / len(pairs)
+        print(f"{name:>14} {stats.expanded / len(pairs):11.1f} {stats.pushed / len(pairs):9.1f} {dt * 1e3:7.2f}")
+
+if __name__ == "__main__":
+    main()
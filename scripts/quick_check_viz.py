@@ -10,15 +10,10 @@ pts = [(0,0), (1,1), (0,1), (1,0)]
 # Build VG
 G = build_visibility_graph(obs, pts)
 
-# Convert for viz
+# Edges are read straight from the graph's arrays
 poly_obs = [PolyObstacle(vertices=o.vertices) for o in obs]
-edges = []
-for i, nbrs in G.adj.items():
-    for j, _w in nbrs:
-        if j > i:  # avoid double-plotting
-            edges.append((i, j, G.nodes[i], G.nodes[j]))
 
-ax = draw_scene(poly_obs, depot=None, static_points=G.nodes, visibility_edges=edges)
+ax = draw_scene(poly_obs, depot=None, static_points=G.nodes, graph=G)
 ax.set_title("Visibility graph: edges that avoid the box obstacle")
 
 # Highlight a specific shortest path (0 -> 1) if you want:
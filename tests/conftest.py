@@ -0,0 +1,81 @@
+# tests/conftest.py
+import math
+import random
+import pytest
+from mtvg import cache
+from mtvg.geometry import Obstacle, points_inside
+from mtvg.models import Depot, Scene, Target, make_linear_xy
+from mtvg.solver import MTTSPSolver
+
+def _boxes(coords, size=0.1):
+    return [Obstacle(vertices=((x, y), (x + size, y), (x + size, y + size), (x, y + size)))
+            for x in coords for y in coords]
+
+def _star_polygon(rng, cx, cy, r, k):
+    # star-shaped around (cx, cy) with angular gaps < pi, hence simple and CCW
+    angs = [2 * math.pi * (i + rng.uniform(0.0, 0.4)) / k for i in range(k)]
+    rads = [r * rng.uniform(0.4, 1.0) for _ in range(k)]
+    return Obstacle(vertices=tuple((cx + s * math.cos(a), cy + s * math.sin(a)) for a, s in zip(angs, rads)))
+
+def _clutter(n, n_points, seed=0):
+    # n star obstacles of mixed sizes on disjoint disks, plus free points between them
+    rng = random.Random(seed)
+    disks = []
+    while len(disks) < n:
+        r = rng.uniform(0.03, 0.12)
+        x, y = rng.uniform(r, 1.0 - r), rng.uniform(r, 1.0 - r)
+        if all(math.dist((x, y), (u, v)) > r + s + 0.005 for u, v, s in disks):
+            disks.append((x, y, r))
+    obs = [_star_polygon(rng, x, y, r, rng.randint(4, 8)) for x, y, r in disks]
+    pts = []
+    while len(pts) < n_points:
+        p = (rng.random(), rng.random())
+        if not points_inside([p], obs)[0]:
+            pts.append(p)
+    return obs, pts
+
+def _box_scene():
+    return Scene(obstacles=_boxes((0.25, 0.6)), v_max=1.0, depot=Depot((0.05, 0.05)))
+
+def _solver_instance(seed, n_targets=5):
+    # random straight-line targets visible over [0, 20]
+    rng = random.Random(seed)
+    scene = _box_scene()
+    targets = [Target(id=10 + i, xy=make_linear_xy((rng.random(), rng.random()), (rng.random(), rng.random()), 0.0, 20.0),
+                      windows=[(0.0, 20.0)]) for i in range(n_targets)]
+    return MTTSPSolver(scene, targets)
+
+@pytest.fixture(autouse=True)
+def _no_graph_cache(monkeypatch):
+    # a cache dir in the environment would make builds load each other's results
+    monkeypatch.delenv(cache.ENV_VAR, raising=False)
+
+@pytest.fixture
+def boxes():
+    """`boxes(coords, size=0.1)`: square obstacles with lower-left corners on the grid coords x coords."""
+    return _boxes
+
+@pytest.fixture
+def nine_boxes():
+    """Nine 0.1 boxes on a 3 x 3 grid in the unit square."""
+    return _boxes((0.1, 0.4, 0.7))
+
+@pytest.fixture
+def box_scene():
+    """Four 0.1 boxes at (0.25 | 0.6, 0.25 | 0.6), speed 1, depot near the origin."""
+    return _box_scene()
+
+@pytest.fixture
+def star_polygon():
+    """`star_polygon(rng, cx, cy, r, k)`: a random k-vertex star-shaped obstacle of radius <= r."""
+    return _star_polygon
+
+@pytest.fixture
+def clutter():
+    """`clutter(n, n_points, seed=0)`: n disjoint star obstacles of mixed sizes and n_points free points."""
+    return _clutter
+
+@pytest.fixture
+def solver_instance():
+    """`solver_instance(seed, n_targets=5)`: a small MTTSPSolver over four boxes."""
+    return _solver_instance
@@ -0,0 +1,45 @@
+# tests/test_apsp.py
+import math
+import numpy as np
+import pytest
+from mtvg import apsp
+from mtvg.apsp import all_pairs_shortest_paths, cached_all_pairs, scene_key
+from mtvg.visibility_graph import build_visibility_graph, dijkstra
+
+PTS = [(0.0, 0.0), (1.0, 1.0), (0.0, 1.0), (1.0, 0.0), (0.45, 0.45)]  # last one is inside a box
+
+def test_all_pairs_matches_dijkstra(nine_boxes):
+    G = build_visibility_graph(nine_boxes, PTS)
+    sp = all_pairs_shortest_paths(G)
+    n = len(G.nodes)
+    assert sp.dist.shape == (n, n)
+    for s in range(0, n, 3):
+        for t in range(n):
+            d, path = dijkstra(G, s, t)
+            assert sp.distance(s, t) == d
+            assert sp.path(s, t) == path
+    assert not math.isfinite(sp.distance(0, 4)) and sp.path(0, 4) == []
+
+def test_parallel_all_pairs_matches_serial(nine_boxes):
+    G = build_visibility_graph(nine_boxes, PTS).freeze()
+    ref = all_pairs_shortest_paths(G)
+    par = all_pairs_shortest_paths(G, workers=2, chunk_size=5)
+    assert np.array_equal(par.dist, ref.dist) and np.array_equal(par.pred, ref.pred)
+
+def test_cache_roundtrip_is_memmapped(tmp_path, monkeypatch, nine_boxes):
+    first = cached_all_pairs(nine_boxes, PTS, tmp_path)
+    assert isinstance(first.dist, np.memmap)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache miss")
+    monkeypatch.setattr(apsp, "build_visibility_graph", fail)
+    again = cached_all_pairs(nine_boxes, PTS, tmp_path)
+    assert np.array_equal(again.dist, first.dist) and np.array_equal(again.pred, first.pred)
+    with pytest.raises(AssertionError):
+        cached_all_pairs(nine_boxes[:-1], PTS, tmp_path)
+
+def test_scene_key_depends_on_obstacles_and_points(nine_boxes):
+    k = scene_key(nine_boxes, PTS)
+    assert k == scene_key(list(nine_boxes), list(PTS))
+    assert k != scene_key(nine_boxes, PTS[:-1])
+    assert k != scene_key(nine_boxes[1:], PTS)
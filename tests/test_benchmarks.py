@@ -0,0 +1,60 @@
+# tests/test_benchmarks.py
+import pytest
+from shapely.geometry import Polygon
+from benchmarks.compare import compare, parse_thresholds, threshold_for
+from benchmarks.scenes import SCENES, make_scene, multi_window_targets, query_points
+from benchmarks.suite import run_suite
+from mtvg.geometry import orient, points_inside
+
+@pytest.mark.parametrize("kind,size", [("polygons", 30), ("maze", 5), ("clutter", 40)])
+def test_generated_obstacles_are_ccw_disjoint_and_seeded(kind, size):
+    obs = SCENES[kind](size, seed=4)
+    assert obs == SCENES[kind](size, seed=4) and obs != SCENES[kind](size, seed=5)
+    polys = [Polygon(o.vertices) for o in obs]
+    for o, p in zip(obs, polys):
+        v = o.vertices
+        assert p.is_valid and all(orient(v[k - 2], v[k - 1], v[k]) > 0 for k in range(len(v)))
+        assert 0.0 <= p.bounds[0] and p.bounds[2] <= 1.0 and 0.0 <= p.bounds[1] and p.bounds[3] <= 1.0
+    for i in range(len(polys)):
+        for j in range(i + 1, len(polys)):
+            assert not polys[i].intersects(polys[j])
+
+def test_targets_and_query_points():
+    scene = make_scene("clutter", 30, seed=1)
+    pts = query_points(scene, 25, seed=2)
+    assert len(pts) == 25 and not points_inside(pts, scene.index).any()
+    for tgt in multi_window_targets(5, seed=3):
+        assert all(a < b for a, b in tgt.windows)
+        assert all(b1 <= a2 for (_, b1), (a2, _) in zip(tgt.windows, tgt.windows[1:]))
+    with pytest.raises(ValueError):
+        make_scene("forest", 3)
+
+def test_compare_flags_regressions_with_overrides():
+    base = {"results": {"a/x/1": {"seconds": 1.0}, "b/x/1": {"seconds": 1.0}, "gone/x/1": {"seconds": 1.0}}}
+    cur = {"results": {"a/x/1": {"seconds": 1.3}, "b/x/1": {"seconds": 1.3}, "new/x/1": {"seconds": 2.0}}}
+    overrides = parse_thresholds(["b/*=0.5"])
+    status = {c.name: c.status for c in compare(cur, base, default=0.25, overrides=overrides)}
+    assert status == {"a/x/1": "regressed", "b/x/1": "ok", "gone/x/1": "missing", "new/x/1": "new"}
+    assert threshold_for("b/y/2", 0.1, parse_thresholds(["*=0.2", "b/*=0.3"])) == 0.3
+    with pytest.raises(ValueError):
+        parse_thresholds(["0.5"])
+
+def test_compare_scales_by_calibration_and_allows_for_noise():
+    # a machine twice as slow: 2.2 s against 1.0 s is a 10% slowdown, not 120%
+    base = {"calibration": 1.0, "results": {"a/x/1": {"seconds": 1.0, "mean": 1.0},
+                                            "b/x/1": {"seconds": 1.0, "mean": 1.0}}}
+    cur = {"calibration": 2.0, "results": {"a/x/1": {"seconds": 2.2, "mean": 2.2},
+                                           "b/x/1": {"seconds": 2.8, "mean": 3.5}}}
+    got = {c.name: c for c in compare(cur, base, default=0.25)}
+    assert got["a/x/1"].ratio == pytest.approx(1.1) and got["a/x/1"].status == "ok"
+    # 40% slower, but its runs spread by 25%: within 1 + 0.25 + 0.25
+    assert got["b/x/1"].noise == pytest.approx(0.25) and got["b/x/1"].status == "ok"
+    del cur["calibration"]
+    assert {c.status for c in compare(cur, base, default=0.25)} == {"regressed"}
+
+def test_run_suite_report_shape():
+    report = run_suite("quick", repeat=1, only=["kinematic_filter/maze/3", "dijkstra/maze/3"])
+    assert set(report["results"]) == {"kinematic_filter/maze/3", "dijkstra/maze/3"}
+    r = report["results"]["dijkstra/maze/3"]
+    assert r["seconds"] > 0 and r["params"]["queries"] == 100 and r["params"]["kind"] == "maze"
+    assert report["calibration"] > 0
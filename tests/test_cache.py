@@ -0,0 +1,51 @@
+# tests/test_cache.py
+import pytest
+from mtvg import cache, visibility_graph as vg
+from mtvg.geometry import Obstacle
+from mtvg.models import Depot, Scene
+from mtvg.visibility_graph import build_visibility_graph, dijkstra
+
+OBS = [Obstacle(vertices=((0.2, 0.2), (0.4, 0.2), (0.3, 0.35))),
+       Obstacle(vertices=((0.5, 0.5), (0.8, 0.5), (0.8, 0.6), (0.6, 0.6), (0.6, 0.8), (0.5, 0.8)))]
+PTS = [(0.0, 0.0), (1.0, 1.0), (0.9, 0.1)]
+
+def test_scene_roundtrip(tmp_path):
+    scene = Scene(obstacles=OBS, v_max=1.5, depot=Depot((0.0, 0.0)))
+    G = build_visibility_graph(scene.index, PTS)
+    cache.save_scene(tmp_path / "s.npz", scene, graph=G)
+    back = cache.load_scene(tmp_path / "s.npz")
+    assert back == scene and back.index.convex_vertices == scene.index.convex_vertices
+    assert "convex_vertices" in back.index.__dict__  # restored, not recomputed
+    assert cache.load_graph(tmp_path / "s.npz") == G
+    cache.save_graph(tmp_path / "g.npz", OBS, G)
+    with pytest.raises(ValueError):
+        cache.load_scene(tmp_path / "g.npz")
+
+def test_build_consults_cache_dir(tmp_path, monkeypatch):
+    G = build_visibility_graph(OBS, PTS, cache_dir=tmp_path)
+    assert [p.name for p in tmp_path.iterdir()] == [f"{cache.graph_key(OBS, PTS, 'pairwise')}.npz"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("rebuilt")
+    monkeypatch.setattr(vg, "_build_graph", fail)
+    monkeypatch.setenv(cache.ENV_VAR, str(tmp_path))
+    warm = build_visibility_graph(OBS, PTS)
+    assert warm == G and dijkstra(warm, 0, 1) == dijkstra(G, 0, 1)
+    assert warm.insert_point((0.45, 0.1)) == G.insert_point((0.45, 0.1)) and warm == G  # obstacle data came along
+    assert warm.obstacles == OBS and warm.vertex_nodes == G.vertex_nodes
+    with pytest.raises(AssertionError):
+        build_visibility_graph(OBS, PTS[:2])
+
+def test_cache_key_separates_methods_and_versions(tmp_path, monkeypatch):
+    build_visibility_graph(OBS, PTS, cache_dir=tmp_path)
+    build_visibility_graph(OBS, PTS, method="sweep", cache_dir=tmp_path)
+    build_visibility_graph(OBS, PTS, reduced=True, cache_dir=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 3
+    assert cache.graph_key(OBS, PTS, "sweep") != cache.graph_key(OBS, PTS, "pairwise")
+
+    built = []
+    monkeypatch.setattr(vg, "_build_graph", lambda *args: built.append(args) or vg.Graph.empty())
+    monkeypatch.setattr(cache, "save_graph", lambda *args: None)
+    monkeypatch.setattr(cache, "GRAPH_VERSION", cache.GRAPH_VERSION + 1)
+    build_visibility_graph(OBS, PTS, cache_dir=tmp_path)
+    assert len(built) == 1  # an entry from an older build is not served
@@ -0,0 +1,50 @@
+# tests/test_heuristic.py
+import itertools
+import numpy as np
+import pytest
+from mtvg.heuristic import _Surrogate, build_tour, simulate
+from mtvg.solver import DEPOT, RETURN, _State
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_tour_is_feasible_and_matches_exact_simulation(seed, solver_instance):
+    S = solver_instance(seed)
+    H = build_tour(S, polish=1)
+    opt = S.solve(1.0).cost
+    assert sorted(i for i, _ in H.tour) == [10, 11, 12, 13, 14]
+    assert all(t1 <= t2 for (_, t1), (_, t2) in zip(H.tour, H.tour[1:]))
+    assert opt - 1e-12 <= H.cost
+    done, times, back = simulate(S.engine, H.order)
+    assert done == H.order and back == H.cost and [t for _, t in H.tour] == times
+    assert build_tour(S.engine, polish=1).cost == H.cost
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_tour_cost_is_what_the_solver_gives_its_order(seed, solver_instance):
+    S = solver_instance(seed)
+    H = build_tour(S)
+    # follow the solver's own successors along the heuristic's order
+    state = _State(0, DEPOT, 0.0, S.scene.depot.xy, 0.0, None)
+    for k in H.order + [RETURN]:
+        state = next(c for c in S._successors(state) if c.last == k)
+    assert state.g == H.cost
+    times = []
+    while state.parent is not None and state.parent.last >= 0:
+        state = state.parent
+        times.append(state.t)
+    assert times[::-1] == [t for _, t in H.tour]
+
+def test_local_search_reaches_brute_force_optimum_of_surrogate():
+    rng = np.random.default_rng(0)
+    pts = rng.random((8, 2))
+    cost = np.hypot(*(pts[:, None] - pts[None]).transpose(2, 0, 1))
+    S = _Surrogate(cost, np.zeros(8), np.full(8, np.inf))
+    best = min(S.route_segment([0, *p, 0])[0] for p in itertools.permutations(range(1, 8)))
+    route, _ = S.improve(S.insert_all())
+    assert sorted(route[1:-1]) == list(range(1, 8))
+    assert S.route_segment(route)[0] <= 1.1 * best
+    # windows are respected: the one-target windows force the order 3, 1, 2, ...
+    opens, closes = np.zeros(8), np.full(8, np.inf)
+    opens[[3, 1, 2]], closes[[3, 1, 2]] = (0.0, 1.5, 3.0), (1.0, 2.5, 4.0)
+    T = _Surrogate(cost, opens, closes)
+    route, _ = T.improve(T.insert_all())
+    assert T.route_segment(route)[1] == 0.0
+    assert [k for k in route if k in (1, 2, 3)] == [3, 1, 2]
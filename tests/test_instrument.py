@@ -0,0 +1,80 @@
+# tests/test_instrument.py
+import json
+import os
+import subprocess
+import sys
+from mtvg import instrument
+from mtvg.geometry import Obstacle, visible
+from mtvg.intervals import visible_intervals
+from mtvg.models import Depot, Scene, Target, make_linear_xy
+from mtvg.search import astar, bidirectional_dijkstra, one_to_many
+from mtvg.visibility_graph import build_visibility_graph, dijkstra
+
+def _scene():
+    obs = [Obstacle(vertices=((0.4, 0.4), (0.6, 0.4), (0.6, 0.6), (0.4, 0.6)))]
+    return Scene(obstacles=obs, v_max=1.0, depot=Depot((0.0, 0.0)))
+
+def test_off_by_default_and_scoped():
+    scene = _scene()
+    assert instrument.report() is None
+    with instrument.instrumented() as rep:
+        assert instrument.report() is rep
+        visible((0.0, 0.0), (1.0, 1.0), scene.index)
+        visible((0.0, 0.0), (1.0, 0.0), scene.index)
+    assert instrument.report() is None
+    visible((0.0, 0.0), (1.0, 1.0), scene.index)
+    assert rep.counters["visible.calls"] == 2
+    assert rep.timers["shapely.intersection"].calls == 2
+
+def test_records_search_bisection_and_stages():
+    scene = _scene()
+    tgt = Target(id=0, xy=make_linear_xy((0.0, 1.0), (1.0, 0.0), 0.0, 10.0), windows=[(0.0, 10.0)])
+    with instrument.instrumented() as rep:
+        G = build_visibility_graph(scene.index, [(0.0, 0.0), (1.0, 1.0)])
+        dijkstra(G, 0, 1)
+        dijkstra(G.freeze(), 0, 1)
+        visible_intervals((0.1, 0.1), tgt, (0.0, 10.0), scene, mode="sample", n_samples=20)
+        visible_intervals((0.1, 0.1), tgt, (0.0, 10.0), scene, require_kinematic=True, earliest_departure=3.0)
+    c, t = rep.counters, rep.timers
+    assert c["dijkstra.pushes"] >= c["dijkstra.pops"] >= 2
+    assert c["refine.iterations"] >= c["refine.calls"] == 2
+    for stage in ("index", "nodes", "edges", "graph"):
+        assert t[f"build_visibility_graph.{stage}"].calls == 1
+    assert t["visible_intervals.visibility"].calls == 2 and t["visible_intervals.kinematic"].calls == 1
+    d = json.loads(rep.to_json())
+    assert d["counters"] == dict(sorted(c.items())) and set(d["timers"]) == set(t)
+
+def test_records_heap_traffic_of_every_search():
+    G = build_visibility_graph(_scene().index, [(0.0, 0.0), (1.0, 1.0), (0.0, 1.0)])
+    with instrument.instrumented() as rep:
+        astar(G, 0, 1)
+        bidirectional_dijkstra(G, 0, 1)
+        one_to_many(G, 0, [1, 2])
+    for name in ("astar", "bidirectional_dijkstra", "one_to_many"):
+        assert rep.counters[f"{name}.pushes"] >= rep.counters[f"{name}.pops"] >= 2
+    assert "dijkstra.pushes" not in rep.counters
+
+def test_environment_variable_dumps_json(tmp_path):
+    out = tmp_path / "report.json"
+    code = ("from mtvg.geometry import Obstacle, visible, make_obstacles_union\n"
+            "u = make_obstacles_union([Obstacle(vertices=((0.4,0.4),(0.6,0.4),(0.6,0.6),(0.4,0.6)))])\n"
+            "visible((0,0), (1,1), u)\n")
+    env = {**os.environ, "MTVG_INSTRUMENT_FILE": str(out)}
+    env.pop("MTVG_INSTRUMENT", None)
+    cwd = os.path.dirname(os.path.dirname(__file__))
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, cwd=cwd)
+    assert json.loads(out.read_text())["counters"] == {"visible.calls": 1}
+    # an explicit off wins over the file
+    out.unlink()
+    subprocess.run([sys.executable, "-c", code], env={**env, "MTVG_INSTRUMENT": "0"}, check=True, cwd=cwd)
+    assert not out.exists()
+    # the usual truthy strings turn it on; anything else is rejected, not taken as a path
+    check = "import mtvg.instrument as i; print(i.report() is not None)"
+    for value, on in (("true", "True"), ("ON", "True"), ("no", "False"), ("0", "False")):
+        env = {**os.environ, "MTVG_INSTRUMENT": value}
+        env.pop("MTVG_INSTRUMENT_FILE", None)
+        got = subprocess.run([sys.executable, "-c", check], env=env, check=True, cwd=cwd, capture_output=True, text=True)
+        assert got.stdout.strip() == on
+    env["MTVG_INSTRUMENT"] = "report.json"
+    bad = subprocess.run([sys.executable, "-c", check], env=env, cwd=cwd, capture_output=True, text=True)
+    assert bad.returncode != 0 and "ValueError" in bad.stderr
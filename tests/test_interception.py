@@ -0,0 +1,80 @@
+# tests/test_interception.py
+import math
+import random
+import pytest
+from mtvg.interception import ArrivalFunction, InterceptionEngine
+from mtvg.intervals import visible_intervals
+from mtvg.models import PiecewiseLinearTrajectory, Target, make_linear_xy
+
+def _engine(scene, **kw):
+    rng = random.Random(3)
+    targets = [Target(id=i, xy=make_linear_xy((rng.random(), rng.random()), (rng.random(), rng.random()), 0.0, 20.0),
+                      windows=[(0.0, 8.0), (12.0, 20.0)]) for i in range(3)]
+    return InterceptionEngine(scene, targets, **kw)
+
+def _reference(E, q, t_d, k):
+    # straight visible legs from every node, each left at its graph arrival time
+    best = math.inf
+    tgt = E.targets[k]
+    for u in range(len(E.nodes)):
+        t_u = t_d + E.dist[q, u] / E.v
+        for win in tgt.windows:
+            if win[1] < t_u:
+                continue
+            ivs = visible_intervals(tuple(E.nodes[u].tolist()), tgt, win, E.scene,
+                                    require_kinematic=True, earliest_departure=t_u)
+            if ivs:
+                best = min(best, ivs[0][0])
+    return best
+
+def test_earliest_arrival_matches_per_node_queries(box_scene):
+    E = _engine(box_scene)
+    for q in range(0, len(E.nodes), 3):
+        for k in range(len(E.targets)):
+            for t_d in (0.0, 7.9, 11.0, 19.5):
+                got = E.earliest_arrival(q, t_d, k)
+                ref = _reference(E, q, math.ceil(t_d / E.quantum) * E.quantum, k)
+                assert got == pytest.approx(ref, abs=1e-9) or got == ref == math.inf
+                assert got >= _reference(E, q, t_d, k) - 1e-9
+
+def test_arrival_from_point_agrees_at_nodes(box_scene):
+    E = _engine(box_scene)
+    for q in range(len(E.nodes)):
+        p = tuple(E.nodes[q].tolist())
+        for k in range(len(E.targets)):
+            assert E.arrival_from_point(p, 2.0, k) == pytest.approx(E.earliest_arrival(q, 2.0, k), abs=2 * E.quantum)
+
+def test_queries_are_memoized_per_quantum(box_scene):
+    E = _engine(box_scene, quantum=1e-3)
+    a = E.earliest_arrival(0, 1.0001, 1)
+    b = E.earliest_arrival(0, 1.0004, 1)  # same quantum bucket: rounded up to 1.001
+    info = E.cache_info()
+    assert a == b and info.hits == 1 and info.misses == 1
+    E.cache_clear()
+    assert E.cache_info().currsize == 0
+
+def test_arrival_function_is_monotone_and_feasible():
+    tau = make_linear_xy((0.0, 1.0), (4.0, 1.0), 0.0, 4.0)  # speed 1, along y = 1
+    f = ArrivalFunction((0.0, 0.0), tau, 2.0, [(0.0, 1.0), (2.0, 3.0)])
+    times = [f(t) for t in (0.0, 0.2, 0.5, 0.8, 1.0, 2.5, 3.5)]
+    assert times == sorted(times)
+    assert times[0] == pytest.approx(1 / math.sqrt(3)) and times[-1] == math.inf  # |tau(t)| = 2 t
+    for t_dep, t in zip((0.2, 0.5, 0.8), times[1:4]):
+        x, y = tau(t)
+        assert math.hypot(x, y) <= 2.0 * (t - t_dep) + 1e-9
+
+def test_arrival_function_catches_a_target_that_turns_back():
+    # speed 4 towards u = (0, 0) and straight back out: L peaks just after the turn,
+    # well above its value at the end of the window
+    tau = PiecewiseLinearTrajectory([0.0, 1.0, 2.0], [(4.0, 1.0), (0.0, 1.0), (4.0, 1.0)])
+    f = ArrivalFunction((0.0, 0.0), tau, 1.0, [(0.0, 2.0)])
+    ts = [k * 1e-5 for k in range(200001)]
+    for t_dep in (0.0, 0.02, 0.03):
+        t = f(t_dep)
+        first = next(s for s in ts if math.hypot(*tau(s)) <= s - t_dep)
+        assert t == pytest.approx(first, abs=1e-5)
+        assert math.hypot(*tau(t)) <= t - t_dep + 1e-9
+    # max L = t* - |tau(t*)| with t* = 1 + 1 / (4 sqrt(15)); past it the target is lost
+    t_star = 1.0 + 1.0 / (4.0 * math.sqrt(15.0))
+    l_max = t_star - math.hypot(*tau(t_star))
+    assert f(l_max - 1e-9) < math.inf and f(l_max + 1e-9) == math.inf
@@ -0,0 +1,49 @@
+# tests/test_interval_set.py
+import math
+import pickle
+import random
+import numpy as np
+import pytest
+from mtvg.interval_set import IntervalSet
+from mtvg.models import Target, make_linear_xy
+
+GRID = np.linspace(-1.0, 41.0, 8401)
+
+def _random_pairs(rng, n):
+    return [(a, a + rng.uniform(0.0, 2.0)) for a in (rng.uniform(0.0, 40.0) for _ in range(n))]
+
+def _mask(pairs):
+    m = np.zeros(len(GRID), dtype=bool)
+    for a, b in pairs:
+        m |= (GRID >= a) & (GRID <= b)
+    return m
+
+def test_normalizes_and_behaves_like_a_list():
+    s = IntervalSet.from_pairs([(3.0, 4.0), (0.0, 1.0), (0.5, 2.0), (2.0, 2.5), (5.0, 5.0)])
+    assert s == [(0.0, 2.5), (3.0, 4.0)] and len(s) == 2 and s[1] == (3.0, 4.0)
+    assert list(s) == s.to_list() and s[1:] == [(3.0, 4.0)] and not IntervalSet.empty()
+    assert (s.lower, s.upper, s.measure()) == (0.0, 4.0, 3.5)
+    assert pickle.loads(pickle.dumps(s)) == s
+    with pytest.raises(ValueError):
+        s.starts[0] = 1.0
+    tgt = Target(id=0, xy=make_linear_xy((0, 0), (1, 1), 0.0, 10.0), windows=[(6.0, 9.0), (1.0, 3.0), (2.0, 4.0)])
+    assert tgt.windows == [(1.0, 4.0), (6.0, 9.0)] and tgt.domain() == (1.0, 9.0)
+
+@pytest.mark.parametrize("n", [3, 60])  # list-merge and array paths
+def test_algebra_matches_pointwise_sets(n):
+    rng = random.Random(n)
+    for _ in range(30):
+        A, B = _random_pairs(rng, rng.randint(0, n)), _random_pairs(rng, rng.randint(0, n))
+        a, b = IntervalSet.from_pairs(A), IntervalSet.from_pairs(B)
+        ma, mb = _mask(A), _mask(B)
+        assert (a.contains(GRID) == ma).all()
+        assert (_mask(a | b) == (ma | mb)).all()
+        # closed-set results may differ from the pointwise ones on isolated instants only
+        assert np.mean(_mask(a & b) != (ma & mb)) < 1e-3
+        assert np.mean(_mask(a - b) != (ma & ~mb)) < 1e-3
+        assert a.clip(10.0, 20.0) == a & [(10.0, 20.0)]
+        assert a.shift(1.5) == [(s + 1.5, e + 1.5) for s, e in a]
+        ts = np.asarray([rng.uniform(-1.0, 41.0) for _ in range(20)])
+        expect = [min((max(t, s) for s, e in A if e >= t and e > s), default=math.inf) for t in ts]
+        assert a.next_feasible(ts).tolist() == pytest.approx(expect)
+        assert [a.next_feasible(float(t)) for t in ts] == pytest.approx(expect)
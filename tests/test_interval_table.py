@@ -0,0 +1,28 @@
+# tests/test_interval_table.py
+import pytest
+from mtvg.interval_table import build_interval_table
+from mtvg.intervals import visible_intervals
+from mtvg.models import Depot, Scene, Target, make_linear_xy
+from mtvg.visibility_graph import build_visibility_graph
+
+def _scene(boxes):
+    scene = Scene(obstacles=boxes((0.2, 0.6)), v_max=1.0, depot=Depot((0.0, 0.0)))
+    targets = [
+        Target(id=0, xy=make_linear_xy((0.0, 0.95), (1.0, 0.05), 0.0, 10.0), windows=[(0.0, 4.0), (5.0, 10.0)]),
+        Target(id=1, xy=make_linear_xy((0.5, 0.0), (0.5, 1.0), 0.0, 10.0), windows=[(1.0, 9.0)]),
+    ]
+    nodes = build_visibility_graph(scene.index, [scene.depot.xy]).nodes
+    return scene, targets, nodes
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_table_matches_direct_calls(workers, boxes):
+    scene, targets, nodes = _scene(boxes)
+    table = build_interval_table(scene, targets, nodes, workers=workers, chunk_size=4)
+    assert table.n_nodes == len(nodes) and table.n_slots == 3
+    assert table.counts().sum() == len(table.starts)
+    for i, q in enumerate(nodes):
+        for k, tgt in enumerate(targets):
+            for w, win in enumerate(tgt.windows):
+                assert table.get(i, k, w) == visible_intervals(q, tgt, win, scene)
+    with pytest.raises(IndexError):
+        table.cell(0, 1, 1)
@@ -1,8 +1,12 @@
 # tests/test_intervals.py
 import math
-from mtvg.geometry import Obstacle
-from mtvg.models import Target, make_linear_xy, Scene, Depot
-from mtvg.intervals import visible_intervals
+import random
+import numpy as np
+import pytest
+from mtvg.geometry import Obstacle, make_obstacles_union, visible
+from mtvg.models import Target, make_linear_xy, Scene, Depot, PiecewiseLinearTrajectory
+from mtvg.interval_set import IntervalSet
+from mtvg.intervals import kinematic_filter, visible_intervals
 
 def test_visible_intervals_no_obstacles_stationary_target_kinematic():
     # stationary target at (5,0), window [0,10], q at origin
@@ -30,5 +34,100 @@ def test_visible_intervals_blocked_by_obstacle_splits_interval():
 
     vis = visible_intervals((0.0, 0.0), tgt, (0.0, 10.0), scene, n_samples=200)
     # There should be at least one visible block; depending on geometry you may get 1 or 2 blocks
-    assert isinstance(vis, list)
+    assert isinstance(vis, IntervalSet)
     assert len(vis) >= 1
+
+def test_exact_mode_matches_pointwise_visibility():
+    rng = random.Random(5)
+    obs = [Obstacle(vertices=((x, y), (x + 0.15, y), (x + 0.1, y + 0.15))) for x in (0.2, 0.5) for y in (0.2, 0.5)]
+    union = make_obstacles_union(obs)
+    scene = Scene(obstacles=obs, v_max=1.0, depot=Depot((0.0, 0.0)))
+    for _ in range(10):
+        q = (rng.random(), rng.random())
+        xy = make_linear_xy((rng.random(), rng.random()), (rng.random(), rng.random()), 1.0, 9.0)
+        tgt = Target(id=0, xy=xy, windows=[(0.0, 10.0)])
+        vis = visible_intervals(q, tgt, (0.0, 10.0), scene, mode="exact")
+        assert all(a < b for a, b in vis) and all(b1 < a2 for (_, b1), (a2, _) in zip(vis, vis[1:]))
+        for t in [rng.uniform(0.0, 10.0) for _ in range(200)]:
+            if any(abs(t - e) < 1e-9 for iv in vis for e in iv):
+                continue
+            assert any(a <= t <= b for a, b in vis) == visible(q, xy(t), union)
+
+def test_exact_mode_catches_occlusion_between_samples():
+    # a thin pillar hides the target for 0.05 time units; 50 samples are 0.2 apart
+    obs = [Obstacle(vertices=((0.499, 0.4), (0.501, 0.4), (0.501, 0.6), (0.499, 0.6)))]
+    scene = Scene(obstacles=obs, v_max=1.0, depot=Depot((0.0, 0.0)))
+    tgt = Target(id=0, xy=make_linear_xy((0.0, 1.0), (1.0, 1.0), 0.0, 10.0), windows=[(0.0, 10.0)])
+    q = (0.5, 0.0)
+    sampled = visible_intervals(q, tgt, (0.0, 10.0), scene, n_samples=50, mode="sample")
+    exact = visible_intervals(q, tgt, (0.0, 10.0), scene)
+    assert len(sampled) == 1
+    assert len(exact) == 2
+    # silhouette corners (0.499, 0.4) and (0.501, 0.4) project to x = 0.5 -+ 0.001 / 0.4 on y = 1
+    assert math.isclose(exact[0][1], 4.975, rel_tol=1e-9) and math.isclose(exact[1][0], 5.025, rel_tol=1e-9)
+
+def test_exact_mode_on_piecewise_trajectory_matches_sampling():
+    obs = [Obstacle(vertices=((0.4, 0.4), (0.6, 0.4), (0.6, 0.6), (0.4, 0.6)))]
+    scene = Scene(obstacles=obs, v_max=1.0, depot=Depot((0.0, 0.0)))
+    # around the box: up the right side, then back along the top
+    traj = PiecewiseLinearTrajectory([0.0, 5.0, 10.0], [(0.9, 0.0), (0.9, 0.9), (0.0, 0.9)])
+    tgt = Target(id=0, xy=traj, windows=[(0.0, 10.0)])
+    exact = visible_intervals((0.0, 0.0), tgt, (0.0, 10.0), scene)
+    sampled = visible_intervals((0.0, 0.0), tgt, (0.0, 10.0), scene, mode="sample", n_samples=2001)
+    assert len(exact) == len(sampled) == 2
+    for (a, b), (c, d) in zip(exact, sampled):
+        assert abs(a - c) < 1e-2 and abs(b - d) < 1e-2
+
+def test_adaptive_mode_matches_exact_on_linear_targets():
+    rng = random.Random(5)
+    obs = [Obstacle(vertices=((x, y), (x + 0.15, y), (x + 0.1, y + 0.15))) for x in (0.2, 0.5) for y in (0.2, 0.5)]
+    scene = Scene(obstacles=obs, v_max=1.0, depot=Depot((0.0, 0.0)))
+    for k in range(20):
+        q = obs[k % 4].vertices[k % 3] if k % 2 else (rng.random(), rng.random())
+        tgt = Target(id=0, xy=make_linear_xy((rng.random(), rng.random()), (rng.random(), rng.random()), 1.0, 9.0),
+                     windows=[(0.0, 10.0)])
+        exact = visible_intervals(q, tgt, (0.0, 10.0), scene, mode="exact")
+        adaptive = visible_intervals(q, tgt, (0.0, 10.0), scene, mode="adaptive", min_gap=0.01, refine_tol=1e-7)
+        assert len(adaptive) == len(exact)
+        for (a, b), (c, d) in zip(exact, adaptive):
+            assert abs(a - c) < 1e-6 and abs(b - d) < 1e-6
+
+def test_adaptive_mode_finds_short_occlusion_of_nonlinear_target():
+    # the thin pillar of the sampling test, target on a wavy path with speed <= 0.1 * sqrt(2)
+    obs = [Obstacle(vertices=((0.499, 0.4), (0.501, 0.4), (0.501, 0.6), (0.499, 0.6)))]
+    scene = Scene(obstacles=obs, v_max=1.0, depot=Depot((0.0, 0.0)))
+    tgt = Target(id=0, xy=lambda t: (t / 10.0, 1.0 + 0.1 * math.sin(t)), windows=[(0.0, 10.0)])
+    vis = visible_intervals((0.5, 0.0), tgt, (0.0, 10.0), scene, mode="adaptive", max_target_speed=0.15, min_gap=0.02)
+    assert len(vis) == 2 and 4.9 < vis[0][1] < vis[1][0] < 5.1
+    with pytest.raises(ValueError):
+        visible_intervals((0.5, 0.0), tgt, (0.0, 10.0), scene, mode="adaptive")
+
+def test_exact_kinematic_filter_matches_pointwise_condition():
+    rng = random.Random(2)
+    for _ in range(50):
+        pts = [(rng.uniform(-2, 2), rng.uniform(-2, 2)) for _ in range(4)]
+        traj = PiecewiseLinearTrajectory([0.0, 3.0, 5.0, 10.0], pts)
+        q, td, v = (rng.uniform(-1, 1), rng.uniform(-1, 1)), rng.uniform(0.0, 3.0), rng.uniform(0.2, 1.5)
+        ivs = [(0.0, 4.0), (4.5, 10.0)]
+        got = kinematic_filter(q, traj, ivs, td, v)
+        ts = np.linspace(0.0, 10.0, 4001)
+        d = np.hypot(*(traj.xy_many(ts) - q).T)
+        ok = (d <= v * (ts - td)) & (((ts >= 0) & (ts <= 4)) | ((ts >= 4.5) & (ts <= 10)))
+        inside = np.zeros_like(ok)
+        for a, b in got:
+            assert a < b
+            inside |= (ts >= a) & (ts <= b)
+        slack = np.abs(d - v * (ts - td)) > 1e-9
+        assert np.array_equal(ok[slack], inside[slack])
+
+def test_kinematic_filter_handles_target_outrunning_agent():
+    # target runs away at speed 2 > v_max: reachable only for a bounded stretch, not a suffix
+    xy = make_linear_xy((1.0, 0.0), (21.0, 0.0), 0.0, 10.0)
+    tgt = Target(id=0, xy=xy, windows=[(0.0, 10.0)])
+    scene = Scene(obstacles=[], v_max=1.0, depot=Depot((0.0, 0.0)))
+    # starts 1 ahead of q and runs away, so it is never reachable from t_d = 0
+    assert visible_intervals((0.0, 0.0), tgt, (0.0, 10.0), scene, require_kinematic=True, earliest_departure=0.0) == []
+    tgt = Target(id=0, xy=make_linear_xy((-4.0, 0.0), (16.0, 0.0), 0.0, 10.0), windows=[(0.0, 10.0)])
+    kin = visible_intervals((0.0, 0.0), tgt, (0.0, 10.0), scene, require_kinematic=True, earliest_departure=0.0)
+    # |2t - 4| <= t  <=>  4/3 <= t <= 4
+    assert len(kin) == 1 and math.isclose(kin[0][0], 4 / 3, rel_tol=1e-12) and math.isclose(kin[0][1], 4.0, rel_tol=1e-12)
@@ -1,5 +1,7 @@
 # tests/test_models.py
-from mtvg.models import Scene, Depot, Target, make_linear_xy
+import numpy as np
+import pytest
+from mtvg.models import Scene, Depot, Target, make_linear_xy, PiecewiseLinearTrajectory
 from mtvg.geometry import Obstacle
 
 def test_models_linear_target_single_window():
@@ -20,3 +22,23 @@ def test_models_linear_target_single_window():
 
     # scene convenience
     assert scene.as_points() == [scene.depot.xy]
+
+def test_piecewise_linear_trajectory_scalar_vector_velocity():
+    traj = PiecewiseLinearTrajectory([0.0, 2.0, 2.0, 4.0], [(0.0, 0.0), (2.0, 0.0), (2.0, 1.0), (2.0, 3.0)])
+    ts = np.array([-1.0, 0.0, 1.0, 2.0, 3.0, 4.0, 9.0])
+    many = traj.xy_many(ts)
+    assert np.allclose(many, [traj(t) for t in ts])
+    assert many.tolist() == [[0, 0], [0, 0], [1, 0], [2, 1], [2, 2], [2, 3], [2, 3]]
+    assert traj.velocity(1.0) == (1.0, 0.0) and traj.velocity(3.0) == (0.0, 1.0)
+    assert traj.velocity(-1.0) == (0.0, 0.0) and traj.velocity(4.0) == (0.0, 0.0)
+    assert traj.segment(1.0) == 0 and traj.segment(2.5) == 2 and traj.segment(10.0) == 2
+    assert not hasattr(traj, "__dict__")
+    with pytest.raises(ValueError):
+        PiecewiseLinearTrajectory([1.0, 0.0], [(0, 0), (1, 1)])
+
+def test_make_linear_xy_clamps_reversed_window():
+    # tf < t0 is accepted and steps from p0 to p1 just after t0, like the old LinearXY
+    xy = make_linear_xy((0.0, 0.0), (1.0, 1.0), 5.0, 2.0)
+    assert xy(0.0) == (0.0, 0.0) and xy(5.0) == (0.0, 0.0)
+    assert xy(5.0 + 1e-9) == (1.0, 1.0) and xy(9.0) == (1.0, 1.0)
+    assert xy.xy_many(np.array([0.0, 5.0, 5.0 + 1e-9, 9.0])).tolist() == [[0.0, 0.0], [0.0, 0.0], [1.0, 1.0], [1.0, 1.0]]
@@ -0,0 +1,29 @@
+# tests/test_scene_index.py
+import random
+from mtvg.geometry import SceneIndex, extract_convex_vertices, make_obstacles_union, visible, visible_many
+from mtvg.models import Depot, Scene
+from mtvg.visibility_graph import build_visibility_graph
+
+def test_index_queries_match_plain_union(nine_boxes):
+    index = SceneIndex(nine_boxes)
+    union = make_obstacles_union(nine_boxes)
+    rng = random.Random(0)
+    pts = [(rng.randint(0, 20) / 20, rng.randint(0, 20) / 20) for _ in range(30)]
+    for a in pts:
+        for b in pts:
+            assert visible(a, b, index) == visible(a, b, union)
+    p0 = [a for a in pts for b in pts]
+    p1 = [b for a in pts for b in pts]
+    assert visible_many(p0, p1, index).tolist() == visible_many(p0, p1, nine_boxes).tolist()
+    assert extract_convex_vertices(index) == extract_convex_vertices(nine_boxes)
+    assert build_visibility_graph(index, pts).adj == build_visibility_graph(nine_boxes, pts).adj
+
+def test_scene_index_is_cached_and_invalidated(nine_boxes):
+    scene = Scene(obstacles=list(nine_boxes), v_max=1.0, depot=Depot((0.0, 0.0)))
+    idx = scene.index
+    assert scene.index is idx
+    scene.obstacles.pop()
+    assert scene.index is not idx and len(scene.index.obstacles) == len(nine_boxes) - 1
+    idx = scene.index
+    scene.obstacles = list(nine_boxes)
+    assert scene.index is not idx and scene.index.obstacles == tuple(nine_boxes)
@@ -0,0 +1,52 @@
+# tests/test_search.py
+import math
+import random
+import pytest
+from mtvg.geometry import Obstacle
+from mtvg.search import SearchStats, astar, bidirectional_dijkstra, dijkstra, one_to_many
+from mtvg.visibility_graph import build_visibility_graph
+
+def _grid_graph(seed, n_points=40):
+    rng = random.Random(seed)
+    obs = [Obstacle(vertices=((x, y), (x + 0.12, y), (x + 0.12, y + 0.12), (x, y + 0.12)))
+           for x in (0.1, 0.35, 0.6, 0.85) for y in (0.1, 0.35, 0.6, 0.85)]
+    pts = [(rng.random(), rng.random()) for _ in range(n_points)]
+    return build_visibility_graph(obs, pts, method="sweep")
+
+@pytest.mark.parametrize("frozen", [False, True])
+def test_astar_and_bidirectional_match_dijkstra(frozen):
+    G = _grid_graph(1)
+    H = G.freeze() if frozen else G
+    rng = random.Random(0)
+    for _ in range(30):
+        s, t = rng.randrange(len(G.nodes)), rng.randrange(len(G.nodes))
+        d_ref, _ = dijkstra(G, s, t)
+        for search in (astar, bidirectional_dijkstra):
+            d, path = search(H, s, t)
+            if math.isinf(d_ref):
+                assert math.isinf(d) and path == []
+                continue
+            assert math.isclose(d, d_ref, rel_tol=1e-12)
+            assert path[0] == s and path[-1] == t
+            assert math.isclose(sum(math.dist(G.nodes[a], G.nodes[b]) for a, b in zip(path, path[1:])), d_ref, rel_tol=1e-9)
+
+def test_astar_expands_fewer_nodes():
+    G = _grid_graph(2, n_points=80)
+    rng = random.Random(1)
+    s_ref, s_astar = SearchStats(), SearchStats()
+    for _ in range(20):
+        s, t = rng.randrange(len(G.nodes)), rng.randrange(len(G.nodes))
+        dijkstra(G, s, t, stats=s_ref)
+        astar(G, s, t, stats=s_astar)
+    assert 0 < s_astar.expanded < s_ref.expanded
+
+def test_one_to_many_stops_after_last_target():
+    G = _grid_graph(3)
+    targets = [5, 7, 11]
+    stats = SearchStats()
+    got = one_to_many(G, 0, targets, stats=stats)
+    for t in targets:
+        assert math.isclose(got[t], dijkstra(G, 0, t)[0], rel_tol=1e-12)
+    full = SearchStats()
+    one_to_many(G, 0, range(len(G.nodes)), stats=full)
+    assert stats.expanded <= full.expanded
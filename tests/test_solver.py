@@ -0,0 +1,53 @@
+# tests/test_solver.py
+import itertools
+import math
+import pytest
+
+def _brute_force(S):
+    # with earliest interception per leg, the best visiting order is optimal
+    best = math.inf
+    for perm in itertools.permutations(range(len(S.targets))):
+        pos, t = S.scene.depot.xy, 0.0
+        for k in perm:
+            t = S.earliest_intercept(pos, t, k, S.node_distances(pos))
+            if not math.isfinite(t):
+                break
+            pos = S.targets[k].xy(t)
+        else:
+            best = min(best, t + S.node_distances(pos)[S.depot_node] / S.v)
+    return best
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_optimal_and_bounded_suboptimal_costs(seed, solver_instance):
+    S = solver_instance(seed)
+    opt = _brute_force(S)
+    sol = S.solve(1.0)
+    assert math.isclose(sol.cost, opt, rel_tol=1e-12)
+    assert sorted(i for i, _ in sol.tour) == [10, 11, 12, 13, 14]
+    assert all(t1 <= t2 for (_, t1), (_, t2) in zip(sol.tour, sol.tour[1:]))
+    for w in (1.5, 3.0):
+        for strategy in ("focal", "wastar"):
+            s = S.solve(w, strategy=strategy)
+            assert opt - 1e-12 <= s.cost <= w * opt + 1e-12
+            assert s.lower_bound <= opt + 1e-12
+
+def test_anytime_improves_to_proven_optimum(solver_instance):
+    S = solver_instance(1)
+    sols = list(S.anytime(3.0))
+    costs = [s.cost for s in sols]
+    assert costs == sorted(costs, reverse=True)
+    assert all(s.lower_bound <= costs[-1] + 1e-12 for s in sols)
+    bounds = [s.lower_bound for s in sols]
+    assert bounds == sorted(bounds)
+    assert math.isclose(sols[-1].cost, sols[-1].lower_bound) and sols[-1].gap == pytest.approx(1.0)
+
+def test_anytime_lower_bound_never_drops(solver_instance):
+    # with a capped open list a later pass can prove less than an earlier one
+    bounds = [s.lower_bound for s in solver_instance(2, 6).anytime(3.0, max_open=6)]
+    assert len(bounds) > 2 and bounds == sorted(bounds)
+
+def test_open_list_limit_keeps_bound_honest(solver_instance):
+    S = solver_instance(2)
+    opt = S.solve(1.0).cost
+    s = S.solve(1.0, max_open=4)
+    assert s.cost >= opt - 1e-12 and s.lower_bound <= opt + 1e-12
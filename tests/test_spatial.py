@@ -0,0 +1,60 @@
+# tests/test_spatial.py
+import math
+import random
+import numpy as np
+from mtvg.geometry import Obstacle, visible_many
+from mtvg.spatial import GridIndex, unique_points
+from mtvg.visibility_graph import build_visibility_graph
+
+def _brute_unique(pts, tol):
+    out = []
+    for x, y in pts:
+        if not any(abs(x - ux) <= tol and abs(y - uy) <= tol for ux, uy in out):
+            out.append((float(x), float(y)))
+    return out
+
+def test_unique_points_matches_pairwise_scan():
+    rng = random.Random(0)
+    base = [(rng.random(), rng.random()) for _ in range(300)]
+    pts = base + [(x + rng.uniform(-1e-9, 1e-9), y) for x, y in base[::3]] + [(0.5, 0.5), (0.5 + 2e-9, 0.5)]
+    rng.shuffle(pts)
+    for tol in (1e-9, 0.02, 0.0):
+        assert unique_points(pts, tol) == _brute_unique(pts, tol)
+
+def test_nearest_and_radius_queries():
+    rng = random.Random(1)
+    pts = [(rng.random(), rng.random()) for _ in range(500)]
+    grid = GridIndex.build(enumerate(pts))
+    for q in [(0.5, 0.5), (-2.0, 3.0), (0.01, 0.99)]:
+        d = np.hypot(*(np.asarray(pts) - q).T)
+        assert grid.nearest(q, 7) == np.argsort(d, kind="stable")[:7].tolist()
+        assert sorted(grid.within(q, 0.1)) == np.flatnonzero(d <= 0.1).tolist()
+    grid.remove(int(np.argmin(np.hypot(*(np.asarray(pts) - (0.5, 0.5)).T))))
+    assert len(grid) == 499 and len(list(grid.by_distance((0.3, 0.3)))) == 499
+
+def test_graph_visible_nodes_closest_first():
+    obs = [Obstacle(vertices=((0.4, 0.4), (0.6, 0.4), (0.6, 0.6), (0.4, 0.6)))]
+    rng = random.Random(2)
+    G = build_visibility_graph(obs, [(rng.random(), rng.random()) for _ in range(60)])
+    p = (0.1, 0.5)
+    vis = G.visible_nodes(p)
+    ref = np.flatnonzero(visible_many(p, np.asarray(G.nodes), G.obstacle_edges)).tolist()
+    assert sorted(vis) == ref
+    dists = [math.dist(p, G.nodes[u]) for u in vis]
+    assert dists == sorted(dists)
+    assert G.visible_nodes(p, k=3) == vis[:3]
+    assert G.visible_nodes(p, max_dist=0.3) == [u for u, d in zip(vis, dists) if d <= 0.3]
+    # the index follows insertions and removals
+    nid = G.insert_point((0.11, 0.5))
+    assert G.nearest_nodes(p) == [nid]
+    G.remove_point(nid)
+    assert nid not in G.nearest_nodes(p, 5) and G.nodes_within(p, 0.0) == []
+
+def test_queries_far_outside_the_occupied_cells():
+    rng = random.Random(3)
+    pts = [(rng.random(), rng.random()) for _ in range(10000)]
+    grid = GridIndex.build(enumerate(pts))
+    for q in [(50.0, 50.0), (-30.0, 0.5), (0.5, 1e4)]:
+        d = np.hypot(*(np.asarray(pts) - q).T)
+        assert grid.nearest(q, 3) == np.argsort(d, kind="stable")[:3].tolist()
+        assert grid.within(q, 1.0) == []
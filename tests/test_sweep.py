@@ -0,0 +1,53 @@
+# tests/test_sweep.py
+import math
+import random
+import pytest
+from mtvg.visibility_graph import build_visibility_graph, dijkstra
+
+def _random_scene(star_polygon, seed, grid=3, n_points=20):
+    # star-shaped (possibly non-convex) CCW polygons, one per grid cell, so they never overlap
+    rng = random.Random(seed)
+    obs = [star_polygon(rng, (c % grid + 0.5) / grid, (c // grid + 0.5) / grid, 0.4 / grid, rng.randint(3, 9))
+           for c in range(grid * grid)]
+    pts = [(rng.random(), rng.random()) for _ in range(n_points)]
+    return obs, pts
+
+def _edge_set(G):
+    return {(u, v) for u, nbrs in G.adj.items() for v, _ in nbrs}
+
+@pytest.mark.parametrize("seed", range(8))
+def test_sweep_matches_pairwise_on_random_polygons(seed, star_polygon):
+    obs, pts = _random_scene(star_polygon, seed)
+    G_pair = build_visibility_graph(obs, pts)
+    G_sweep = build_visibility_graph(obs, pts, method="sweep")
+    assert G_sweep.nodes == G_pair.nodes
+    assert _edge_set(G_sweep) == _edge_set(G_pair)
+    assert G_sweep.adj == G_pair.adj
+
+def test_sweep_matches_pairwise_on_grid_aligned_boxes(nine_boxes):
+    # collinear vertices, points on obstacle edges and inside obstacles
+    obs = nine_boxes
+    pts = [(0.0, 0.0), (1.0, 1.0), (0.0, 0.15), (0.45, 0.1), (0.45, 0.45), (0.3, 0.3), (1.0, 0.15)]
+    G_pair = build_visibility_graph(obs, pts)
+    G_sweep = build_visibility_graph(obs, pts, method="sweep")
+    assert G_sweep.adj == G_pair.adj
+    d_pair, _ = dijkstra(G_pair, 0, 1)
+    d_sweep, _ = dijkstra(G_sweep, 0, 1)
+    assert math.isfinite(d_sweep) and d_sweep == d_pair
+
+@pytest.mark.parametrize("seed", range(4))
+def test_sweep_matches_pairwise_with_nodes_on_edges(seed, star_polygon):
+    # edge midpoints and other points on edges, on their edge only up to rounding
+    obs, pts = _random_scene(star_polygon, seed, grid=2, n_points=5)
+    rng = random.Random(seed)
+    for o in obs:
+        for a, b in zip(o.vertices, o.vertices[1:] + o.vertices[:1]):
+            for f in (0.5, rng.random()):
+                pts.append((a[0] + f * (b[0] - a[0]), a[1] + f * (b[1] - a[1])))
+    G_pair = build_visibility_graph(obs, pts)
+    G_sweep = build_visibility_graph(obs, pts, method="sweep")
+    assert G_sweep.adj == G_pair.adj
+
+def test_unknown_method_rejected():
+    with pytest.raises(ValueError):
+        build_visibility_graph([], [(0.0, 0.0)], method="bogus")
@@ -1,7 +1,10 @@
 # tests/test_visibility_graph.py
 import math
+import random
+import pytest
 from mtvg.geometry import Obstacle
-from mtvg.visibility_graph import build_visibility_graph, dijkstra
+from mtvg.search import astar
+from mtvg.visibility_graph import build_visibility_graph, dijkstra, shortest_path_tree
 
 def test_no_obstacles_complete_graph():
     pts = [(0,0), (1,0), (1,1), (0,1)]
@@ -20,3 +23,142 @@ def test_center_box_blocks_diagonal():
     dist, _ = dijkstra(G, 0, 1)  # (0,0) -> (1,1)
     assert dist > d_direct  # must go around the box
     assert math.isfinite(dist)
+
+def test_parallel_build_matches_serial(nine_boxes):
+    obs = nine_boxes
+    pts = [(0.0, 0.0), (1.0, 1.0), (0.0, 1.0), (1.0, 0.0), (0.3, 0.55)]
+    G = build_visibility_graph(obs, pts)
+    for method in ("pairwise", "sweep"):
+        G_par = build_visibility_graph(obs, pts, method=method, workers=2, chunk_size=3)
+        assert G_par.nodes == G.nodes
+        assert G_par.adj == G.adj
+
+def test_freeze_thaw_roundtrip_and_csr_dijkstra(nine_boxes):
+    obs = nine_boxes
+    pts = [(0.0, 0.0), (1.0, 1.0), (0.0, 1.0), (1.0, 0.0), (0.3, 0.55)]
+    G = build_visibility_graph(obs, pts)
+    C = G.freeze()
+    assert C.num_nodes == len(G.nodes) and C.coords.shape == (len(G.nodes), 2)
+    assert C.num_edges == sum(len(nbrs) for nbrs in G.adj.values()) // 2
+    assert list(C.edges()) == list(G.edges())
+    assert not C.weights.flags.writeable
+    H = C.thaw()
+    assert H.nodes == G.nodes and H.adj == G.adj
+    for s, t in ((0, 1), (2, 3), (4, 0)):
+        assert dijkstra(C, s, t) == dijkstra(G, s, t)
+
+def _coord_edges(G):
+    return {frozenset((G.nodes[u], G.nodes[v])) for u, v, _ in G.edges()}
+
+def test_insert_and_remove_point_match_rebuild(nine_boxes):
+    obs = nine_boxes
+    pts = [(0.0, 0.0), (1.0, 1.0), (0.0, 1.0)]
+    G = build_visibility_graph(obs, pts)
+    q = G.insert_point((0.3, 0.55))
+    assert q == len(G.nodes) - 1
+    assert _coord_edges(G) == _coord_edges(build_visibility_graph(obs, pts + [(0.3, 0.55)]))
+    assert G.insert_point((0.45, 0.45)) == q + 1 and G.adj[q + 1] == []  # inside a box
+
+    G.remove_point(0)
+    assert 0 not in G.adj and all(v != 0 for nbrs in G.adj.values() for v, _ in nbrs)
+    assert G.insert_point((1.0, 0.0)) == 0  # freed id is reused
+    ref = build_visibility_graph(obs, [(1.0, 0.0), (1.0, 1.0), (0.0, 1.0), (0.3, 0.55), (0.45, 0.45)])
+    assert _coord_edges(G) == _coord_edges(ref)
+    assert math.isclose(dijkstra(G, 0, 1)[0], math.dist((1.0, 0.0), (1.0, 1.0)))
+
+@pytest.mark.parametrize("method", ["pairwise", "sweep"])
+def test_reduced_graph_keeps_shortest_paths(method):
+    rng = random.Random(5)
+    obs = []
+    for cx, cy in [(0.25, 0.3), (0.7, 0.25), (0.45, 0.7), (0.8, 0.75)]:
+        k = rng.randint(4, 7)
+        angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(k))
+        obs.append(Obstacle(vertices=tuple((cx + 0.12 * math.cos(a), cy + 0.12 * math.sin(a)) for a in angles)))
+    pts = [(0.02, 0.02), (0.98, 0.98), (0.02, 0.95), (0.95, 0.05), (0.5, 0.45)]
+    full = build_visibility_graph(obs, pts, method=method)
+    red = build_visibility_graph(obs, pts, method=method, reduced=True)
+    assert red.nodes == full.nodes
+    red_edges = set(red.edges())
+    assert red_edges < set(full.edges())
+    for s in range(len(pts)):
+        for t in range(len(pts)):
+            assert dijkstra(red, s, t)[0] == pytest.approx(dijkstra(full, s, t)[0], abs=1e-12)
+    assert build_visibility_graph(obs, pts, method=method, reduced=True, workers=2) == red
+
+def test_reduced_graph_refuses_point_edits_and_rebuilds_exactly():
+    rng = random.Random(11)
+    obs = [Obstacle(vertices=((x, y), (x + 0.12, y + 0.02), (x + 0.1, y + 0.13), (x - 0.01, y + 0.1)))
+           for x, y in [(0.2, 0.2), (0.6, 0.25), (0.3, 0.6), (0.65, 0.65)]]
+    pts = [(rng.random(), rng.random()) for _ in range(6)]
+    red = build_visibility_graph(obs, pts, reduced=True)
+    with pytest.raises(ValueError, match="reduced"):
+        red.insert_point((0.5, 0.5))
+    with pytest.raises(ValueError, match="reduced"):
+        red.remove_point(0)
+    # the supported route: rebuild with the extra point, same distances as inserting into the full graph
+    full = build_visibility_graph(obs, pts)
+    q = full.insert_point((0.5, 0.5))
+    red = build_visibility_graph(obs, pts + [(0.5, 0.5)], reduced=True)
+    ids = list(range(len(pts))) + [q]
+    for i, s in enumerate(ids):
+        for j, t in enumerate(ids):
+            assert dijkstra(red, i, j)[0] == pytest.approx(dijkstra(full, s, t)[0], abs=1e-12)
+
+def test_reduced_graph_matches_full_distances_on_clutter(clutter):
+    obs, pts = clutter(20, 30)
+    full = build_visibility_graph(obs, pts).freeze()
+    red = build_visibility_graph(obs, pts, reduced=True).freeze()
+    assert red.num_edges < full.num_edges
+    for s in range(len(pts)):
+        d_full, d_red = shortest_path_tree(full, s)[0][:len(pts)], shortest_path_tree(red, s)[0][:len(pts)]
+        assert d_red.tolist() == pytest.approx(d_full.tolist(), abs=1e-12)
+
+def test_add_and_remove_obstacle_match_rebuild():
+    rng = random.Random(3)
+    obs = []
+    for cx, cy in [(0.2, 0.25), (0.7, 0.2), (0.3, 0.75), (0.75, 0.7)]:
+        angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(rng.randint(3, 6)))
+        obs.append(Obstacle(vertices=tuple((cx + 0.1 * math.cos(a), cy + 0.1 * math.sin(a)) for a in angles)))
+    pts = [(0.02, 0.02), (0.98, 0.98), (0.5, 0.5), (0.02, 0.95)]
+    box = Obstacle(vertices=((0.45, 0.45), (0.6, 0.45), (0.6, 0.6), (0.45, 0.6)))  # covers (0.5, 0.5)
+
+    def nodes(G):
+        return sorted(G.nodes[u] for u in G.adj)
+
+    G = build_visibility_graph(obs, pts)
+    added = G.add_obstacle(box)
+    ref = build_visibility_graph(obs + [box], pts)
+    assert len(added) == 4 and nodes(G) == nodes(ref) and _coord_edges(G) == _coord_edges(ref)
+    assert G.obstacles == obs + [box]
+
+    dropped = G.remove_obstacle(1)
+    ref = build_visibility_graph([obs[0], obs[2], obs[3], box], pts)
+    assert len(dropped) == len(obs[1].vertices) and nodes(G) == nodes(ref) and _coord_edges(G) == _coord_edges(ref)
+    G.remove_obstacle(box)
+    ref = build_visibility_graph([obs[0], obs[2], obs[3]], pts)
+    assert nodes(G) == nodes(ref) and _coord_edges(G) == _coord_edges(ref)
+
+    # a supplied point on an obstacle vertex stays when the obstacle goes
+    corner = build_visibility_graph([box], [(0.45, 0.45), (0.0, 0.0)])
+    corner.remove_obstacle(0)
+    assert nodes(corner) == [(0.0, 0.0), (0.45, 0.45)] and _coord_edges(corner) == _coord_edges(
+        build_visibility_graph([], [(0.45, 0.45), (0.0, 0.0)]))
+    with pytest.raises(ValueError):
+        build_visibility_graph(obs, pts, reduced=True).add_obstacle(box)
+
+def test_lazy_graph_matches_full_build(nine_boxes):
+    obs = nine_boxes
+    pts = [(0.0, 0.0), (0.05, 0.3), (1.0, 1.0), (0.0, 1.0), (1.0, 0.0), (0.3, 0.55)]
+    G = build_visibility_graph(obs, pts)
+    L = build_visibility_graph(obs, pts, lazy=True)
+    assert L.stats().tested == 0 and L.nodes == G.nodes
+    assert dijkstra(L, 0, 1) == dijkstra(G, 0, 1)
+    st = L.stats()
+    assert 0 < st.expanded < len(G.nodes) and 0 < st.fraction_tested < 1
+    for s, t in ((0, 2), (3, 4), (5, 0)):
+        assert dijkstra(L, s, t) == dijkstra(G, s, t)
+        assert astar(L, s, t) == astar(G, s, t)
+    assert L.materialize() == G and L.stats().fraction_tested == 1
+    assert L.freeze().num_edges == G.freeze().num_edges
+    with pytest.raises(ValueError):
+        build_visibility_graph(obs, pts, lazy=True, reduced=True)
@@ -0,0 +1,62 @@
+# tests/test_visible_many.py
+import random
+import numpy as np
+from mtvg.geometry import Obstacle, ObstacleEdges, make_obstacles_union, visible, visible_many
+
+BOX = Obstacle(vertices=((0.4,0.4),(0.6,0.4),(0.6,0.6),(0.4,0.6)))
+
+def test_visible_many_endpoint_touch_and_interior():
+    p0 = [(0.0, 0.0), (0.4, 0.4), (0.4, 0.4), (0.0, 0.4), (0.45, 0.45), (0.4, 0.4)]
+    p1 = [(0.4, 0.4), (0.6, 0.6), (0.6, 0.4), (1.0, 0.4), (0.55, 0.55), (0.3, 0.6)]
+    got = visible_many(p0, p1, [BOX])
+    # touch at endpoint ok; diagonal through interior, along an edge, grazing along
+    # the boundary line and fully-inside segments are blocked; leaving outward is ok
+    assert got.tolist() == [True, False, False, False, False, True]
+
+def test_visible_many_matches_shapely_on_random_scene(star_polygon):
+    rng = random.Random(3)
+    obs = [star_polygon(rng, 0.25 + 0.5 * (i % 2), 0.25 + 0.5 * (i // 2), 0.2, rng.randint(3, 8)) for i in range(4)]
+    union = make_obstacles_union(obs)
+    pts = [(rng.random(), rng.random()) for _ in range(40)] + [v for o in obs for v in o.vertices]
+    p0, p1 = [], []
+    for i in range(len(pts)):
+        for j in range(i + 1, len(pts)):
+            p0.append(pts[i]); p1.append(pts[j])
+    got = visible_many(p0, p1, ObstacleEdges.from_obstacles(obs), chunk_elems=1000)
+    ref = np.array([visible(a, b, union) for a, b in zip(p0, p1)])
+    assert np.array_equal(got, ref)
+
+def test_visible_many_broadcasts_single_origin_and_no_obstacles():
+    got = visible_many((0.0, 0.0), [(1.0, 1.0), (1.0, 0.0)], [BOX])
+    assert got.tolist() == [False, True]
+    assert visible_many((0.0, 0.0), [(1.0, 1.0)], []).tolist() == [True]
+
+def test_visible_many_matches_shapely_on_degenerate_grid_scene():
+    # axis-aligned boxes and lattice points: many points on edges, collinear grazes
+    rng = random.Random(3)
+    obs = []
+    for gx in range(4):
+        for gy in range(4):
+            x, y, w = gx * 0.25 + 0.05, gy * 0.25 + 0.05, 0.1 + 0.05 * rng.randint(0, 2)
+            obs.append(Obstacle(vertices=((x, y), (x + w, y), (x + w, y + 0.1), (x, y + 0.1))))
+    union = make_obstacles_union(obs)
+    pts = [(rng.randint(0, 20) / 20, rng.randint(0, 20) / 20) for _ in range(25)] + [v for o in obs[:4] for v in o.vertices]
+    p0 = [a for a in pts for b in pts if a != b]
+    p1 = [b for a in pts for b in pts if a != b]
+    got = visible_many(p0, p1, obs)
+    ref = np.array([visible(a, b, union) for a, b in zip(p0, p1)])
+    assert np.array_equal(got, ref)
+
+def test_visible_many_matches_shapely_with_edge_midpoints(star_polygon):
+    # midpoints are on their edge only up to rounding, on either side of it
+    for seed in range(5):
+        rng = random.Random(seed)
+        obs = [star_polygon(rng, 0.25 + 0.5 * (i % 2), 0.25 + 0.5 * (i // 2), 0.2, rng.randint(3, 8)) for i in range(4)]
+        union = make_obstacles_union(obs)
+        mids = [((a[0] + b[0]) / 2, (a[1] + b[1]) / 2) for o in obs for a, b in zip(o.vertices, o.vertices[1:] + o.vertices[:1])]
+        pts = [(rng.random(), rng.random()) for _ in range(10)] + mids + [v for o in obs for v in o.vertices]
+        p0 = [a for i, a in enumerate(pts) for b in pts[i + 1:]]
+        p1 = [b for i, a in enumerate(pts) for b in pts[i + 1:]]
+        got = visible_many(p0, p1, ObstacleEdges.from_obstacles(obs))
+        ref = np.array([visible(a, b, union) for a, b in zip(p0, p1)])
+        assert np.array_equal(got, ref)
@@ -0,0 +1,45 @@
+# tests/test_viz.py
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+from matplotlib.collections import LineCollection, PolyCollection
+from mtvg.geometry import Obstacle
+from mtvg.models import Target, make_linear_xy
+from mtvg.visibility_graph import build_visibility_graph
+from mtvg.viz import animate_targets, draw_scene, edge_segments
+
+OBS = [Obstacle(vertices=((0.4, 0.4), (0.6, 0.4), (0.6, 0.6), (0.4, 0.6)))]
+PTS = [(0.0, 0.0), (1.0, 1.0), (0.0, 1.0), (1.0, 0.0)]
+
+def test_draw_scene_uses_one_collection_per_layer():
+    G = build_visibility_graph(OBS, PTS)
+    seg = edge_segments(G)
+    assert seg.shape == (G.freeze().num_edges, 2, 2)
+    assert {tuple(map(tuple, s)) for s in seg} == {(G.nodes[u], G.nodes[v]) for u, v, _ in G.edges()}
+    assert len(edge_segments(G.freeze(), max_edges=5)) == 5
+
+    fig, ax = plt.subplots()
+    draw_scene(OBS, depot=(0.0, 0.0), static_points=G.nodes, ax=ax, graph=G, paths=[[(0, 0), (0.6, 0.4), (1, 1)]])
+    lines = [c for c in ax.collections if isinstance(c, LineCollection)]
+    assert [len(c.get_segments()) for c in lines] == [len(seg), 1]
+    assert sum(isinstance(c, PolyCollection) and not isinstance(c, LineCollection) for c in ax.collections) == 1
+    legacy = [(u, v, G.nodes[u], G.nodes[v]) for u, v, _ in G.edges()]
+    _, ax2 = plt.subplots()
+    draw_scene(OBS, visibility_edges=legacy, ax=ax2, max_edges=3)
+    assert len(ax2.collections[-1].get_segments()) == 3
+    plt.close("all")
+
+def test_animate_targets_writes_gif_and_frames(tmp_path):
+    tgts = [Target(id=0, xy=make_linear_xy((0.1, 0.9), (0.9, 0.9), 0.0, 1.0), windows=[(0.0, 0.5)]),
+            Target(id=1, xy=lambda t: (0.9, 0.1 + 0.5 * t), windows=[(0.2, 1.0)])]
+    times = np.linspace(0.0, 1.0, 6)
+    [gif] = animate_targets(OBS, tgts, times, tmp_path / "a.gif", depot=(0.0, 0.0))
+    with Image.open(gif) as im:
+        assert im.n_frames == 6
+    pngs = animate_targets(OBS, tgts, times, tmp_path / "frames", dpi=40)
+    assert [p.name for p in pngs] == [f"frame_{k:04d}.png" for k in range(6)]
+    first, last = (np.asarray(Image.open(p)) for p in (pngs[0], pngs[-1]))
+    assert first.shape == last.shape and not np.array_equal(first, last)
+    assert plt.get_fignums() == []